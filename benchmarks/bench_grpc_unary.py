@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""Compare unary gRPC handling: the pydantic round-trip vs the native proto path.
+
+Times what a ``Completion``/``ChatCompletion`` call does between receiving the
+request proto and returning the response proto, without the network.
+Run from the repository root::
+
+    python -m benchmarks.bench_grpc_unary
+"""
+
+# Standard library imports
+import argparse
+import timeit
+from typing import Callable, List, Tuple
+
+# Third-party imports
+from google.protobuf.message import Message
+
+# Local/application imports
+from src.grpc_service import converters, native
+from src.grpc_service.proto import openai_pb2
+from src.grpc_service.server import _build_chat_proto, _build_completion_proto
+
+MODEL = "dummy"
+
+
+def _requests() -> List[Tuple[str, Message]]:
+    words = "benchmark prompt text with a handful of ordinary words".split()
+
+    def prompt(tokens: int) -> str:
+        return " ".join(words[index % len(words)] for index in range(tokens))
+
+    cases: List[Tuple[str, Message]] = []
+    for max_tokens, n in ((16, 1), (256, 1), (16, 8)):
+        cases.append(
+            (
+                f"completion {max_tokens} x{n}",
+                openai_pb2.CompletionRequest(
+                    model=MODEL, prompt=prompt(64), max_tokens=max_tokens, n=n
+                ),
+            )
+        )
+    for messages in (1, 20):
+        cases.append(
+            (
+                f"chat {messages} messages",
+                openai_pb2.ChatCompletionRequest(
+                    model=MODEL,
+                    messages=[
+                        openai_pb2.ChatMessage(role="user", content=prompt(64))
+                        for _ in range(messages)
+                    ],
+                    max_tokens=16,
+                ),
+            )
+        )
+    return cases
+
+
+def _pydantic(request: Message) -> Callable[[], object]:
+    # What the servicer does today: proto -> pydantic -> pydantic -> proto.
+    if isinstance(request, openai_pb2.CompletionRequest):
+        return lambda: _build_completion_proto(
+            converters.completion_request_from_proto(request, default_model=MODEL)
+        )
+    return lambda: _build_chat_proto(
+        converters.chat_request_from_proto(request, default_model=MODEL)
+    )
+
+
+def _native(request: Message) -> Callable[[], object]:
+    if isinstance(request, openai_pb2.CompletionRequest):
+        return lambda: native.completion_response(
+            native.completion_params(request, default_model=MODEL)
+        )
+    return lambda: native.chat_response(
+        native.chat_params(request, default_model=MODEL)
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<26}{'pydantic':>14}{'native':>14}{'speedup':>10}")
+    for name, request in _requests():
+        timings = []
+        for build in (_pydantic, _native):
+            handle = build(request)
+            number, _ = timeit.Timer(handle).autorange()
+            best = min(timeit.repeat(handle, number=number, repeat=args.repeat))
+            timings.append(best / number * 1e6)
+        print(
+            f"{name:<26}{timings[0]:>12.1f}us{timings[1]:>12.1f}us"
+            f"{timings[0] / timings[1]:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
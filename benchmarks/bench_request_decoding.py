@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Compare request decoding: pydantic validation vs the one-pass fast path.
+
+Run from the repository root::
+
+    python -m benchmarks.bench_request_decoding
+"""
+
+# Standard library imports
+import argparse
+import json
+import timeit
+from typing import Callable, Dict, List, Tuple
+
+# Third-party imports
+import orjson
+
+# Local/application imports
+from src.endpoints.encoding import construct_model
+from src.models import ChatCompletionRequest, CompletionRequest
+
+
+def _bodies() -> List[Tuple[str, type, bytes]]:
+    words = "benchmark prompt text with a handful of ordinary words".split()
+
+    def prompt(tokens: int) -> str:
+        return " ".join(words[index % len(words)] for index in range(tokens))
+
+    completion: Dict[str, object] = {"model": "dummy", "max_tokens": 128}
+    cases = []
+    for tokens in (16, 1_000, 100_000):
+        body = dict(completion, prompt=prompt(tokens))
+        cases.append((f"completion {tokens} tokens", CompletionRequest, body))
+    # Kept to show why /v1/chat/completions stays on pydantic: its messages
+    # dominate the body and pydantic-core validates them at least as fast.
+    chat = {
+        "model": "dummy",
+        "max_tokens": 128,
+        "messages": [
+            {"role": "user" if index % 2 else "assistant", "content": prompt(200)}
+            for index in range(50)
+        ],
+    }
+    cases.append(("chat 50 messages", ChatCompletionRequest, chat))
+    return [
+        (name, model, json.dumps(body).encode("utf-8")) for name, model, body in cases
+    ]
+
+
+def _pydantic(model: type, body: bytes) -> Callable[[], object]:
+    # What FastAPI does for a body parameter: json.loads, then validation.
+    return lambda: model.model_validate(json.loads(body))
+
+
+def _fast(model: type, body: bytes) -> Callable[[], object]:
+    return lambda: construct_model(model, orjson.loads(body))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'case':<26}{'pydantic':>14}{'fast':>14}{'speedup':>10}")
+    for name, model, body in _bodies():
+        timings = []
+        for build in (_pydantic, _fast):
+            decode = build(model, body)
+            number, _ = timeit.Timer(decode).autorange()
+            best = min(timeit.repeat(decode, number=number, repeat=args.repeat))
+            timings.append(best / number * 1e6)
+        print(
+            f"{name:<26}{timings[0]:>12.1f}us{timings[1]:>12.1f}us"
+            f"{timings[0] / timings[1]:>9.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
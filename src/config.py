@@ -4,6 +4,7 @@
 # Standard library imports
 import os
 from dataclasses import dataclass
+from typing import Optional
 
 
 def _float_from_env(name: str, default: float) -> float:
@@ -51,14 +52,94 @@ class ServerSettings:
     token_delay_jitter_seconds: float = _float_from_env(
         "DUMMY_VLLM_TOKEN_DELAY_JITTER", 0.0
     )
+    ttft_distribution: str = os.getenv("DUMMY_VLLM_TTFT_DISTRIBUTION", "")
+    ttft_stddev_seconds: float = _float_from_env("DUMMY_VLLM_TTFT_STDDEV", 0.0)
+    itl_distribution: str = os.getenv("DUMMY_VLLM_ITL_DISTRIBUTION", "")
+    itl_stddev_seconds: float = _float_from_env("DUMMY_VLLM_ITL_STDDEV", 0.0)
+    pareto_alpha: float = _float_from_env("DUMMY_VLLM_PARETO_ALPHA", 2.5)
+    stall_probability: float = _float_from_env("DUMMY_VLLM_STALL_PROBABILITY", 0.0)
+    stall_seconds: float = _float_from_env("DUMMY_VLLM_STALL_SECONDS", 0.2)
+    engine_step_loop: bool = _bool_from_env("DUMMY_VLLM_ENGINE_STEP_LOOP", True)
+    latency_model: bool = _bool_from_env("DUMMY_VLLM_LATENCY_MODEL", False)
+    prefill_base_seconds: float = _float_from_env("DUMMY_VLLM_PREFILL_BASE", 0.02)
+    prefill_seconds_per_token: float = _float_from_env(
+        "DUMMY_VLLM_PREFILL_PER_TOKEN", 0.0001
+    )
+    decode_base_seconds: float = _float_from_env("DUMMY_VLLM_DECODE_BASE", 0.015)
+    decode_seconds_per_sequence: float = _float_from_env(
+        "DUMMY_VLLM_DECODE_PER_SEQUENCE", 0.0001
+    )
+    kv_cache_blocks: int = _int_from_env("DUMMY_VLLM_KV_CACHE_BLOCKS", 0)
+    kv_block_size: int = _int_from_env("DUMMY_VLLM_KV_BLOCK_SIZE", 16)
+    kv_preemption_mode: str = os.getenv("DUMMY_VLLM_KV_PREEMPTION_MODE", "recompute")
+    kv_swap_seconds_per_block: float = _float_from_env(
+        "DUMMY_VLLM_KV_SWAP_SECONDS_PER_BLOCK", 0.0002
+    )
+    prefix_cache_tokens: int = _int_from_env("DUMMY_VLLM_PREFIX_CACHE_TOKENS", 0)
+    response_cache_size: int = _int_from_env("DUMMY_VLLM_RESPONSE_CACHE_SIZE", 0)
+    stream_blob_cache_size: int = _int_from_env("DUMMY_VLLM_STREAM_BLOB_CACHE_SIZE", 0)
+    stream_blob_slice_bytes: int = _int_from_env(
+        "DUMMY_VLLM_STREAM_BLOB_SLICE_BYTES", 65536
+    )
+    max_num_seqs: int = _int_from_env("DUMMY_VLLM_MAX_NUM_SEQS", 0)
+    priority_preemption: bool = _bool_from_env("DUMMY_VLLM_PRIORITY_PREEMPTION", False)
+    max_active_requests: int = _int_from_env("DUMMY_VLLM_MAX_ACTIVE_REQUESTS", 0)
+    max_queued_requests: int = _int_from_env("DUMMY_VLLM_MAX_QUEUED_REQUESTS", 0)
+    ready_queue_depth: int = _int_from_env("DUMMY_VLLM_READY_QUEUE_DEPTH", 0)
+    retry_after_seconds: float = _float_from_env("DUMMY_VLLM_RETRY_AFTER_SECONDS", 1.0)
+    fault_error_rate: float = _float_from_env("DUMMY_VLLM_FAULT_ERROR_RATE", 0.0)
+    fault_error_status: int = _int_from_env("DUMMY_VLLM_FAULT_ERROR_STATUS", 503)
+    fault_reset_rate: float = _float_from_env("DUMMY_VLLM_FAULT_RESET_RATE", 0.0)
+    fault_malformed_rate: float = _float_from_env(
+        "DUMMY_VLLM_FAULT_MALFORMED_RATE", 0.0
+    )
+    fault_stall_rate: float = _float_from_env("DUMMY_VLLM_FAULT_STALL_RATE", 0.0)
+    fault_truncate_rate: float = _float_from_env("DUMMY_VLLM_FAULT_TRUNCATE_RATE", 0.0)
+    fault_after_tokens: int = _int_from_env("DUMMY_VLLM_FAULT_AFTER_TOKENS", 8)
+    fault_stall_seconds: float = _float_from_env("DUMMY_VLLM_FAULT_STALL_SECONDS", 30.0)
+    fault_seed: int = _int_from_env("DUMMY_VLLM_FAULT_SEED", 0)
+    timing_trace_path: Optional[str] = os.getenv("DUMMY_VLLM_TIMING_TRACE") or None
+    timing_trace_assignment: str = os.getenv(
+        "DUMMY_VLLM_TIMING_TRACE_ASSIGNMENT", "round_robin"
+    )
+    timing_trace_binary_path: Optional[str] = (
+        os.getenv("DUMMY_VLLM_TIMING_TRACE_BINARY") or None
+    )
     default_model_name: str = os.getenv(
         "DUMMY_VLLM_MODEL", "Qwen/Qwen2.5-VL-7B-Instruct"
     )
     default_max_tokens: int = _int_from_env("DUMMY_VLLM_DEFAULT_MAX_TOKENS", 16)
+    fast_request_decoding: bool = _bool_from_env(
+        "DUMMY_VLLM_FAST_REQUEST_DECODING", False
+    )
     grpc_host: str = os.getenv("DUMMY_VLLM_GRPC_HOST", _DEFAULT_HOST)
     grpc_port: int = _int_from_env("DUMMY_VLLM_GRPC_PORT", 9000)
     enable_grpc: bool = _bool_from_env("DUMMY_VLLM_ENABLE_GRPC", True)
     grpc_stream_chunk_size: int = _int_from_env("DUMMY_VLLM_GRPC_STREAM_CHUNK_SIZE", 1)
+    grpc_native_unary: bool = _bool_from_env("DUMMY_VLLM_GRPC_NATIVE_UNARY", False)
+    stream_interval: int = _int_from_env("DUMMY_VLLM_STREAM_INTERVAL", 1)
+    stream_interval_seconds: float = _float_from_env(
+        "DUMMY_VLLM_STREAM_INTERVAL_SECONDS", 0.0
+    )
+    corpus_path: Optional[str] = os.getenv("DUMMY_VLLM_CORPUS_PATH") or None
+    corpus_index_path: Optional[str] = os.getenv("DUMMY_VLLM_CORPUS_INDEX") or None
+    output_length_distribution: str = os.getenv(
+        "DUMMY_VLLM_OUTPUT_LENGTH_DIST", "max_tokens"
+    )
+    output_length_mean: float = _float_from_env("DUMMY_VLLM_OUTPUT_LENGTH_MEAN", 128.0)
+    output_length_stddev: float = _float_from_env(
+        "DUMMY_VLLM_OUTPUT_LENGTH_STDDEV", 64.0
+    )
+    output_length_min: int = _int_from_env("DUMMY_VLLM_OUTPUT_LENGTH_MIN", 1)
+    output_length_max: int = _int_from_env("DUMMY_VLLM_OUTPUT_LENGTH_MAX", 0)
+    output_length_histogram: Optional[str] = (
+        os.getenv("DUMMY_VLLM_OUTPUT_LENGTH_HISTOGRAM") or None
+    )
+    tokenizer_path: Optional[str] = os.getenv("DUMMY_VLLM_TOKENIZER_PATH") or None
+    tokenizer_cache_size: int = _int_from_env("DUMMY_VLLM_TOKENIZER_CACHE_SIZE", 4096)
+    message_token_cache_size: int = _int_from_env(
+        "DUMMY_VLLM_MESSAGE_TOKEN_CACHE_SIZE", 65536
+    )
 
 
 settings = ServerSettings()
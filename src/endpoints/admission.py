@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""ASGI middleware applying admission control to the generation endpoints."""
+
+# Standard library imports
+from typing import Iterable
+
+# Third-party imports
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+# Local/application imports
+from src.engine.admission import AdmissionController, AdmissionRejected
+
+
+class AdmissionMiddleware:
+    """Hold an admission slot for the whole lifetime of a generation request.
+
+    Implemented as plain ASGI rather than an ``@app.middleware`` hook so a
+    streamed response keeps its slot until the last chunk is sent (or the
+    client goes away), and so rejected requests are answered with a 429
+    before their body is even read.
+    """
+
+    def __init__(
+        self, app: ASGIApp, controller: AdmissionController, paths: Iterable[str]
+    ) -> None:
+        self.app = app
+        self.controller = controller
+        self.paths = frozenset(paths)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or scope["path"] not in self.paths:
+            await self.app(scope, receive, send)
+            return
+        try:
+            await self.controller.acquire()
+        except AdmissionRejected as exc:
+            response = JSONResponse(
+                status_code=429,
+                content={
+                    "error": {
+                        "message": str(exc),
+                        "type": "server_overloaded",
+                        "param": None,
+                        "code": "rate_limit_exceeded",
+                    }
+                },
+                headers={"Retry-After": exc.retry_after},
+            )
+            await response(scope, receive, send)
+            return
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self.controller.release()
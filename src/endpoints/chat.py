@@ -2,23 +2,27 @@
 """OpenAI-compatible /v1/chat/completions endpoint."""
 
 # Standard library imports
-import json
-from typing import AsyncGenerator, List, Union
+import asyncio
+from typing import AsyncGenerator, AsyncIterator, List, Optional, Tuple, Union
 
 # Third-party imports
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Header
+from fastapi.responses import Response, StreamingResponse
 
 # Local/application imports
+from src.endpoints.encoding import json_bytes_response, json_response
+from src.endpoints.faults import fault_error_response, sse_with_fault
+from src.endpoints.response_cache import response_cache
+from src.endpoints.stream_blobs import stream_blobs
+from src.engine.coalescing import token_coalescer
+from src.engine.faults import FaultPlan, fault_injector
 from src.generators.dummy_generator import DummyTextGenerator
+from src.generators.logprobs import chat_top_k
 from src.generators.response_builder import ResponseBuilder
-from src.models import (
-    ChatCompletionChoice,
-    ChatCompletionMessage,
-    ChatCompletionRequest,
-    ChatCompletionResponse,
-)
+from src.generators.sse_frames import DONE_FRAME, SseFrameTemplate, encode_chunk
+from src.models import ChatCompletionRequest, ChatCompletionResponse
 from src.utils.metrics import metrics_collector
+from src.utils.rng import RequestRng
 
 
 router = APIRouter()
@@ -27,83 +31,185 @@ router = APIRouter()
 @router.post("/chat/completions", response_model=ChatCompletionResponse)
 async def create_chat_completion(
     request: ChatCompletionRequest,
-) -> Union[ChatCompletionResponse, StreamingResponse]:
+    x_priority: Optional[int] = Header(default=None),
+) -> Union[ChatCompletionResponse, Response]:
     """Handle chat completions with optional streaming."""
-    prompt_text = _messages_to_prompt(request.messages)
+    if x_priority is not None and "priority" not in request.model_fields_set:
+        request.priority = x_priority
+    fault = fault_injector.plan()
+    if fault is not None and fault.kind == "error":
+        return fault_error_response()
+    prompt_tokens = DummyTextGenerator.count_chat_prompt_tokens(request.messages)
+    cached_tokens = DummyTextGenerator.cached_chat_prompt_tokens(request.messages)
     if request.stream:
-        return await _streaming_chat_completion(request)
+        return await _streaming_chat_completion(
+            request, prompt_tokens, cached_tokens, fault
+        )
+    if fault is not None and fault.kind == "stall":
+        await asyncio.sleep(fault.stall_seconds)
 
-    prompt_tokens = DummyTextGenerator.estimate_token_count(prompt_text)
-    choices: List[ChatCompletionChoice] = []
+    choices: List[dict] = []
     total_completion_tokens = 0
+    rng = RequestRng.for_request(request.seed)
+    top_k = chat_top_k(request.logprobs, request.top_logprobs)
+
+    cache_key = None
+    if response_cache is not None and top_k is None:
+        cache_key = response_cache.key(
+            "/v1/chat/completions",
+            request,
+            rng,
+            request.n,
+            prompt_tokens,
+            cached_tokens,
+        )
+        if cache_key is not None:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                metrics_collector.record_request(
+                    endpoint="/v1/chat/completions",
+                    tokens_generated=cached.completion_tokens,
+                )
+                return json_bytes_response(cached.render())
+
     for index in range(request.n):
-        generated_text, truncated = (
-            DummyTextGenerator.generate_completion_with_metadata(
-                max_tokens=request.max_tokens
+        logprobs = None
+        if top_k is None:
+            content, completion_tokens, finish_reason = (
+                DummyTextGenerator.generate_choice(
+                    max_tokens=request.max_tokens,
+                    rng=rng.child(index),
+                    stop=request.stop,
+                )
+            )
+        else:
+            content, completion_tokens, finish_reason, logprobs = (
+                DummyTextGenerator.generate_choice_with_logprobs(
+                    max_tokens=request.max_tokens,
+                    top_k=top_k,
+                    rng=rng.child(index),
+                    stop=request.stop,
+                    chat=True,
+                )
             )
-        )
-        completion_tokens = DummyTextGenerator.estimate_token_count(generated_text)
         total_completion_tokens += completion_tokens
         choices.append(
-            ResponseBuilder.chat_choice(
+            ResponseBuilder.chat_choice_payload(
                 index=index,
-                content=generated_text,
-                finish_reason="length" if truncated else "stop",
+                content=content,
+                finish_reason=finish_reason,
+                logprobs=logprobs,
             )
         )
-    response = ResponseBuilder.chat_response(
+    payload = ResponseBuilder.chat_payload(
         model=request.model,
         choices=choices,
         prompt_tokens=prompt_tokens,
         completion_tokens=total_completion_tokens,
+        cached_tokens=cached_tokens,
     )
     metrics_collector.record_request(
         endpoint="/v1/chat/completions", tokens_generated=total_completion_tokens
     )
-    return response
+    if cache_key is not None:
+        entry = response_cache.put(cache_key, payload, total_completion_tokens)
+        return json_bytes_response(entry.render())
+    return json_response(payload)
 
 
 async def _streaming_chat_completion(
     request: ChatCompletionRequest,
+    prompt_tokens: int,
+    cached_tokens: Optional[int] = None,
+    fault: Optional[FaultPlan] = None,
 ) -> StreamingResponse:
     completion_id = ResponseBuilder.completion_id()
+    reported_prompt_tokens = (
+        prompt_tokens if DummyTextGenerator.has_accurate_tokenizer() else None
+    )
+    rng = RequestRng.for_request(request.seed)
+    top_k = chat_top_k(request.logprobs, request.top_logprobs)
+    trace_key = DummyTextGenerator.chat_trace_key(request.messages)
 
-    async def event_generator() -> AsyncGenerator[str, None]:
+    blob_key = None
+    if stream_blobs is not None and top_k is None and fault is None:
+        blob_key = stream_blobs.key(
+            "/v1/chat/completions",
+            request,
+            rng,
+            request.n,
+            reported_prompt_tokens,
+            cached_tokens,
+        )
+        if blob_key is not None:
+            blob = stream_blobs.get(blob_key)
+            if blob is not None:
+                metrics_collector.record_request(
+                    endpoint="/v1/chat/completions",
+                    tokens_generated=blob.completion_tokens,
+                )
+                return _sse_response(stream_blobs.replay(blob, completion_id))
+
+    async def event_generator() -> AsyncGenerator[Tuple[bytes, int], None]:
         total_completion_tokens = 0
         try:
             for choice_index in range(request.n):
-                tokens, truncated = DummyTextGenerator.prepare_token_stream(
-                    max_tokens=request.max_tokens
+                choice_rng = rng.child(choice_index)
+                choice_stream = DummyTextGenerator.open_stream(
+                    max_tokens=request.max_tokens,
+                    rng=choice_rng,
+                    stop=request.stop,
+                    prompt_tokens=prompt_tokens,
+                    cached_tokens=cached_tokens,
+                    priority=request.priority,
+                    trace_key=trace_key,
                 )
-                async for token in DummyTextGenerator.stream_from_tokens(tokens):
-                    total_completion_tokens += 1
-                    chunk = ResponseBuilder.chat_stream_chunk(
-                        completion_id=completion_id,
-                        model=request.model,
-                        choice_index=choice_index,
-                        token_text=token,
-                        finish_reason=None,
+                cursor = None
+                if top_k is not None:
+                    cursor = DummyTextGenerator.logprob_table(
+                        len(choice_stream.span), top_k, choice_rng
+                    ).cursor()
+                template = SseFrameTemplate.chat(
+                    completion_id, request.model, choice_index
+                )
+                async for tokens in token_coalescer.batches(choice_stream):
+                    total_completion_tokens += len(tokens)
+                    # Frames carry bare tokens, so clients concatenating them
+                    # see the same text however tokens were batched.
+                    frame = template.frame(
+                        "".join(tokens), cursor.chat(tokens) if cursor else None
                     )
-                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                    yield frame, len(tokens)
                 # Final chunk includes usage information with completion_tokens
                 final_chunk = ResponseBuilder.chat_stream_chunk(
                     completion_id=completion_id,
                     model=request.model,
                     choice_index=choice_index,
                     token_text="",
-                    finish_reason="length" if truncated else "stop",
+                    finish_reason=choice_stream.finish_reason,
                     completion_tokens=total_completion_tokens,
+                    prompt_tokens=reported_prompt_tokens,
+                    cached_tokens=cached_tokens,
                 )
-                yield f"data: {json.dumps(final_chunk, ensure_ascii=False)}\n\n"
-            yield "data: [DONE]\n\n"
+                yield encode_chunk(final_chunk), 0
+            yield DONE_FRAME, 0
         finally:
             metrics_collector.record_request(
                 endpoint="/v1/chat/completions",
                 tokens_generated=total_completion_tokens,
             )
 
+    frames = sse_with_fault(fault, event_generator())
+    if blob_key is not None:
+        frames = stream_blobs.record(blob_key, completion_id, frames)
+    return _sse_response(frames)
+
+
+def _sse_response(
+    frames: AsyncIterator[Union[bytes, memoryview]],
+) -> StreamingResponse:
     return StreamingResponse(
-        event_generator(),
+        frames,
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -111,13 +217,3 @@ async def _streaming_chat_completion(
             "X-Accel-Buffering": "no",
         },
     )
-
-
-def _messages_to_prompt(messages: List[ChatCompletionMessage]) -> str:
-    """Concatenate chat messages into a single prompt string."""
-    if not messages:
-        return ""
-    joined = []
-    for message in messages:
-        joined.append(f"{message.role}: {message.content}")
-    return "\n".join(joined)
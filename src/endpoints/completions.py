@@ -2,114 +2,249 @@
 """OpenAI-compatible /v1/completions endpoint."""
 
 # Standard library imports
-import json
-from typing import AsyncGenerator, List, Sequence, Union
+import asyncio
+from typing import AsyncGenerator, AsyncIterator, List, Optional, Sequence, Tuple, Union
 
 # Third-party imports
-from fastapi import APIRouter
-from fastapi.responses import StreamingResponse
+from fastapi import APIRouter, Header, Request
+from fastapi.responses import Response, StreamingResponse
 
 # Local/application imports
+from src.endpoints.encoding import (
+    RequestDecodeError,
+    decode_request,
+    json_bytes_response,
+    json_response,
+)
+from src.endpoints.faults import fault_error_response, sse_with_fault
+from src.endpoints.response_cache import response_cache
+from src.endpoints.stream_blobs import stream_blobs
+from src.engine.coalescing import token_coalescer
+from src.engine.faults import FaultPlan, fault_injector
 from src.generators.dummy_generator import DummyTextGenerator
+from src.generators.logprobs import completion_top_k
 from src.generators.response_builder import ResponseBuilder
-from src.models import CompletionChoice, CompletionRequest, CompletionResponse
+from src.generators.sse_frames import DONE_FRAME, SseFrameTemplate, encode_chunk
+from src.models import CompletionRequest, CompletionResponse
 from src.utils.metrics import metrics_collector
+from src.utils.rng import RequestRng
 
 
 router = APIRouter()
+# Same route, decoding the body without full validation (see main.create_app).
+fast_router = APIRouter()
 
 
 @router.post("/completions", response_model=CompletionResponse)
 async def create_completion(
     request: CompletionRequest,
-) -> Union[CompletionResponse, StreamingResponse]:
+    x_priority: Optional[int] = Header(default=None),
+) -> Union[CompletionResponse, Response]:
     """Handle completion requests with optional streaming."""
+    if x_priority is not None and "priority" not in request.model_fields_set:
+        request.priority = x_priority
+    fault = fault_injector.plan()
+    if fault is not None and fault.kind == "error":
+        return fault_error_response()
     prompts = _normalize_prompts(request.prompt)
     if request.stream:
-        return await _streaming_completion(request, prompts)
+        return await _streaming_completion(request, prompts, fault)
+    if fault is not None and fault.kind == "stall":
+        await asyncio.sleep(fault.stall_seconds)
 
-    choices: List[CompletionChoice] = []
-    total_prompt_tokens = 0
+    choices: List[dict] = []
     total_completion_tokens = 0
-    choice_index = 0
-
-    for prompt_text in prompts:
-        prompt_tokens = DummyTextGenerator.estimate_token_count(prompt_text)
-        total_prompt_tokens += prompt_tokens
-        for _ in range(request.n):
-            generated_text, truncated = (
-                DummyTextGenerator.generate_completion_with_metadata(
-                    max_tokens=request.max_tokens
+    rng = RequestRng.for_request(request.seed)
+    top_k = completion_top_k(request.logprobs)
+    cached_counts = [
+        DummyTextGenerator.cached_prompt_tokens(prompt_text) for prompt_text in prompts
+    ]
+    total_prompt_tokens = sum(
+        DummyTextGenerator.estimate_token_count(prompt_text) for prompt_text in prompts
+    )
+    total_cached_tokens = DummyTextGenerator.total_cached_tokens(cached_counts)
+
+    cache_key = None
+    if response_cache is not None and top_k is None:
+        cache_key = response_cache.key(
+            "/v1/completions",
+            request,
+            rng,
+            len(prompts) * request.n,
+            total_prompt_tokens,
+            total_cached_tokens,
+        )
+        if cache_key is not None:
+            cached = response_cache.get(cache_key)
+            if cached is not None:
+                metrics_collector.record_request(
+                    endpoint="/v1/completions",
+                    tokens_generated=cached.completion_tokens,
+                )
+                return json_bytes_response(cached.render())
+
+    for choice_index in range(len(prompts) * request.n):
+        logprobs = None
+        if top_k is None:
+            text, completion_tokens, finish_reason = (
+                DummyTextGenerator.generate_choice(
+                    max_tokens=request.max_tokens,
+                    rng=rng.child(choice_index),
+                    stop=request.stop,
                 )
             )
-            completion_tokens = DummyTextGenerator.estimate_token_count(generated_text)
-            total_completion_tokens += completion_tokens
-            choices.append(
-                ResponseBuilder.completion_choice(
-                    index=choice_index,
-                    text=generated_text,
-                    finish_reason="length" if truncated else "stop",
+        else:
+            text, completion_tokens, finish_reason, logprobs = (
+                DummyTextGenerator.generate_choice_with_logprobs(
+                    max_tokens=request.max_tokens,
+                    top_k=top_k,
+                    rng=rng.child(choice_index),
+                    stop=request.stop,
                 )
             )
-            choice_index += 1
+        total_completion_tokens += completion_tokens
+        choices.append(
+            ResponseBuilder.completion_choice_payload(
+                index=choice_index,
+                text=text,
+                finish_reason=finish_reason,
+                logprobs=logprobs,
+            )
+        )
 
-    response = ResponseBuilder.completion_response(
+    payload = ResponseBuilder.completion_payload(
         model=request.model,
         choices=choices,
         prompt_tokens=total_prompt_tokens,
         completion_tokens=total_completion_tokens,
+        cached_tokens=total_cached_tokens,
     )
     metrics_collector.record_request(
         endpoint="/v1/completions", tokens_generated=total_completion_tokens
     )
-    return response
+    if cache_key is not None:
+        entry = response_cache.put(cache_key, payload, total_completion_tokens)
+        return json_bytes_response(entry.render())
+    return json_response(payload)
+
+
+@fast_router.post("/completions", response_model=CompletionResponse)
+async def create_completion_fast(
+    raw_request: Request,
+    x_priority: Optional[int] = Header(default=None),
+) -> Union[CompletionResponse, Response]:
+    """Decode the body in one pass, then handle it like ``create_completion``."""
+    try:
+        request = await decode_request(raw_request, CompletionRequest)
+    except RequestDecodeError as exc:
+        return exc.response()
+    return await create_completion(request, x_priority)
 
 
 async def _streaming_completion(
-    request: CompletionRequest, prompts: List[str]
+    request: CompletionRequest,
+    prompts: List[str],
+    fault: Optional[FaultPlan] = None,
 ) -> StreamingResponse:
     """Return a streaming response for the completion endpoint."""
     completion_id = ResponseBuilder.completion_id()
+    rng = RequestRng.for_request(request.seed)
+    top_k = completion_top_k(request.logprobs)
+    cached_counts = [
+        DummyTextGenerator.cached_prompt_tokens(prompt_text) for prompt_text in prompts
+    ]
+    total_cached_tokens = DummyTextGenerator.total_cached_tokens(cached_counts)
+    reported_prompt_tokens = None
+    if DummyTextGenerator.has_accurate_tokenizer():
+        reported_prompt_tokens = sum(
+            DummyTextGenerator.estimate_token_count(prompt_text)
+            for prompt_text in prompts
+        )
+
+    blob_key = None
+    if stream_blobs is not None and top_k is None and fault is None:
+        blob_key = stream_blobs.key(
+            "/v1/completions",
+            request,
+            rng,
+            len(prompts) * request.n,
+            reported_prompt_tokens,
+            total_cached_tokens,
+        )
+        if blob_key is not None:
+            blob = stream_blobs.get(blob_key)
+            if blob is not None:
+                metrics_collector.record_request(
+                    endpoint="/v1/completions",
+                    tokens_generated=blob.completion_tokens,
+                )
+                return _sse_response(stream_blobs.replay(blob, completion_id))
 
-    async def event_generator() -> AsyncGenerator[str, None]:
+    async def event_generator() -> AsyncGenerator[Tuple[bytes, int], None]:
         total_completion_tokens = 0
         choice_index = 0
         try:
-            for _ in prompts:
+            for prompt_text, cached_tokens in zip(prompts, cached_counts):
+                prompt_tokens = DummyTextGenerator.estimate_token_count(prompt_text)
                 for _ in range(request.n):
-                    tokens, truncated = DummyTextGenerator.prepare_token_stream(
-                        max_tokens=request.max_tokens
+                    choice_rng = rng.child(choice_index)
+                    choice_stream = DummyTextGenerator.open_stream(
+                        max_tokens=request.max_tokens,
+                        rng=choice_rng,
+                        stop=request.stop,
+                        prompt_tokens=prompt_tokens,
+                        cached_tokens=cached_tokens,
+                        priority=request.priority,
+                        trace_key=DummyTextGenerator.trace_key(prompt_text),
+                    )
+                    cursor = None
+                    if top_k is not None:
+                        cursor = DummyTextGenerator.logprob_table(
+                            len(choice_stream.span), top_k, choice_rng
+                        ).cursor(separator="")
+                    template = SseFrameTemplate.completion(
+                        completion_id, request.model, choice_index
                     )
-                    async for token in DummyTextGenerator.stream_from_tokens(tokens):
-                        total_completion_tokens += 1
-                        chunk = ResponseBuilder.completion_stream_chunk(
-                            completion_id=completion_id,
-                            model=request.model,
-                            choice_index=choice_index,
-                            token_text=token,
-                            finish_reason=None,
+                    async for tokens in token_coalescer.batches(choice_stream):
+                        total_completion_tokens += len(tokens)
+                        # Frames carry bare tokens, so clients concatenating
+                        # them see the same text however tokens were batched.
+                        frame = template.frame(
+                            "".join(tokens),
+                            cursor.completion(tokens) if cursor else None,
                         )
-                        yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                        yield frame, len(tokens)
                     # Final chunk includes usage information with completion_tokens
                     final_chunk = ResponseBuilder.completion_stream_chunk(
                         completion_id=completion_id,
                         model=request.model,
                         choice_index=choice_index,
                         token_text="",
-                        finish_reason="length" if truncated else "stop",
+                        finish_reason=choice_stream.finish_reason,
                         completion_tokens=total_completion_tokens,
+                        prompt_tokens=reported_prompt_tokens,
+                        cached_tokens=total_cached_tokens,
                     )
-                    yield f"data: {json.dumps(final_chunk, ensure_ascii=False)}\n\n"
+                    yield encode_chunk(final_chunk), 0
                     choice_index += 1
-            yield "data: [DONE]\n\n"
+            yield DONE_FRAME, 0
         finally:
             metrics_collector.record_request(
                 endpoint="/v1/completions",
                 tokens_generated=total_completion_tokens,
             )
 
+    frames = sse_with_fault(fault, event_generator())
+    if blob_key is not None:
+        frames = stream_blobs.record(blob_key, completion_id, frames)
+    return _sse_response(frames)
+
+
+def _sse_response(
+    frames: AsyncIterator[Union[bytes, memoryview]],
+) -> StreamingResponse:
     return StreamingResponse(
-        event_generator(),
+        frames,
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
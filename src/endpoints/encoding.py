@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""Direct JSON encoding and decoding for HTTP bodies."""
+
+# Standard library imports
+import collections.abc
+from functools import lru_cache
+from typing import (
+    Any,
+    Callable,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    get_args,
+    get_origin,
+)
+
+# Third-party imports
+import orjson
+from fastapi import Request
+from fastapi.responses import Response
+from pydantic import BaseModel, TypeAdapter, ValidationError
+
+ModelT = TypeVar("ModelT", bound=BaseModel)
+
+_NONE_TYPE = type(None)
+_SEQUENCE_ORIGINS = (list, collections.abc.Sequence)
+_IMMUTABLE = (type(None), bool, int, float, str, tuple, frozenset)
+_MISSING = object()
+
+
+class RequestDecodeError(ValueError):
+    """A request body that does not fit the endpoint's schema.
+
+    ``param`` is the dotted path of the offending field; enclosing decoders
+    prefix their own field name as the error propagates out.
+    """
+
+    def __init__(self, detail: str, param: Optional[str] = None) -> None:
+        super().__init__(detail)
+        self.detail = detail
+        self.param = param
+
+    def within(self, name: str) -> "RequestDecodeError":
+        if self.param is None:
+            self.param = name
+        elif self.param.startswith("["):
+            self.param = f"{name}{self.param}"
+        else:
+            self.param = f"{name}.{self.param}"
+        return self
+
+    def __str__(self) -> str:
+        if self.param is None:
+            return self.detail
+        return f"Invalid '{self.param}': {self.detail}"
+
+    def response(self) -> Response:
+        """OpenAI-style ``400 invalid_request_error`` reply."""
+        return json_response(
+            {
+                "error": {
+                    "message": str(self),
+                    "type": "invalid_request_error",
+                    "param": self.param,
+                    "code": None,
+                }
+            },
+            status_code=400,
+        )
+
+
+def json_response(payload: Any, status_code: int = 200) -> Response:
+    """Encode ``payload`` straight to bytes, skipping ``response_model``.
+
+    Handlers that return a ``Response`` bypass FastAPI's response validation
+    and generic encoder, so the payload must already follow the schema the
+    route declares.
+    """
+    return json_bytes_response(orjson.dumps(payload), status_code)
+
+
+def json_bytes_response(body: bytes, status_code: int = 200) -> Response:
+    return Response(
+        content=body, status_code=status_code, media_type="application/json"
+    )
+
+
+async def decode_request(request: Request, model: Type[ModelT]) -> ModelT:
+    """Parse a request body into ``model`` without full pydantic validation."""
+    try:
+        data = orjson.loads(await request.body())
+    except orjson.JSONDecodeError as exc:
+        raise RequestDecodeError(f"Invalid JSON body: {exc}") from None
+    return construct_model(model, data)
+
+
+def construct_model(model: Type[ModelT], data: Any) -> ModelT:
+    """Check ``data`` against ``model``'s fields and build it unvalidated.
+
+    One pass over the top-level fields checks types and ``ge``/``le`` bounds
+    and fills defaults, so large prompt strings are never revisited. Types are
+    checked strictly: unlike pydantic's lax mode, numeric strings are not
+    coerced. Nested models, such as chat messages, still go through
+    pydantic-core. Unknown keys are ignored, as they are by the models.
+    """
+    return _model_decoder(model)(data)
+
+
+Checker = Callable[[Any], Any]
+
+
+@lru_cache(maxsize=None)
+def _model_decoder(model: Type[ModelT]) -> Callable[[Any], ModelT]:
+    """Compile ``model``'s fields into one decoding closure, built once."""
+    fields = []
+    for name, field in model.model_fields.items():
+        bounds = tuple(
+            (kind, getattr(constraint, kind))
+            for constraint in field.metadata
+            for kind in ("ge", "le")
+            if hasattr(constraint, kind)
+        )
+        default_factory = field.default_factory
+        default = None if default_factory else field.default
+        if default_factory is None and not isinstance(default, _IMMUTABLE):
+            default_factory = field.get_default
+        fields.append(
+            (
+                name,
+                _checker(field.annotation),
+                bounds,
+                field.is_required(),
+                default,
+                default_factory,
+            )
+        )
+
+    def decode(data: Any) -> ModelT:
+        if not isinstance(data, dict):
+            raise RequestDecodeError("expected a JSON object")
+        values = {}
+        fields_set = set()
+        for name, check, bounds, required, default, default_factory in fields:
+            value = data.get(name, _MISSING)
+            if value is _MISSING:
+                if required:
+                    raise RequestDecodeError("Field required", name)
+                values[name] = default_factory() if default_factory else default
+                continue
+            try:
+                value = check(value)
+                if bounds and value is not None:
+                    _check_bounds(value, bounds)
+            except RequestDecodeError as exc:
+                raise exc.within(name)
+            values[name] = value
+            fields_set.add(name)
+        # What model_construct does, minus its per-field default lookups.
+        instance = model.__new__(model)
+        object.__setattr__(instance, "__dict__", values)
+        object.__setattr__(instance, "__pydantic_fields_set__", fields_set)
+        object.__setattr__(instance, "__pydantic_extra__", None)
+        object.__setattr__(instance, "__pydantic_private__", None)
+        return instance
+
+    return decode
+
+
+def _checker(annotation: Any) -> Checker:
+    """Return a function that checks (and lightly normalises) one value."""
+    origin = get_origin(annotation)
+    if origin is Union:
+        options = get_args(annotation)
+        nullable = _NONE_TYPE in options
+        checks = [_checker(option) for option in options if option is not _NONE_TYPE]
+
+        def check_union(value: Any) -> Any:
+            if value is None and nullable:
+                return None
+            for check in checks:
+                try:
+                    return check(value)
+                except RequestDecodeError:
+                    continue
+            raise RequestDecodeError("value does not match any allowed type")
+
+        return check_union
+    if _holds_model(annotation):
+        # Many small objects (chat messages) validate faster in pydantic-core
+        # than in any Python loop; one call covers the whole list.
+        adapter = TypeAdapter(annotation)
+
+        def check_models(value: Any) -> Any:
+            try:
+                return adapter.validate_python(value)
+            except ValidationError as exc:
+                error = exc.errors()[0]
+                param = "".join(
+                    f"[{part}]" if isinstance(part, int) else f".{part}"
+                    for part in error["loc"]
+                ).lstrip(".")
+                raise RequestDecodeError(error["msg"], param or None) from None
+
+        return check_models
+    if origin in _SEQUENCE_ORIGINS:
+        (item_type,) = get_args(annotation)
+        check_item = _checker(item_type)
+
+        def check_list(value: Any) -> Any:
+            if not isinstance(value, list):
+                raise RequestDecodeError("expected an array")
+            if item_type is str and all(isinstance(item, str) for item in value):
+                return value
+            checked = []
+            for index, item in enumerate(value):
+                try:
+                    checked.append(check_item(item))
+                except RequestDecodeError as exc:
+                    raise exc.within(f"[{index}]")
+            return checked
+
+        return check_list
+    if origin is dict or annotation is dict:
+        check_value = _checker(get_args(annotation)[1]) if origin is dict else None
+
+        def check_dict(value: Any) -> Any:
+            if not isinstance(value, dict):
+                raise RequestDecodeError("expected an object")
+            if check_value is None:
+                return value
+            checked = {}
+            for key, item in value.items():
+                try:
+                    checked[key] = check_value(item)
+                except RequestDecodeError as exc:
+                    raise exc.within(key)
+            return checked
+
+        return check_dict
+    if annotation is bool:
+        return _check_bool
+    if annotation is int:
+        return _check_int
+    if annotation is float:
+        return _check_float
+    if annotation is str:
+        return _check_str
+    return lambda value: value
+
+
+def _holds_model(annotation: Any) -> bool:
+    if get_origin(annotation) in _SEQUENCE_ORIGINS:
+        annotation = get_args(annotation)[0]
+    return isinstance(annotation, type) and issubclass(annotation, BaseModel)
+
+
+def _check_bool(value: Any) -> bool:
+    if isinstance(value, bool):
+        return value
+    raise RequestDecodeError("expected a boolean")
+
+
+def _check_int(value: Any) -> int:
+    if isinstance(value, int) and not isinstance(value, bool):
+        return value
+    if isinstance(value, float) and value.is_integer():
+        return int(value)
+    raise RequestDecodeError("expected an integer")
+
+
+def _check_float(value: Any) -> float:
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    raise RequestDecodeError("expected a number")
+
+
+def _check_str(value: Any) -> str:
+    if isinstance(value, str):
+        return value
+    raise RequestDecodeError("expected a string")
+
+
+def _check_bounds(value: Any, bounds: Tuple[Tuple[str, Any], ...]) -> None:
+    for kind, limit in bounds:
+        if kind == "ge" and value < limit:
+            raise RequestDecodeError(f"must be greater than or equal to {limit}")
+        if kind == "le" and value > limit:
+            raise RequestDecodeError(f"must be less than or equal to {limit}")
@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""HTTP side of fault injection: error replies and faulty SSE streams."""
+
+# Standard library imports
+from typing import AsyncGenerator, Optional, Tuple
+
+# Third-party imports
+from fastapi.responses import JSONResponse
+
+# Local/application imports
+from src.config import settings
+from src.engine.faults import FaultPlan, inject_stream_fault
+
+# Cut off mid-object, so any JSON parser on the client rejects it.
+MALFORMED_FRAME = b'data: {"id": "malformed", "choices": [{"index": 0, "te\n\n'
+
+
+def fault_error_response() -> JSONResponse:
+    """Reply for an injected ``error`` fault, in OpenAI's error format."""
+    return JSONResponse(
+        status_code=settings.fault_error_status,
+        content={
+            "error": {
+                "message": "Injected server error",
+                "type": "server_error",
+                "param": None,
+                "code": None,
+            }
+        },
+    )
+
+
+def sse_with_fault(
+    fault: Optional[FaultPlan], frames: AsyncGenerator[Tuple[bytes, int], None]
+) -> AsyncGenerator[bytes, None]:
+    """Wrap an SSE generator with its stream fault; healthy streams pass as-is.
+
+    ``frames`` yields each frame with the number of tokens it carries, so the
+    fault fires after ``after_tokens`` tokens, as it does over gRPC, however
+    the tokens were coalesced and without counting usage or ``[DONE]`` frames.
+    """
+    if fault is not None and fault.kind != "error":
+        frames = inject_stream_fault(
+            fault, frames, (MALFORMED_FRAME, 0), tokens_of=lambda pair: pair[1]
+        )
+    return _frame_bytes(frames)
+
+
+async def _frame_bytes(
+    frames: AsyncGenerator[Tuple[bytes, int], None],
+) -> AsyncGenerator[bytes, None]:
+    try:
+        async for frame, _ in frames:
+            yield frame
+    finally:
+        await frames.aclose()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""LRU cache of encoded non-streaming response bodies."""
+
+# Standard library imports
+import time
+from typing import Dict, Hashable, Optional, Union
+
+# Third-party imports
+import orjson
+
+# Local/application imports
+from src.config import settings
+from src.generators.dummy_generator import DummyTextGenerator
+from src.generators.response_builder import ResponseBuilder
+from src.models import ChatCompletionRequest, CompletionRequest
+from src.utils.lru import LRUCache
+from src.utils.rng import RequestRng
+
+# Placeholders with the exact width of the values patched over them:
+# ``cmpl-`` plus 24 hex digits, and a ten-digit Unix timestamp.
+_ID_SLOT = "cmpl-" + "0" * 24
+_CREATED_SLOT = 1_000_000_000
+
+
+class CachedBody:
+    """An encoded body split around its ``id`` and ``created`` slots."""
+
+    __slots__ = ("_head", "_middle", "_tail", "completion_tokens")
+
+    def __init__(self, payload: dict, completion_tokens: int) -> None:
+        body = orjson.dumps(dict(payload, id=_ID_SLOT, created=_CREATED_SLOT))
+        id_slot = orjson.dumps(_ID_SLOT)
+        created_slot = b'"created":%d' % _CREATED_SLOT
+        head, rest = body.split(id_slot, 1)
+        middle, tail = rest.split(created_slot, 1)
+        self._head = head
+        self._middle = middle + b'"created":'
+        self._tail = tail
+        self.completion_tokens = completion_tokens
+
+    def render(self) -> bytes:
+        """Copy the body with a fresh id and the current timestamp."""
+        return b"".join(
+            (
+                self._head,
+                b'"%s"' % ResponseBuilder.completion_id().encode("ascii"),
+                self._middle,
+                b"%010d" % int(time.time()),
+                self._tail,
+            )
+        )
+
+
+class ResponseCache:
+    """Whole-response byte cache keyed by everything that shapes the body.
+
+    Without logprobs or an output length distribution, a non-streaming
+    body is fixed by the model, ``max_tokens``, stop strings, the pool
+    entry each choice starts from, and the prompt and cached token counts;
+    only ``id`` and ``created`` differ between requests. A hit is then a
+    copy of the stored bytes with those two fixed-width fields patched in.
+    """
+
+    def __init__(self, maxsize: int) -> None:
+        self.maxsize = maxsize
+        self._entries: LRUCache[CachedBody] = LRUCache(maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    def key(
+        self,
+        endpoint: str,
+        request: Union[CompletionRequest, ChatCompletionRequest],
+        rng: RequestRng,
+        choices: int,
+        prompt_tokens: int,
+        cached_tokens: Optional[int],
+    ) -> Optional[Hashable]:
+        """Cache key for a response without logprobs, or None to skip caching."""
+        return response_key(
+            endpoint, request, rng, choices, prompt_tokens, cached_tokens, self.maxsize
+        )
+
+    def get(self, key: Hashable) -> Optional[CachedBody]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def put(self, key: Hashable, payload: dict, completion_tokens: int) -> CachedBody:
+        """Encode and store ``payload``; the entry also serves this request."""
+        entry = CachedBody(payload, completion_tokens)
+        self._entries.put(key, entry)
+        return entry
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+def response_key(
+    endpoint: str,
+    request: Union[CompletionRequest, ChatCompletionRequest],
+    rng: RequestRng,
+    choices: int,
+    prompt_tokens: Optional[int],
+    cached_tokens: Optional[int],
+    maxsize: int,
+) -> Optional[Hashable]:
+    """Key of everything that fixes a response's text, or None if it is random.
+
+    Every choice draws its own pool entry, so unseeded requests are only keyed
+    when all combinations fit in ``maxsize`` entries; otherwise ``n > 1``
+    would churn the cache without ever hitting.
+    """
+    starts = DummyTextGenerator.choice_starts(rng, choices)
+    if starts is None:
+        return None
+    combinations = DummyTextGenerator.SOURCE.start_count**choices
+    if not rng.seeded and combinations > maxsize:
+        return None
+    return (
+        endpoint,
+        request.model,
+        request.max_tokens,
+        stop_key(request.stop),
+        starts,
+        prompt_tokens,
+        cached_tokens,
+    )
+
+
+def stop_key(stop: Optional[object]) -> Optional[Hashable]:
+    """Hashable form of a request's ``stop`` field."""
+    if stop is None or isinstance(stop, str):
+        return stop
+    return tuple(stop)
+
+
+def load_response_cache() -> Optional[ResponseCache]:
+    """Return the configured cache, or None when it is disabled."""
+    if settings.response_cache_size <= 0:
+        return None
+    return ResponseCache(settings.response_cache_size)
+
+
+response_cache = load_response_cache()
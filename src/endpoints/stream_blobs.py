@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Pre-rendered SSE streams replayed in large slices when streaming has no delay."""
+
+# Standard library imports
+import json
+import re
+import time
+from typing import AsyncGenerator, AsyncIterator, Dict, Hashable, List, Optional, Union
+
+# Local/application imports
+from src.config import settings
+from src.endpoints.response_cache import response_key
+from src.generators.dummy_generator import DummyTextGenerator
+from src.generators.sse_frames import DONE_FRAME
+from src.models import ChatCompletionRequest, CompletionRequest
+from src.utils.lru import LRUCache
+from src.utils.rng import RequestRng
+
+# Every chunk of a stream opens with the same id, object and created fields;
+# the object name is the only part that differs between the endpoints.
+_SLOT_TAIL = rb'", "object": "([^"]+)", "created": \d+'
+
+
+class StreamBlob:
+    """One recorded stream kept as a single buffer, split around its id slots.
+
+    The segments are zero-copy views into the recorded bytes, so a replay is
+    a single ``join`` of the segments with the new ``id``/``created`` slot.
+    """
+
+    __slots__ = ("_segments", "_object", "size", "completion_tokens")
+
+    def __init__(self, frames: List[bytes], completion_id: str) -> None:
+        blob = b"".join(frames)
+        view = memoryview(blob)
+        pattern = re.compile(
+            re.escape(b'"id": "%s' % completion_id.encode()) + _SLOT_TAIL
+        )
+        segments = []
+        start = 0
+        for match in pattern.finditer(blob):
+            segments.append(view[start : match.start()])
+            start = match.end()
+            self._object = match.group(1)
+        segments.append(view[start:])
+        self._segments = segments
+        self.size = len(blob)
+        # The last chunk before [DONE] carries the usage for the whole stream.
+        final_chunk = json.loads(frames[-2][len(b"data: ") :])
+        self.completion_tokens = final_chunk["usage"]["completion_tokens"]
+
+    def render(self, completion_id: str) -> bytes:
+        """Copy the stream with ``completion_id`` and the current timestamp."""
+        slot = b'"id": "%s", "object": "%s", "created": %d' % (
+            completion_id.encode(),
+            self._object,
+            int(time.time()),
+        )
+        return slot.join(self._segments)
+
+    async def slices(
+        self, completion_id: str, slice_bytes: int
+    ) -> AsyncIterator[memoryview]:
+        data = memoryview(self.render(completion_id))
+        for start in range(0, len(data), slice_bytes):
+            yield data[start : start + slice_bytes]
+
+
+class StreamBlobCache:
+    """Whole-stream byte cache for streaming without any artificial delay.
+
+    With no TTFT, token delay or other pacing, a stream's frames are fixed by
+    the same fields that fix a non-streaming body (see ``ResponseCache``), so
+    the first request for a key is recorded as it streams and later ones
+    replay the bytes in ``slice_bytes`` pieces instead of one frame per
+    token, with only ``id`` and ``created`` patched.
+    """
+
+    def __init__(self, maxsize: int, slice_bytes: int = 1 << 16) -> None:
+        self.maxsize = maxsize
+        self.slice_bytes = max(1, slice_bytes)
+        self._entries: LRUCache[StreamBlob] = LRUCache(maxsize)
+        self.hits = 0
+        self.misses = 0
+
+    def key(
+        self,
+        endpoint: str,
+        request: Union[CompletionRequest, ChatCompletionRequest],
+        rng: RequestRng,
+        choices: int,
+        prompt_tokens: Optional[int],
+        cached_tokens: Optional[int],
+    ) -> Optional[Hashable]:
+        """Cache key for a stream without logprobs, or None to stream it live."""
+        # A stream without choices is only ``[DONE]``; nothing worth replaying.
+        if choices < 1 or not DummyTextGenerator.streams_instantly():
+            return None
+        return response_key(
+            endpoint, request, rng, choices, prompt_tokens, cached_tokens, self.maxsize
+        )
+
+    def get(self, key: Hashable) -> Optional[StreamBlob]:
+        entry = self._entries.get(key)
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    async def record(
+        self, key: Hashable, completion_id: str, frames: AsyncGenerator[bytes, None]
+    ) -> AsyncGenerator[bytes, None]:
+        """Pass ``frames`` through, storing them once the stream completes."""
+        recorded = []
+        try:
+            async for frame in frames:
+                recorded.append(frame)
+                yield frame
+        finally:
+            # Run the source's own cleanup (metrics, engine slots) right away.
+            await frames.aclose()
+        # Only complete streams are kept: a usage chunk, then ``[DONE]``.
+        if len(recorded) >= 2 and recorded[-1] == DONE_FRAME:
+            self._entries.put(key, StreamBlob(recorded, completion_id))
+
+    def replay(self, blob: StreamBlob, completion_id: str) -> AsyncIterator[memoryview]:
+        return blob.slices(completion_id, self.slice_bytes)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "entries": len(self._entries),
+            "bytes": sum(blob.size for blob in self._entries.values()),
+            "hits": self.hits,
+            "misses": self.misses,
+        }
+
+
+def load_stream_blobs() -> Optional[StreamBlobCache]:
+    """Return the configured cache, or None when it is disabled."""
+    if settings.stream_blob_cache_size <= 0:
+        return None
+    return StreamBlobCache(
+        settings.stream_blob_cache_size, settings.stream_blob_slice_bytes
+    )
+
+
+stream_blobs = load_stream_blobs()
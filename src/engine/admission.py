@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Admission control: bounded concurrency with a bounded wait queue."""
+
+# Standard library imports
+import asyncio
+import math
+from collections import deque
+from typing import Callable, Deque, Dict, Optional
+
+# Local/application imports
+from src.config import settings
+from src.engine.step_loop import engine_step_loop
+
+
+class AdmissionRejected(Exception):
+    """Raised when both the active slots and the wait queue are full."""
+
+    def __init__(self, retry_after_seconds: float) -> None:
+        super().__init__("Server is at capacity, please retry later")
+        self.retry_after_seconds = retry_after_seconds
+
+    @property
+    def retry_after(self) -> str:
+        """Whole seconds for a ``Retry-After`` header, at least one."""
+        return str(max(1, math.ceil(self.retry_after_seconds)))
+
+
+class AdmissionController:
+    """Caps in-flight generation requests and how many may wait for a slot.
+
+    Up to ``max_active`` requests run at once; the next ``max_queued`` wait
+    in FIFO order and anything beyond that is rejected immediately, so an
+    overloaded server sheds load instead of piling work onto the event
+    loop. A released slot is handed straight to the oldest waiter. Readiness
+    flips to false once the queue, including streams waiting in the engine
+    scheduler, reaches ``ready_queue_depth``. Zero disables each limit.
+    """
+
+    def __init__(
+        self,
+        max_active: int = 0,
+        max_queued: int = 0,
+        ready_queue_depth: int = 0,
+        retry_after_seconds: float = 1.0,
+        engine_queue_depth: Optional[Callable[[], int]] = None,
+    ) -> None:
+        self.max_active = max(0, max_active)
+        self.max_queued = max(0, max_queued)
+        self.ready_queue_depth = max(0, ready_queue_depth)
+        self.retry_after_seconds = retry_after_seconds
+        self._engine_queue_depth = engine_queue_depth
+        self._waiters: Deque["asyncio.Future[None]"] = deque()
+        self.active = 0
+        self.rejected = 0
+
+    @property
+    def queued(self) -> int:
+        return len(self._waiters)
+
+    @property
+    def queue_depth(self) -> int:
+        depth = len(self._waiters)
+        if self._engine_queue_depth is not None:
+            depth += self._engine_queue_depth()
+        return depth
+
+    def is_ready(self) -> bool:
+        return not self.ready_queue_depth or self.queue_depth < self.ready_queue_depth
+
+    async def acquire(self) -> None:
+        """Take a slot, waiting in the queue if allowed; raise if both are full."""
+        if not self.max_active or (self.active < self.max_active and not self._waiters):
+            self.active += 1
+            return
+        if len(self._waiters) >= self.max_queued:
+            self.rejected += 1
+            raise AdmissionRejected(self.retry_after_seconds)
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await waiter
+        except asyncio.CancelledError:
+            if waiter.done() and not waiter.cancelled():
+                # The slot was handed over just as we gave up: pass it on.
+                self.release()
+            elif waiter in self._waiters:
+                self._waiters.remove(waiter)
+            raise
+
+    def release(self) -> None:
+        """Return a slot, handing it to the oldest waiter if there is one."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.active -= 1
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "active_requests": self.active,
+            "queued_requests": len(self._waiters),
+            "rejected_total": self.rejected,
+        }
+
+
+admission_controller = AdmissionController(
+    max_active=settings.max_active_requests,
+    max_queued=settings.max_queued_requests,
+    ready_queue_depth=settings.ready_queue_depth,
+    retry_after_seconds=settings.retry_after_seconds,
+    engine_queue_depth=lambda: engine_step_loop.waiting_sequences,
+)
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Group streamed tokens into frames by count and time window."""
+
+# Standard library imports
+import asyncio
+import time
+from typing import AsyncIterable, AsyncIterator, List, Optional
+
+# Local/application imports
+from src.config import settings
+
+
+class TokenCoalescer:
+    """Batch a token stream into frames, like vLLM's ``stream_interval``.
+
+    A frame is flushed once it holds ``interval`` tokens or ``window_seconds``
+    have passed since the previous flush, whichever comes first, even while
+    the next token is still pending; the first token always goes out alone so
+    TTFT is unchanged. Tokens are never split across frames. The time a
+    flushed frame takes to be consumed is the transport's backpressure
+    signal: when a send blocks for longer than ``backlog_seconds`` (the
+    socket write buffer is full), the count limit doubles up to
+    ``max_interval``, and it halves back once sends are quick.
+    """
+
+    def __init__(
+        self,
+        interval: int = 1,
+        window_seconds: float = 0.0,
+        max_interval: Optional[int] = None,
+        backlog_seconds: float = 0.005,
+    ) -> None:
+        self.interval = max(1, interval)
+        self.window_seconds = max(0.0, window_seconds)
+        self.max_interval = max(self.interval, max_interval or self.interval * 16)
+        self.backlog_seconds = backlog_seconds
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 1 or self.window_seconds > 0.0
+
+    async def batches(self, tokens: AsyncIterable[str]) -> AsyncIterator[List[str]]:
+        if not self.enabled:
+            async for token in tokens:
+                yield [token]
+            return
+
+        iterator = tokens.__aiter__()
+        pending: Optional["asyncio.Future[str]"] = None
+        buffer: List[str] = []
+        limit = self.interval
+        window = self.window_seconds
+        first = True
+        last_flush = time.monotonic()
+        try:
+            while True:
+                expired = False
+                try:
+                    if buffer and window:
+                        # Wait for the next token only until the window ends,
+                        # so a stalled token cannot hold back buffered ones.
+                        if pending is None:
+                            pending = asyncio.ensure_future(iterator.__anext__())
+                        remaining = last_flush + window - time.monotonic()
+                        if remaining > 0:
+                            await asyncio.wait((pending,), timeout=remaining)
+                        expired = not pending.done()
+                        if not expired:
+                            token, pending = pending.result(), None
+                    elif pending is not None:
+                        token, pending = await pending, None
+                    else:
+                        token = await iterator.__anext__()
+                except StopAsyncIteration:
+                    pending = None
+                    break
+                if not expired:
+                    buffer.append(token)
+                now = time.monotonic()
+                if (
+                    expired
+                    or first
+                    or len(buffer) >= limit
+                    or (window and now - last_flush >= window)
+                ):
+                    first = False
+                    batch, buffer = buffer, []
+                    yield batch
+                    last_flush = time.monotonic()
+                    if last_flush - now > self.backlog_seconds:
+                        limit = min(limit * 2, self.max_interval)
+                    elif limit > self.interval:
+                        limit = max(self.interval, limit // 2)
+        finally:
+            if pending is not None:
+                pending.cancel()
+        if buffer:
+            yield buffer
+
+
+def load_token_coalescer(interval: int) -> TokenCoalescer:
+    return TokenCoalescer(
+        interval=interval,
+        window_seconds=settings.stream_interval_seconds,
+    )
+
+
+token_coalescer = load_token_coalescer(settings.stream_interval)
+# gRPC keeps honouring its older chunk size setting.
+grpc_token_coalescer = load_token_coalescer(
+    max(settings.stream_interval, settings.grpc_stream_chunk_size)
+)
@@ -0,0 +1,115 @@
+#!/usr/bin/env python3
+"""Heavy-tailed TTFT and inter-token latency drawn as per-stream schedules."""
+
+# Standard library imports
+import math
+from dataclasses import dataclass
+from typing import List, Optional, Tuple
+
+# Third-party imports
+import numpy as np
+
+# Local/application imports
+from src.config import settings
+from src.utils.rng import RequestRng
+
+DELAY_DISTRIBUTIONS = ("constant", "uniform", "lognormal", "pareto")
+
+# Child stream of the request RNG reserved for delay schedules.
+_DELAY_STREAM = 0xDE1A
+
+
+@dataclass(frozen=True)
+class DelayDistribution:
+    """One delay distribution described by its mean and spread in seconds.
+
+    ``stddev`` is the standard deviation for ``uniform`` and ``lognormal``;
+    ``pareto`` is instead shaped by ``alpha`` (smaller is heavier-tailed) and
+    scaled so its mean matches ``mean``.
+    """
+
+    kind: str
+    mean: float
+    stddev: float = 0.0
+    alpha: float = 2.5
+
+    def __post_init__(self) -> None:
+        if self.kind not in DELAY_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown delay distribution '{self.kind}', "
+                f"expected one of {', '.join(DELAY_DISTRIBUTIONS)}"
+            )
+        if self.kind == "pareto" and self.alpha <= 1.0:
+            raise ValueError("Pareto delays need alpha > 1 to have a finite mean")
+
+    def draw(self, generator: np.random.Generator, size: int) -> np.ndarray:
+        mean = max(0.0, self.mean)
+        if self.kind == "constant" or mean == 0.0:
+            return np.full(size, mean)
+        if self.kind == "uniform":
+            half_width = self.stddev * math.sqrt(3.0)
+            return generator.uniform(mean - half_width, mean + half_width, size)
+        if self.kind == "lognormal":
+            sigma = math.sqrt(math.log1p((self.stddev / mean) ** 2))
+            mu = math.log(mean) - sigma * sigma / 2.0
+            return generator.lognormal(mu, sigma, size)
+        scale = mean * (self.alpha - 1.0) / self.alpha
+        return (generator.pareto(self.alpha, size) + 1.0) * scale
+
+
+@dataclass(frozen=True)
+class LatencyProfile:
+    """TTFT and inter-token distributions plus an independent stall mixture.
+
+    Each gap is a draw from ``itl``, and with ``stall_probability`` it also
+    carries a ``stall_seconds`` pause, modelling preemption, GC or scheduler
+    hiccups. A stream's whole schedule comes from one NumPy batch seeded by
+    the request RNG, so nothing random happens per token and seeded requests
+    replay the same delays.
+    """
+
+    ttft: DelayDistribution
+    itl: DelayDistribution
+    stall_probability: float = 0.0
+    stall_seconds: float = 0.2
+
+    def schedule(self, rng: RequestRng, tokens: int) -> Tuple[float, List[float]]:
+        """Return the TTFT and one gap per token for a stream."""
+        generator = np.random.default_rng(rng.child(_DELAY_STREAM).next_u64())
+        ttft = float(self.ttft.draw(generator, 1)[0])
+        gaps = self.itl.draw(generator, max(0, tokens))
+        if self.stall_probability > 0.0:
+            stalls = generator.random(len(gaps)) < self.stall_probability
+            gaps = gaps + stalls * self.stall_seconds
+        return max(0.0, ttft), np.maximum(gaps, 0.0).tolist()
+
+
+def load_latency_profile() -> Optional[LatencyProfile]:
+    """Return the configured profile, or None to keep the flat token delay."""
+    if (
+        not settings.ttft_distribution
+        and not settings.itl_distribution
+        and settings.stall_probability <= 0.0
+    ):
+        return None
+    return LatencyProfile(
+        ttft=DelayDistribution(
+            settings.ttft_distribution or "constant",
+            settings.ttft_delay_seconds,
+            settings.ttft_stddev_seconds,
+            settings.pareto_alpha,
+        ),
+        itl=DelayDistribution(
+            settings.itl_distribution or "uniform",
+            settings.token_delay_seconds,
+            # The flat jitter is uniform on +/- jitter: stddev = jitter / sqrt(3).
+            settings.itl_stddev_seconds
+            or settings.token_delay_jitter_seconds / math.sqrt(3.0),
+            settings.pareto_alpha,
+        ),
+        stall_probability=settings.stall_probability,
+        stall_seconds=settings.stall_seconds,
+    )
+
+
+latency_profile = load_latency_profile()
@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Seedable fault injection for unary calls and token streams."""
+
+# Standard library imports
+import asyncio
+from dataclasses import dataclass
+from typing import AsyncGenerator, Callable, Dict, Optional, Tuple, TypeVar
+
+# Local/application imports
+from src.config import settings
+from src.utils.rng import RequestRng
+
+FAULT_KINDS = ("error", "reset", "malformed", "stall", "truncate")
+
+T = TypeVar("T")
+
+
+class StreamReset(Exception):
+    """Raised mid-stream to drop the connection without a clean end."""
+
+
+@dataclass(frozen=True)
+class FaultPlan:
+    """The fault, if any, chosen for one request."""
+
+    kind: str
+    after_tokens: int = 0
+    stall_seconds: float = 0.0
+
+
+class FaultInjector:
+    """Draw at most one fault per request from fixed per-kind rates.
+
+    Plans come from a single seeded generator, so the same seed and request
+    order reproduce the same schedule. ``error`` fails the call before any
+    output (HTTP 5xx, gRPC ``UNAVAILABLE``); the stream faults fire once
+    ``after_tokens`` tokens have been sent: ``reset`` drops the connection,
+    ``malformed`` slips in one broken frame, ``stall`` pauses for
+    ``stall_seconds`` and ``truncate`` ends the stream without its final
+    chunk or ``[DONE]``. Unary calls only see ``error`` and ``stall``.
+    """
+
+    def __init__(
+        self,
+        rates: Optional[Dict[str, float]] = None,
+        after_tokens: int = 8,
+        stall_seconds: float = 30.0,
+        seed: int = 0,
+    ) -> None:
+        rates = rates or {}
+        unknown = set(rates) - set(FAULT_KINDS)
+        if unknown:
+            raise ValueError(f"Unknown fault kinds: {', '.join(sorted(unknown))}")
+        self._thresholds: Tuple[Tuple[float, str], ...] = ()
+        total = 0.0
+        for kind in FAULT_KINDS:
+            rate = max(0.0, rates.get(kind, 0.0))
+            if rate:
+                total += rate
+                self._thresholds += ((total, kind),)
+        if total > 1.0:
+            raise ValueError("Fault rates must add up to at most 1")
+        self.after_tokens = max(0, after_tokens)
+        self.stall_seconds = max(0.0, stall_seconds)
+        self._rng = RequestRng.for_request(seed)
+        self.injected = {kind: 0 for kind in FAULT_KINDS}
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._thresholds)
+
+    def plan(self) -> Optional[FaultPlan]:
+        """Return this request's fault, or None for a healthy request."""
+        if not self._thresholds:
+            return None
+        draw = self._rng.random()
+        for threshold, kind in self._thresholds:
+            if draw < threshold:
+                self.injected[kind] += 1
+                return FaultPlan(kind, self.after_tokens, self.stall_seconds)
+        return None
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.injected)
+
+
+async def inject_stream_fault(
+    plan: FaultPlan,
+    stream: AsyncGenerator[T, None],
+    malformed: T,
+    tokens_of: Callable[[T], int] = lambda item: 1,
+) -> AsyncGenerator[T, None]:
+    """Relay ``stream`` and fire ``plan`` once ``after_tokens`` have passed."""
+    sent = 0
+    fired = plan.kind == "error"
+    try:
+        async for item in stream:
+            if not fired and sent >= plan.after_tokens:
+                fired = True
+                if plan.kind == "reset":
+                    raise StreamReset("Injected connection reset")
+                if plan.kind == "truncate":
+                    return
+                if plan.kind == "stall":
+                    await asyncio.sleep(plan.stall_seconds)
+                elif plan.kind == "malformed":
+                    yield malformed
+            yield item
+            sent += tokens_of(item)
+    finally:
+        # Run the source's own cleanup (metrics, engine slots) right away.
+        await stream.aclose()
+
+
+def load_fault_injector() -> FaultInjector:
+    return FaultInjector(
+        rates={
+            "error": settings.fault_error_rate,
+            "reset": settings.fault_reset_rate,
+            "malformed": settings.fault_malformed_rate,
+            "stall": settings.fault_stall_rate,
+            "truncate": settings.fault_truncate_rate,
+        },
+        after_tokens=settings.fault_after_tokens,
+        stall_seconds=settings.fault_stall_seconds,
+        seed=settings.fault_seed,
+    )
+
+
+fault_injector = load_fault_injector()
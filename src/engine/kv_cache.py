@@ -0,0 +1,67 @@
+#!/usr/bin/env python3
+"""Simulated paged KV-cache block accounting."""
+
+# Standard library imports
+from typing import Optional
+
+# Local/application imports
+from src.config import settings
+
+PREEMPTION_MODES = ("recompute", "swap")
+
+
+class BlockManager:
+    """Fixed pool of KV-cache blocks holding ``block_size`` tokens each.
+
+    Only counts are tracked; which physical block a sequence owns never
+    matters to the simulation, so allocation and release are O(1).
+    """
+
+    def __init__(self, num_blocks: int, block_size: int = 16) -> None:
+        if num_blocks <= 0:
+            raise ValueError("BlockManager requires at least one block")
+        if block_size <= 0:
+            raise ValueError("KV cache block size must be positive")
+        self.num_blocks = num_blocks
+        self.block_size = block_size
+        self.free_blocks = num_blocks
+
+    @property
+    def used_blocks(self) -> int:
+        return self.num_blocks - self.free_blocks
+
+    @property
+    def usage(self) -> float:
+        return self.used_blocks / self.num_blocks
+
+    def blocks_for(self, tokens: int) -> int:
+        """Blocks needed to hold ``tokens``, capped at the whole cache.
+
+        A sequence larger than the cache still gets to run, alone, rather
+        than waiting forever at the head of the queue.
+        """
+        needed = -(-max(tokens, 1) // self.block_size)
+        return min(needed, self.num_blocks)
+
+    def can_allocate(self, blocks: int) -> bool:
+        return blocks <= self.free_blocks
+
+    def allocate(self, blocks: int) -> None:
+        if blocks > self.free_blocks:
+            raise RuntimeError("KV cache has no room for the requested blocks")
+        self.free_blocks -= blocks
+
+    def free(self, blocks: int) -> None:
+        self.free_blocks = min(self.num_blocks, self.free_blocks + blocks)
+
+
+def load_block_manager() -> Optional[BlockManager]:
+    """Return the configured KV cache, or None when it is disabled."""
+    if settings.kv_cache_blocks <= 0:
+        return None
+    if settings.kv_preemption_mode not in PREEMPTION_MODES:
+        raise ValueError(
+            f"Unknown KV preemption mode '{settings.kv_preemption_mode}', "
+            f"expected one of {', '.join(PREEMPTION_MODES)}"
+        )
+    return BlockManager(settings.kv_cache_blocks, settings.kv_block_size)
@@ -0,0 +1,147 @@
+#!/usr/bin/env python3
+"""Load-dependent latency model for prefill (TTFT) and decode steps."""
+
+# Standard library imports
+import argparse
+import asyncio
+import json
+from dataclasses import dataclass
+from typing import Iterable, List, Optional, Tuple
+
+# Third-party imports
+import numpy as np
+
+# Local/application imports
+from src.config import settings
+
+
+@dataclass(frozen=True)
+class LatencyModel:
+    """Linear cost model of a batched inference engine.
+
+    ``ttft = prefill_base + prefill_per_token * (queued prefill + prompt)``
+    treats prefill as serialized work: a request waits for the tokens already
+    being prefilled ahead of it. ``step = decode_base + decode_per_sequence *
+    active`` makes every decode step slower as the running batch grows. The
+    coefficients are plain least-squares fits, see :func:`fit_latency_model`.
+    """
+
+    prefill_base_seconds: float = 0.02
+    prefill_seconds_per_token: float = 0.0001
+    decode_base_seconds: float = 0.015
+    decode_seconds_per_sequence: float = 0.0001
+
+    def ttft_seconds(self, prompt_tokens: int, queued_prefill_tokens: int = 0) -> float:
+        return max(
+            0.0,
+            self.prefill_base_seconds
+            + self.prefill_seconds_per_token * (prompt_tokens + queued_prefill_tokens),
+        )
+
+    def step_seconds(self, active_sequences: int) -> float:
+        return max(
+            0.0,
+            self.decode_base_seconds
+            + self.decode_seconds_per_sequence * max(active_sequences, 1),
+        )
+
+
+class PrefillQueue:
+    """Tracks prompt tokens currently being prefilled across all requests."""
+
+    def __init__(self) -> None:
+        self.queued_tokens = 0
+
+    async def prefill(self, model: LatencyModel, prompt_tokens: int) -> None:
+        """Sleep for this prompt's TTFT given the prefill work queued ahead of it."""
+        delay = model.ttft_seconds(prompt_tokens, self.queued_tokens)
+        self.queued_tokens += prompt_tokens
+        try:
+            await asyncio.sleep(delay)
+        finally:
+            self.queued_tokens -= prompt_tokens
+
+
+def fit_latency_model(
+    ttft_samples: Iterable[Tuple[int, float]],
+    step_samples: Iterable[Tuple[int, float]],
+) -> LatencyModel:
+    """Fit coefficients from measured ``(prefill tokens, ttft)`` and
+    ``(active sequences, inter-token latency)`` pairs.
+
+    Prefill tokens are the request's prompt plus whatever was queued ahead of
+    it (use the prompt alone when measuring one request at a time).
+    """
+    prefill_base, prefill_per_token = _fit_line(ttft_samples)
+    decode_base, decode_per_sequence = _fit_line(step_samples)
+    return LatencyModel(
+        prefill_base_seconds=prefill_base,
+        prefill_seconds_per_token=prefill_per_token,
+        decode_base_seconds=decode_base,
+        decode_seconds_per_sequence=decode_per_sequence,
+    )
+
+
+def load_latency_model() -> Optional[LatencyModel]:
+    """Return the configured latency model, or None when the mode is off."""
+    if not settings.latency_model:
+        return None
+    return LatencyModel(
+        prefill_base_seconds=settings.prefill_base_seconds,
+        prefill_seconds_per_token=settings.prefill_seconds_per_token,
+        decode_base_seconds=settings.decode_base_seconds,
+        decode_seconds_per_sequence=settings.decode_seconds_per_sequence,
+    )
+
+
+latency_model = load_latency_model()
+prefill_queue = PrefillQueue()
+
+
+def _fit_line(samples: Iterable[Tuple[int, float]]) -> Tuple[float, float]:
+    points = np.asarray(list(samples), dtype=np.float64).reshape(-1, 2)
+    if len(points) == 0:
+        raise ValueError("At least one sample is required to fit the latency model")
+    if len(np.unique(points[:, 0])) < 2:
+        # A single load level only pins down the intercept.
+        return float(points[:, 1].mean()), 0.0
+    design = np.column_stack([np.ones(len(points)), points[:, 0]])
+    (intercept, slope), *_ = np.linalg.lstsq(design, points[:, 1], rcond=None)
+    return float(intercept), float(slope)
+
+
+def _read_samples(path: str) -> Tuple[List[Tuple[int, float]], List[Tuple[int, float]]]:
+    """Read JSONL measurements with ``ttft`` or ``itl`` records."""
+    ttft_samples: List[Tuple[int, float]] = []
+    step_samples: List[Tuple[int, float]] = []
+    with open(path, "r", encoding="utf-8") as samples_file:
+        for line in samples_file:
+            if not line.strip():
+                continue
+            record = json.loads(line)
+            if "ttft" in record:
+                prefill = record["prompt_tokens"] + record.get(
+                    "queued_prefill_tokens", 0
+                )
+                ttft_samples.append((prefill, record["ttft"]))
+            if "itl" in record:
+                step_samples.append((record["active_sequences"], record["itl"]))
+    return ttft_samples, step_samples
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Fit latency model coefficients from JSONL measurements with "
+            '{"prompt_tokens", "queued_prefill_tokens", "ttft"} and '
+            '{"active_sequences", "itl"} records (seconds).'
+        )
+    )
+    parser.add_argument("samples", help="JSONL file of measurements")
+    arguments = parser.parse_args()
+    fitted = fit_latency_model(*_read_samples(arguments.samples))
+    print("DUMMY_VLLM_LATENCY_MODEL=true")
+    print(f"DUMMY_VLLM_PREFILL_BASE={fitted.prefill_base_seconds:.6g}")
+    print(f"DUMMY_VLLM_PREFILL_PER_TOKEN={fitted.prefill_seconds_per_token:.6g}")
+    print(f"DUMMY_VLLM_DECODE_BASE={fitted.decode_base_seconds:.6g}")
+    print(f"DUMMY_VLLM_DECODE_PER_SEQUENCE={fitted.decode_seconds_per_sequence:.6g}")
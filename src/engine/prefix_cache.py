@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""Simulated automatic prefix caching over prompt tokens."""
+
+# Standard library imports
+from collections import OrderedDict
+from typing import Hashable, Optional, Sequence
+
+# Local/application imports
+from src.config import settings
+
+_ROOT = 0
+
+
+class PrefixCache:
+    """Radix tree of prompt prefixes with block-sized edges and LRU eviction.
+
+    Each node is one full block of ``block_size`` tokens, identified by the
+    hash of its parent's key and its own tokens, so a node's key names the
+    entire prefix ending at it and the tree is just a dict of keys. Walking a
+    prompt costs one hash and one dict probe per block, independent of how
+    many prefixes are cached.
+
+    A walk touches its nodes deepest first, so every parent is more recently
+    used than its children and the least recently used entry is always a
+    leaf; evicting from the LRU end under the token budget never strands a
+    reachable subtree.
+    """
+
+    def __init__(self, max_tokens: int, block_size: int = 16) -> None:
+        if block_size <= 0:
+            raise ValueError("Prefix cache block size must be positive")
+        self.block_size = block_size
+        self.max_blocks = max(0, max_tokens) // block_size
+        self._nodes: "OrderedDict[int, None]" = OrderedDict()
+        self.hits = 0
+        self.queries = 0
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    @property
+    def cached_tokens(self) -> int:
+        return len(self._nodes) * self.block_size
+
+    def match_and_insert(self, tokens: Sequence[Hashable]) -> int:
+        """Return how many leading prompt tokens were cached, then cache the prompt.
+
+        Only full blocks are cached, and the last prompt token is always
+        recomputed, mirroring how a real engine needs at least one token of
+        prefill to produce logits.
+        """
+        self.queries += 1
+        if self.max_blocks == 0:
+            return 0
+        nodes = self._nodes
+        block_size = self.block_size
+        full_blocks = max(0, len(tokens) - 1) // block_size
+        keys = []
+        matched = 0
+        parent = _ROOT
+        for index in range(full_blocks):
+            start = index * block_size
+            parent = hash((parent, tuple(tokens[start : start + block_size])))
+            keys.append(parent)
+            if matched == index and parent in nodes:
+                matched += 1
+        for key in reversed(keys):
+            if key in nodes:
+                nodes.move_to_end(key)
+            else:
+                nodes[key] = None
+        while len(nodes) > self.max_blocks:
+            nodes.popitem(last=False)
+        if matched:
+            self.hits += 1
+        return matched * block_size
+
+    def stats(self) -> dict:
+        return {
+            "cached_tokens": self.cached_tokens,
+            "max_tokens": self.max_blocks * self.block_size,
+            "queries_total": self.queries,
+            "hits_total": self.hits,
+        }
+
+
+def load_prefix_cache() -> Optional[PrefixCache]:
+    """Return the configured prefix cache, or None when it is disabled."""
+    if settings.prefix_cache_tokens <= 0:
+        return None
+    return PrefixCache(settings.prefix_cache_tokens, settings.kv_block_size)
+
+
+prefix_cache = load_prefix_cache()
@@ -0,0 +1,393 @@
+#!/usr/bin/env python3
+"""Shared decode step loop that paces every streaming sequence together."""
+
+# Standard library imports
+import asyncio
+import heapq
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+
+# Local/application imports
+from src.config import settings
+from src.engine.kv_cache import BlockManager, load_block_manager
+from src.engine.latency import latency_model
+from src.utils.rng import RequestRng
+
+_WAITING = "waiting"
+_RUNNING = "running"
+_FINISHED = "finished"
+
+
+class EngineStepLoop:
+    """Single timer that advances all running sequences one token per tick.
+
+    Modelled on a continuous-batching engine: instead of each stream arming
+    its own ``asyncio.sleep`` per token, the loop sleeps once per step and
+    then resolves one shared future, waking every stream that is waiting for
+    the next token. Streams therefore emit in lockstep bursts, like real
+    batched decoding, and each step's duration may depend on how many
+    sequences are running. The loop task only runs while sequences are
+    registered, is cancelled when the last one leaves, and is (re)created on
+    whichever event loop is current.
+
+    With a :class:`BlockManager`, sequences also hold KV-cache blocks for
+    their prompt and generated tokens, and ``max_num_seqs`` caps how many
+    run at once. New sequences wait in a heap ordered by priority (lower
+    value first, as in vLLM) and then arrival until there is room. A
+    running sequence that needs a block when none are free preempts the
+    lowest-priority, most recently admitted one, which rejoins the queue at
+    its original place and pays a recompute or swap delay on resume. With
+    ``priority_preemption``, a waiting sequence may also evict running ones
+    of strictly lower priority to get in.
+    """
+
+    def __init__(
+        self,
+        step_seconds: Callable[[RequestRng, int], float],
+        block_manager: Optional[BlockManager] = None,
+        resume_seconds: Optional[Callable[[int, int], float]] = None,
+        max_num_seqs: int = 0,
+        priority_preemption: bool = False,
+    ) -> None:
+        self._step_seconds = step_seconds
+        self.block_manager = block_manager
+        self._resume_seconds = resume_seconds
+        self.max_num_seqs = max(0, max_num_seqs)
+        self.priority_preemption = priority_preemption
+        self._rng = RequestRng.for_request(None)
+        self._registered = 0
+        self._arrivals = 0
+        # Insertion order is admission order; preemption victims are taken
+        # from the end among the lowest priority.
+        self._running: Dict["EngineSequence", None] = {}
+        # (priority, arrival, sequence); finished entries are skipped lazily.
+        self._waiting: List[Tuple[int, int, "EngineSequence"]] = []
+        self._waiting_count = 0
+        # Step number -> sequences that need another block before that step.
+        self._block_due: Dict[int, List[Tuple["EngineSequence", int]]] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._task: Optional["asyncio.Task[None]"] = None
+        self._tick: Optional["asyncio.Future[None]"] = None
+        self.steps = 0
+        self.preemptions = 0
+
+    @property
+    def active_sequences(self) -> int:
+        return len(self._running)
+
+    @property
+    def waiting_sequences(self) -> int:
+        return self._waiting_count
+
+    @property
+    def limits_capacity(self) -> bool:
+        """Whether sequences can ever queue, i.e. the loop must admit them."""
+        return self.block_manager is not None or self.max_num_seqs > 0
+
+    def sequence(self, prompt_tokens: int = 0, priority: int = 0) -> "EngineSequence":
+        """Return a context manager that keeps the loop running while entered."""
+        return EngineSequence(self, prompt_tokens, priority)
+
+    def stats(self) -> Dict[str, object]:
+        """Scheduler and KV-cache counters for ``/metrics``."""
+        stats: Dict[str, object] = {
+            "running_sequences": len(self._running),
+            "waiting_sequences": self._waiting_count,
+            "steps_total": self.steps,
+            "preemptions_total": self.preemptions,
+            "kv_cache": None,
+        }
+        manager = self.block_manager
+        if manager is not None:
+            stats["kv_cache"] = {
+                "num_blocks": manager.num_blocks,
+                "block_size": manager.block_size,
+                "used_blocks": manager.used_blocks,
+                "usage": manager.usage,
+            }
+        return stats
+
+    async def next_step(self) -> None:
+        """Wait for the next engine tick."""
+        tick = self._ensure_running()
+        # Shielded so that one cancelled consumer never cancels the shared tick.
+        await asyncio.shield(tick)
+
+    # ------------------------------------------------------------------
+    # Scheduling
+    # ------------------------------------------------------------------
+
+    def _add(self, sequence: "EngineSequence") -> None:
+        self._registered += 1
+        self._arrivals += 1
+        sequence.arrival = self._arrivals
+        self._enqueue(sequence)
+        self._schedule_waiting()
+        self._ensure_running()
+
+    def _enqueue(self, sequence: "EngineSequence") -> None:
+        heapq.heappush(self._waiting, (sequence.priority, sequence.arrival, sequence))
+        self._waiting_count += 1
+
+    def _peek_waiting(self) -> Optional["EngineSequence"]:
+        waiting = self._waiting
+        while waiting and waiting[0][2].state != _WAITING:
+            heapq.heappop(waiting)
+        return waiting[0][2] if waiting else None
+
+    def _finish(self, sequence: "EngineSequence") -> None:
+        self._registered -= 1
+        if sequence.state == _RUNNING:
+            del self._running[sequence]
+            if self.block_manager is not None:
+                self.block_manager.free(sequence.blocks)
+        elif sequence.state == _WAITING:
+            # Its heap entry is dropped when it reaches the top.
+            self._waiting_count -= 1
+        sequence.state = _FINISHED
+        self._schedule_waiting()
+        if self._registered == 0 and self._task is not None:
+            # Nothing left to pace: drop the pending timer right away.
+            self._task.cancel()
+            self._task = None
+
+    def _schedule_waiting(self) -> None:
+        """Admit queued sequences in priority order while there is room."""
+        manager = self.block_manager
+        while True:
+            sequence = self._peek_waiting()
+            if sequence is None:
+                return
+            blocks = 0
+            if manager is not None:
+                # Room for the prompt (or recomputed context) and the next token.
+                blocks = manager.blocks_for(sequence.tokens + 1)
+            free_blocks = manager.free_blocks if manager is not None else 0
+            if not self._has_room(blocks, free_blocks, len(self._running)):
+                if not (self.priority_preemption and self._evict_for(sequence, blocks)):
+                    return
+            if manager is not None:
+                manager.allocate(blocks)
+            heapq.heappop(self._waiting)
+            self._waiting_count -= 1
+            self._admit(sequence, blocks)
+
+    def _has_room(self, blocks: int, free_blocks: int, running: int) -> bool:
+        if self.max_num_seqs and running >= self.max_num_seqs:
+            return False
+        return self.block_manager is None or blocks <= free_blocks
+
+    def _evict_for(self, sequence: "EngineSequence", blocks: int) -> bool:
+        """Preempt strictly lower-priority sequences if that makes room."""
+        free_blocks = self.block_manager.free_blocks if self.block_manager else 0
+        running = len(self._running)
+        victims = []
+        for victim in self._victims():
+            if victim.priority <= sequence.priority:
+                break
+            victims.append(victim)
+            free_blocks += victim.blocks
+            running -= 1
+            if self._has_room(blocks, free_blocks, running):
+                for evicted in victims:
+                    self._preempt(evicted, self.steps + 1)
+                return True
+        return False
+
+    def _victims(self) -> Iterator["EngineSequence"]:
+        """Running sequences, lowest priority and most recently admitted first."""
+        # sorted() is stable, so reversed admission order breaks priority ties.
+        return iter(
+            sorted(reversed(self._running), key=lambda seq: seq.priority, reverse=True)
+        )
+
+    def _admit(self, sequence: "EngineSequence", blocks: int) -> None:
+        sequence.state = _RUNNING
+        sequence.blocks = blocks
+        sequence.decode_step = None
+        sequence.admitted_tokens = sequence.tokens
+        sequence.epoch += 1
+        self._running[sequence] = None
+        if sequence.preempted and self._resume_seconds is not None:
+            sequence.resume_delay = self._resume_seconds(sequence.tokens, blocks)
+        if sequence.admitted is not None and not sequence.admitted.done():
+            sequence.admitted.set_result(None)
+
+    def _start_decode(self, sequence: "EngineSequence") -> None:
+        """Count generated tokens from now, past any prefill or resume delay."""
+        sequence.decode_step = self.steps
+        if self.block_manager is not None:
+            self._schedule_block(sequence, self.steps + 1)
+
+    def _schedule_block(self, sequence: "EngineSequence", not_before: int) -> None:
+        capacity = sequence.blocks * self.block_manager.block_size
+        due = sequence.decode_step + capacity - sequence.admitted_tokens + 1
+        self._block_due.setdefault(max(due, not_before), []).append(
+            (sequence, sequence.epoch)
+        )
+
+    def _grow(self, step: int) -> None:
+        """Give a block to every running sequence whose cache fills at ``step``."""
+        manager = self.block_manager
+        for sequence, epoch in self._block_due.pop(step, ()):
+            if sequence.state != _RUNNING or sequence.epoch != epoch:
+                continue
+            while not manager.can_allocate(1):
+                victim = next(self._victims())
+                if victim is sequence and len(self._running) == 1:
+                    # Alone and still too big: let it overrun the cache.
+                    break
+                self._preempt(victim, step)
+                if victim is sequence:
+                    break
+            if sequence.state != _RUNNING:
+                continue
+            if manager.can_allocate(1):
+                manager.allocate(1)
+                sequence.blocks += 1
+            sequence.admitted_tokens = sequence.tokens_at(step - 1)
+            sequence.decode_step = step - 1
+            self._schedule_block(sequence, step + 1)
+
+    def _preempt(self, sequence: "EngineSequence", step: int) -> None:
+        sequence.tokens = sequence.tokens_at(step - 1)
+        del self._running[sequence]
+        if self.block_manager is not None:
+            self.block_manager.free(sequence.blocks)
+        sequence.blocks = 0
+        sequence.state = _WAITING
+        sequence.preempted = True
+        sequence.admitted = None
+        # Same priority and arrival as before, so it keeps its place in line.
+        self._enqueue(sequence)
+        self.preemptions += 1
+
+    # ------------------------------------------------------------------
+    # Timer
+    # ------------------------------------------------------------------
+
+    def _ensure_running(self) -> "asyncio.Future[None]":
+        loop = asyncio.get_running_loop()
+        if self._loop is not loop or self._task is None or self._task.done():
+            self._loop = loop
+            self._tick = loop.create_future()
+            self._task = loop.create_task(self._run())
+        assert self._tick is not None
+        return self._tick
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while self._loop is loop:
+            await asyncio.sleep(self._step_seconds(self._rng, len(self._running)))
+            if self.block_manager is not None:
+                self._grow(self.steps + 1)
+                self._schedule_waiting()
+            tick, self._tick = self._tick, loop.create_future()
+            self.steps += 1
+            if tick is not None and not tick.done():
+                tick.set_result(None)
+
+
+class EngineSequence:
+    """One streaming sequence registered with an :class:`EngineStepLoop`."""
+
+    __slots__ = (
+        "_engine",
+        "priority",
+        "arrival",
+        "tokens",
+        "blocks",
+        "state",
+        "admitted",
+        "decode_step",
+        "admitted_tokens",
+        "epoch",
+        "preempted",
+        "resume_delay",
+    )
+
+    def __init__(
+        self, engine: EngineStepLoop, prompt_tokens: int, priority: int = 0
+    ) -> None:
+        self._engine = engine
+        self.priority = priority
+        self.arrival = 0
+        self.tokens = max(0, prompt_tokens)
+        self.blocks = 0
+        self.state = _WAITING
+        self.admitted: Optional["asyncio.Future[None]"] = None
+        # Step decoding (re)started from; None until the first ``step()``.
+        self.decode_step: Optional[int] = None
+        self.admitted_tokens = self.tokens
+        self.epoch = 0
+        self.preempted = False
+        self.resume_delay = 0.0
+
+    async def __aenter__(self) -> "EngineSequence":
+        self._engine._add(self)
+        return self
+
+    async def __aexit__(self, *exc_info: object) -> None:
+        self._engine._finish(self)
+
+    def tokens_at(self, step: int) -> int:
+        """Prompt plus generated tokens once ``step`` has run."""
+        if self.decode_step is None:
+            return self.admitted_tokens
+        return self.admitted_tokens + max(0, step - self.decode_step)
+
+    async def wait_running(self) -> None:
+        """Wait in the queue until scheduled, then pay any preemption delay."""
+        while self.state == _WAITING:
+            if self.admitted is None:
+                self.admitted = asyncio.get_running_loop().create_future()
+            await asyncio.shield(self.admitted)
+        if self.resume_delay > 0.0:
+            delay, self.resume_delay = self.resume_delay, 0.0
+            await asyncio.sleep(delay)
+
+    async def step(self) -> None:
+        if self.decode_step is None and self.state == _RUNNING:
+            # Steps spent in prefill or paying a resume delay made no tokens.
+            self._engine._start_decode(self)
+        await self._engine.next_step()
+        if self.state != _RUNNING:
+            await self.wait_running()
+
+
+def jittered_token_delay(rng: RequestRng) -> float:
+    """Return the configured token delay plus uniform jitter, never negative."""
+    base_delay = settings.token_delay_seconds
+    if base_delay <= 0.0:
+        return 0.0
+    jitter = rng.uniform(
+        -settings.token_delay_jitter_seconds, settings.token_delay_jitter_seconds
+    )
+    return max(0.0, base_delay + jitter)
+
+
+def engine_step_seconds(rng: RequestRng, active_sequences: int) -> float:
+    """Duration of one decode step under the latency model, else the token delay."""
+    if latency_model is None:
+        return jittered_token_delay(rng)
+    jitter = settings.token_delay_jitter_seconds
+    return max(
+        0.0, latency_model.step_seconds(active_sequences) + rng.uniform(-jitter, jitter)
+    )
+
+
+def preemption_resume_seconds(tokens: int, blocks: int) -> float:
+    """Cost of bringing a preempted sequence back: recompute or swap in."""
+    if settings.kv_preemption_mode == "swap":
+        return settings.kv_swap_seconds_per_block * blocks
+    if latency_model is not None:
+        return latency_model.ttft_seconds(tokens)
+    return settings.ttft_delay_seconds
+
+
+engine_step_loop = EngineStepLoop(
+    engine_step_seconds,
+    block_manager=load_block_manager(),
+    resume_seconds=preemption_resume_seconds,
+    max_num_seqs=settings.max_num_seqs,
+    priority_preemption=settings.priority_preemption,
+)
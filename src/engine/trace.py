@@ -0,0 +1,264 @@
+#!/usr/bin/env python3
+"""Replay of recorded per-token stream timings."""
+
+# Standard library imports
+import argparse
+import itertools
+import json
+import logging
+import mmap
+import os
+import struct
+import time
+import zlib
+from array import array
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Third-party imports
+import requests
+
+# Local/application imports
+from src.config import settings
+from src.utils.rng import RequestRng
+
+logger = logging.getLogger(__name__)
+
+ASSIGNMENT_MODES = ("round_robin", "random", "prompt_hash")
+
+_TRACE_MAGIC = b"DVTRACE1"
+# magic, source size, source mtime (ns), request count, delay count
+_TRACE_HEADER = struct.Struct("<8sQQQQ")
+
+
+class TimingTrace:
+    """Memory-mapped per-request timings: TTFT followed by inter-token gaps.
+
+    Recordings are kept as JSONL, one ``{"ttft": s, "itl": [s, ...]}`` object
+    per request, and compiled once into a binary file next to them (like the
+    corpus index) holding every delay as float32 plus a uint64 offset per
+    request. Only the mapping is held in memory, so a trace of millions of
+    requests costs page cache rather than Python objects, and looking up a
+    request is a pair of array reads. When the binary file cannot be
+    written, the compiled arrays are kept in memory for this process.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        assignment: str = "round_robin",
+        binary_path: Optional[str] = None,
+    ) -> None:
+        if assignment not in ASSIGNMENT_MODES:
+            raise ValueError(
+                f"Unknown trace assignment '{assignment}', "
+                f"expected one of {', '.join(ASSIGNMENT_MODES)}"
+            )
+        self._path = path
+        self._binary_path = binary_path or f"{path}.bin"
+        self.assignment = assignment
+        self._next = itertools.count()
+        stat = os.stat(path)
+        self._delays, self._offsets = self._load_or_build(
+            stat.st_size, stat.st_mtime_ns
+        )
+        self._count = len(self._offsets) - 1
+        if self._count <= 0:
+            raise ValueError(f"Timing trace '{path}' contains no requests")
+
+    def __len__(self) -> int:
+        return self._count
+
+    @property
+    def binary_path(self) -> str:
+        return self._binary_path
+
+    def pick(self, rng: RequestRng, prompt_key: Optional[int] = None) -> int:
+        """Choose which recorded request a new stream replays."""
+        if self.assignment == "random":
+            return rng.randrange(self._count)
+        if self.assignment == "prompt_hash" and prompt_key is not None:
+            return prompt_key % self._count
+        return next(self._next) % self._count
+
+    def replay(self, index: int) -> Iterator[float]:
+        """Yield the TTFT, then the recorded gaps.
+
+        The gaps repeat if the stream outlasts the recording.
+        """
+        start = self._offsets[index]
+        end = self._offsets[index + 1]
+        delays = self._delays
+        yield delays[start]
+        if end - start < 2:
+            while True:
+                yield 0.0
+        while True:
+            for position in range(start + 1, end):
+                yield delays[position]
+
+    def _load_or_build(self, size: int, mtime_ns: int) -> Tuple[memoryview, memoryview]:
+        """Map the compiled trace for this source or compile a fresh one."""
+        mapped = self._map(size, mtime_ns)
+        if mapped is not None:
+            return mapped
+        delays, offsets = self._build()
+        try:
+            self._write(delays, offsets, size, mtime_ns)
+        except OSError as exc:
+            logger.warning(
+                "Cannot write timing trace '%s' (%s); keeping it in memory. "
+                "Set DUMMY_VLLM_TIMING_TRACE_BINARY to a writable path to share it.",
+                self._binary_path,
+                exc,
+            )
+            return memoryview(delays), memoryview(offsets)
+        mapped = self._map(size, mtime_ns)
+        if mapped is None:
+            raise RuntimeError(f"Unable to load timing trace '{self._binary_path}'")
+        return mapped
+
+    def _map(self, size: int, mtime_ns: int) -> Optional[Tuple[memoryview, memoryview]]:
+        try:
+            with open(self._binary_path, "rb") as binary_file:
+                trace_map = mmap.mmap(binary_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(trace_map) < _TRACE_HEADER.size:
+            trace_map.close()
+            return None
+        magic, source_size, source_mtime, request_count, delay_count = (
+            _TRACE_HEADER.unpack_from(trace_map)
+        )
+        offsets_start = _offsets_start(delay_count)
+        if (
+            magic != _TRACE_MAGIC
+            or source_size != size
+            or source_mtime != mtime_ns
+            or len(trace_map) != offsets_start + (request_count + 1) * 8
+        ):
+            trace_map.close()
+            return None
+        view = memoryview(trace_map)
+        return (
+            view[_TRACE_HEADER.size : offsets_start][: delay_count * 4].cast("f"),
+            view[offsets_start:].cast("Q"),
+        )
+
+    def _build(self) -> Tuple[array, array]:
+        delays = array("f")
+        offsets = array("Q", [0])
+        with open(self._path, "r", encoding="utf-8") as source:
+            for line in source:
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                delays.append(record["ttft"])
+                delays.extend(record.get("itl", ()))
+                offsets.append(len(delays))
+        return delays, offsets
+
+    def _write(self, delays: array, offsets: array, size: int, mtime_ns: int) -> None:
+        # Write next to the final path and rename so concurrent workers never
+        # observe a half-written trace.
+        temp_path = f"{self._binary_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as binary_file:
+                binary_file.write(
+                    _TRACE_HEADER.pack(
+                        _TRACE_MAGIC, size, mtime_ns, len(offsets) - 1, len(delays)
+                    )
+                )
+                delays.tofile(binary_file)
+                binary_file.write(
+                    bytes(_offsets_start(len(delays)) - binary_file.tell())
+                )
+                offsets.tofile(binary_file)
+            os.replace(temp_path, self._binary_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
+
+
+def _offsets_start(delay_count: int) -> int:
+    """Byte position of the offset table: after the delays, 8-byte aligned."""
+    end = _TRACE_HEADER.size + delay_count * 4
+    return end + (-end % 8)
+
+
+def prompt_key(text: str) -> int:
+    """Stable key for ``prompt_hash`` assignment, identical across workers."""
+    return zlib.crc32(text.encode("utf-8"))
+
+
+def load_timing_trace() -> Optional[TimingTrace]:
+    """Return the configured timing trace, or None when replay is disabled."""
+    if not settings.timing_trace_path:
+        return None
+    return TimingTrace(
+        settings.timing_trace_path,
+        settings.timing_trace_assignment,
+        settings.timing_trace_binary_path,
+    )
+
+
+timing_trace = load_timing_trace()
+
+
+def _record(
+    base_url: str, model: str, prompt: str, max_tokens: int, count: int
+) -> Iterator[Dict[str, object]]:
+    """Stream ``count`` completions from a real server and yield their timings."""
+    payload = {
+        "model": model,
+        "prompt": prompt,
+        "max_tokens": max_tokens,
+        "stream": True,
+    }
+    for _ in range(count):
+        start = last = time.perf_counter()
+        ttft = None
+        gaps: List[float] = []
+        with requests.post(
+            f"{base_url}/v1/completions", json=payload, stream=True, timeout=60
+        ) as response:
+            response.raise_for_status()
+            for line in response.iter_lines():
+                if not line.startswith(b"data: ") or line == b"data: [DONE]":
+                    continue
+                chunk = json.loads(line[6:])
+                if not any(choice.get("text") for choice in chunk["choices"]):
+                    continue
+                now = time.perf_counter()
+                if ttft is None:
+                    ttft = now - start
+                else:
+                    gaps.append(round(now - last, 6))
+                last = now
+        if ttft is not None:
+            yield {"ttft": round(ttft, 6), "itl": gaps}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Record per-token stream timings from a running vLLM server as a "
+            "JSONL trace for DUMMY_VLLM_TIMING_TRACE."
+        )
+    )
+    parser.add_argument("output", help="JSONL file to append timings to")
+    parser.add_argument("--base-url", default="http://localhost:8000")
+    parser.add_argument("--model", default=settings.default_model_name)
+    parser.add_argument("--prompt", default="Tell me a story.")
+    parser.add_argument("--max-tokens", type=int, default=128)
+    parser.add_argument("--requests", type=int, default=100)
+    arguments = parser.parse_args()
+    with open(arguments.output, "a", encoding="utf-8") as output_file:
+        for timing in _record(
+            arguments.base_url,
+            arguments.model,
+            arguments.prompt,
+            arguments.max_tokens,
+            arguments.requests,
+        ):
+            output_file.write(json.dumps(timing) + "\n")
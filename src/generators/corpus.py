@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Memory-mapped external text corpus used as a response source."""
+
+# Standard library imports
+import logging
+import mmap
+import os
+import re
+import struct
+from array import array
+from typing import Iterator, Optional, Tuple
+
+# Local/application imports
+from src.generators.token_arena import TokenSpan
+
+logger = logging.getLogger(__name__)
+
+_TOKEN_PATTERN = re.compile(rb"\S+")
+_INDEX_MAGIC = b"DVCIDX01"
+# magic, corpus size, corpus mtime (ns), token count
+_INDEX_HEADER = struct.Struct("<8sQQQ")
+
+
+class MappedCorpus:
+    """Read-only, memory-mapped corpus with an on-disk token offset index.
+
+    The index stores the byte offset of every whitespace-delimited token plus a
+    trailing sentinel equal to the corpus size. Both files are mapped rather
+    than read, so worker processes share the same page-cache pages instead of
+    each holding a private copy of the corpus.
+    """
+
+    def __init__(self, path: str, index_path: Optional[str] = None) -> None:
+        self._path = path
+        self._index_path = index_path or f"{path}.idx"
+        with open(path, "rb") as corpus_file:
+            stat = os.fstat(corpus_file.fileno())
+            if stat.st_size == 0:
+                raise ValueError(f"Corpus file '{path}' is empty")
+            self._data = mmap.mmap(corpus_file.fileno(), 0, access=mmap.ACCESS_READ)
+        self._size = stat.st_size
+        self._offsets = self._load_or_build_index(stat.st_size, stat.st_mtime_ns)
+        self._token_count = len(self._offsets) - 1
+        if self._token_count <= 0:
+            raise ValueError(f"Corpus file '{path}' contains no tokens")
+
+    def __len__(self) -> int:
+        return self._token_count
+
+    @property
+    def index_path(self) -> str:
+        return self._index_path
+
+    @property
+    def start_count(self) -> int:
+        return self._token_count
+
+    def start(self, index: int) -> Tuple[int, Optional[int]]:
+        """Every token is a valid start; the corpus has no natural lengths."""
+        return index, None
+
+    def span(self, offset: int, length: int) -> TokenSpan:
+        """Return a view of ``length`` tokens starting at ``offset``."""
+        return TokenSpan(self, offset % self._token_count, max(0, length))
+
+    def text(self, offset: int, length: int) -> str:
+        """Decode the corpus bytes covered by a view, keeping original spacing."""
+        if length <= 0:
+            return ""
+        offsets = self._offsets
+        end = offset + length
+        if end <= self._token_count:
+            raw = self._data[offsets[offset] : offsets[end]]
+        else:
+            wraps, tail = divmod(end, self._token_count)
+            full_pass = self._data[offsets[0] : self._size].rstrip()
+            parts = [self._data[offsets[offset] : self._size].rstrip()]
+            parts.extend([full_pass] * (wraps - 1))
+            if tail:
+                parts.append(self._data[offsets[0] : offsets[tail]])
+            raw = b" ".join(parts)
+        return raw.rstrip().decode("utf-8", errors="replace")
+
+    def iter_tokens(self, offset: int, length: int) -> Iterator[str]:
+        """Iterate over the tokens of a view, wrapping around the corpus."""
+        data = self._data
+        offsets = self._offsets
+        count = self._token_count
+        index = offset
+        for _ in range(length):
+            raw = data[offsets[index] : offsets[index + 1]]
+            yield raw.rstrip().decode("utf-8", errors="replace")
+            index += 1
+            if index == count:
+                index = 0
+
+    def _load_or_build_index(self, size: int, mtime_ns: int) -> memoryview:
+        """Map an existing index for this corpus or build a fresh one.
+
+        When the index cannot be written (a read-only directory, say), the
+        offsets are kept in memory for this process instead; point
+        ``DUMMY_VLLM_CORPUS_INDEX`` at a writable path to share one index.
+        """
+        offsets = self._map_index(size, mtime_ns)
+        if offsets is not None:
+            return offsets
+        built = self._build_index(size)
+        try:
+            self._write_index(built, size, mtime_ns)
+        except OSError as exc:
+            logger.warning(
+                "Cannot write corpus index '%s' (%s); keeping it in memory. "
+                "Set DUMMY_VLLM_CORPUS_INDEX to a writable path to share it.",
+                self._index_path,
+                exc,
+            )
+            return memoryview(built)
+        offsets = self._map_index(size, mtime_ns)
+        if offsets is None:
+            raise RuntimeError(f"Unable to load corpus index '{self._index_path}'")
+        return offsets
+
+    def _map_index(self, size: int, mtime_ns: int) -> Optional[memoryview]:
+        try:
+            with open(self._index_path, "rb") as index_file:
+                index_map = mmap.mmap(index_file.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+        if len(index_map) < _INDEX_HEADER.size:
+            index_map.close()
+            return None
+        magic, indexed_size, indexed_mtime, token_count = _INDEX_HEADER.unpack_from(
+            index_map
+        )
+        expected_length = _INDEX_HEADER.size + (token_count + 1) * 8
+        if (
+            magic != _INDEX_MAGIC
+            or indexed_size != size
+            or indexed_mtime != mtime_ns
+            or len(index_map) != expected_length
+        ):
+            index_map.close()
+            return None
+        return memoryview(index_map)[_INDEX_HEADER.size :].cast("Q")
+
+    def _build_index(self, size: int) -> array:
+        offsets = array(
+            "Q", (match.start() for match in _TOKEN_PATTERN.finditer(self._data))
+        )
+        offsets.append(size)
+        return offsets
+
+    def _write_index(self, offsets: array, size: int, mtime_ns: int) -> None:
+        # Write next to the final path and rename so concurrent workers never
+        # observe a half-written index.
+        temp_path = f"{self._index_path}.{os.getpid()}.tmp"
+        try:
+            with open(temp_path, "wb") as index_file:
+                index_file.write(
+                    _INDEX_HEADER.pack(_INDEX_MAGIC, size, mtime_ns, len(offsets) - 1)
+                )
+                offsets.tofile(index_file)
+            os.replace(temp_path, self._index_path)
+        except OSError:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+            raise
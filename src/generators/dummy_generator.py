@@ -3,11 +3,36 @@
 
 # Standard library imports
 import asyncio
-import random
-from typing import AsyncGenerator, List, Tuple
+from typing import (
+    AsyncGenerator,
+    AsyncIterator,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Sized,
+    Tuple,
+    Union,
+)
 
 # Local/application imports
 from src.config import settings
+from src.engine.delay_distribution import latency_profile
+from src.engine.latency import latency_model, prefill_queue
+from src.engine.prefix_cache import prefix_cache
+from src.engine.step_loop import engine_step_loop, jittered_token_delay
+from src.engine.trace import prompt_key, timing_trace
+from src.generators.corpus import MappedCorpus
+from src.generators.length_distribution import build_output_length_sampler
+from src.generators.logprobs import LogprobTable
+from src.generators.stop_matcher import StopMatcher, TokenStopFilter, stop_matcher_for
+from src.generators.token_arena import TokenArena, TokenSource, TokenSpan
+from src.generators.tokenizer import load_tokenizer
+from src.models import ChatCompletionMessage
+from src.utils.lru import LRUCache
+from src.utils.rng import RequestRng
+
+StopSpec = Optional[Union[str, Sequence[str]]]
 
 
 class DummyTextGenerator:
@@ -20,65 +45,384 @@ class DummyTextGenerator:
         "Deterministic filler message generated without any inference cost.",
         "Mock vLLM output enabling benchmarking of pure HTTP throughput.",
     ]
+    # Built once at import so requests only slice views out of it.
+    ARENA = TokenArena(RESPONSE_POOL)
+    SOURCE: TokenSource = (
+        MappedCorpus(settings.corpus_path, settings.corpus_index_path)
+        if settings.corpus_path
+        else ARENA
+    )
+    # Alternatives offered in synthetic top_logprobs.
+    LOGPROB_VOCABULARY = tuple(sorted(set(" ".join(RESPONSE_POOL).split())))
+    LENGTH_SAMPLER = build_output_length_sampler()
+    TOKENIZER = load_tokenizer()
+    MESSAGE_TOKEN_CACHE: LRUCache[int] = LRUCache(settings.message_token_cache_size)
+    MESSAGE_KEY_CACHE: LRUCache[Tuple[object, ...]] = LRUCache(
+        settings.message_token_cache_size
+    )
+
+    @classmethod
+    def has_accurate_tokenizer(cls) -> bool:
+        """Whether token counts come from a real tokenizer rather than whitespace."""
+        return cls.TOKENIZER is not None
 
     @staticmethod
     def estimate_token_count(text: str) -> int:
-        """Estimate token count using whitespace tokens with a character fallback."""
+        """Count tokens with the configured BPE tokenizer, else estimate by whitespace."""
+        if DummyTextGenerator.TOKENIZER is not None:
+            return DummyTextGenerator.TOKENIZER.count(text)
         tokens, _ = DummyTextGenerator._tokenize_text(text)
         return len(tokens)
 
     @classmethod
-    def generate_completion_with_metadata(cls, max_tokens: int) -> Tuple[str, bool]:
+    def count_chat_prompt_tokens(cls, messages: Iterable[ChatCompletionMessage]) -> int:
+        """Count the tokens of a chat prompt without joining the conversation.
+
+        The prompt is the messages rendered as ``role: content`` lines, so
+        its count is the sum of per-message counts. Those are cached by role
+        and content hash, which keeps multi-turn sessions that resend a
+        growing history linear in the new messages only.
+        """
+        cache = cls.MESSAGE_TOKEN_CACHE
+        total = 0
+        for message in messages:
+            content = message.content
+            key = (message.role, hash(content), len(content))
+            count = cache.get(key)
+            if count is None:
+                count = cls.estimate_token_count(
+                    f"{message.role}:"
+                ) + cls.estimate_token_count(content)
+                cache.put(key, count)
+            total += count
+        return total
+
+    @classmethod
+    def cached_prompt_tokens(cls, text: str) -> Optional[int]:
+        """Look ``text`` up in the prefix cache (and cache it); None when disabled."""
+        if prefix_cache is None:
+            return None
+        return prefix_cache.match_and_insert(cls._message_token_keys(None, text))
+
+    @classmethod
+    def cached_chat_prompt_tokens(
+        cls, messages: Iterable[ChatCompletionMessage]
+    ) -> Optional[int]:
+        """Prefix cache lookup for a chat prompt; None when the cache is disabled."""
+        if prefix_cache is None:
+            return None
+        keys: List[object] = []
+        for message in messages:
+            keys.extend(cls._message_token_keys(message.role, message.content))
+        return prefix_cache.match_and_insert(keys)
+
+    @staticmethod
+    def total_cached_tokens(cached_counts: Sequence[Optional[int]]) -> Optional[int]:
+        """Sum per-prompt prefix cache hits; None when the cache is disabled."""
+        if not cached_counts or cached_counts[0] is None:
+            return None
+        return sum(count or 0 for count in cached_counts)
+
+    @classmethod
+    def _message_token_keys(
+        cls, role: Optional[str], content: str
+    ) -> Tuple[object, ...]:
+        """Prefix cache keys of ``role: content``, cached like the token counts."""
+        key = (role, hash(content), len(content))
+        keys = cls.MESSAGE_KEY_CACHE.get(key)
+        if keys is None:
+            keys = ()
+            if role is not None:
+                keys = tuple(cls._prompt_token_keys(f"{role}:"))
+            keys += tuple(cls._prompt_token_keys(content))
+            cls.MESSAGE_KEY_CACHE.put(key, keys)
+        return keys
+
+    @classmethod
+    def _prompt_token_keys(cls, text: str) -> Sequence[object]:
+        """Token ids from the real tokenizer, else whitespace tokens."""
+        if cls.TOKENIZER is not None:
+            return cls.TOKENIZER.encode(text)
+        return text.split()
+
+    @classmethod
+    def generate_span(
+        cls, max_tokens: int, rng: Optional[RequestRng] = None
+    ) -> Tuple[TokenSpan, bool]:
+        """Return a token view plus whether it was truncated by max_tokens."""
+        return cls._prepare_tokens(max_tokens=max_tokens, rng=rng)
+
+    @classmethod
+    def choice_starts(cls, rng: RequestRng, choices: int) -> Optional[Tuple[int, ...]]:
+        """Source entries the choices ``rng.child(i)`` will start from.
+
+        Together with ``max_tokens`` and ``stop`` these fix each choice's
+        text, unless an output length distribution draws lengths too, in which
+        case this returns None. Child streams are pure, so peeking here does
+        not change what the choices later draw.
+        """
+        if cls.LENGTH_SAMPLER is not None:
+            return None
+        start_count = cls.SOURCE.start_count
+        return tuple(
+            rng.child(index).randrange(start_count) for index in range(choices)
+        )
+
+    @classmethod
+    def generate_choice(
+        cls,
+        max_tokens: int,
+        rng: Optional[RequestRng] = None,
+        stop: StopSpec = None,
+    ) -> Tuple[str, int, str]:
+        """Return completion text, its token count and the finish reason."""
+        span, truncated = cls._prepare_tokens(max_tokens=max_tokens, rng=rng)
+        matcher = stop_matcher_for(stop)
+        if matcher is None:
+            return span.text(), len(span), _finish_reason(truncated)
+        stop_filter = TokenStopFilter(matcher)
+        tokens = list(stop_filter.filter(span))
+        if stop_filter.stopped:
+            return " ".join(tokens), len(tokens), "stop"
+        return " ".join(tokens), len(tokens), _finish_reason(truncated)
+
+    @classmethod
+    def generate_choice_tokens(
+        cls,
+        max_tokens: int,
+        rng: Optional[RequestRng] = None,
+        stop: StopSpec = None,
+    ) -> Tuple[List[str], str]:
+        """Return the emitted tokens of a choice and its finish reason.
+
+        Used when the response reports per-token data such as logprobs; the
+        text of such a choice is its tokens joined by single spaces.
+        """
+        span, truncated = cls._prepare_tokens(max_tokens=max_tokens, rng=rng)
+        matcher = stop_matcher_for(stop)
+        if matcher is None:
+            return list(span), _finish_reason(truncated)
+        stop_filter = TokenStopFilter(matcher)
+        tokens = list(stop_filter.filter(span))
+        if stop_filter.stopped:
+            return tokens, "stop"
+        return tokens, _finish_reason(truncated)
+
+    @classmethod
+    def generate_choice_with_logprobs(
+        cls,
+        max_tokens: int,
+        top_k: int,
+        rng: Optional[RequestRng] = None,
+        stop: StopSpec = None,
+        chat: bool = False,
+    ) -> Tuple[str, int, str, dict]:
+        """Like :meth:`generate_choice`, plus logprobs in completion or chat format."""
+        rng = rng or RequestRng.for_request(None)
+        tokens, finish_reason = cls.generate_choice_tokens(
+            max_tokens=max_tokens, rng=rng, stop=stop
+        )
+        cursor = cls.logprob_table(len(tokens), top_k, rng).cursor()
+        logprobs = cursor.chat(tokens) if chat else cursor.completion(tokens)
+        return " ".join(tokens), len(tokens), finish_reason, logprobs
+
+    @classmethod
+    def logprob_table(cls, length: int, top_k: int, rng: RequestRng) -> LogprobTable:
+        """Synthesize logprobs for ``length`` tokens with ``top_k`` candidates each."""
+        return LogprobTable.synthesize(length, top_k, rng, cls.LOGPROB_VOCABULARY)
+
+    @classmethod
+    def open_stream(
+        cls,
+        max_tokens: int,
+        rng: Optional[RequestRng] = None,
+        stop: StopSpec = None,
+        prompt_tokens: int = 0,
+        cached_tokens: Optional[int] = None,
+        priority: int = 0,
+        trace_key: Optional[int] = None,
+    ) -> "ChoiceStream":
+        """Prepare one streamed choice; its finish reason is final once drained.
+
+        ``prompt_tokens`` sizes the simulated prefill, of which
+        ``cached_tokens`` are served by the prefix cache and skipped.
+        ``priority`` orders the stream in the engine queue (lower first) and
+        ``trace_key`` selects a recorded timing under ``prompt_hash`` replay.
+        """
+        rng = rng or RequestRng.for_request(None)
+        span, truncated = cls._prepare_tokens(max_tokens=max_tokens, rng=rng)
+        return ChoiceStream(
+            span,
+            truncated,
+            rng,
+            stop_matcher_for(stop),
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens or 0,
+            priority=priority,
+            trace_key=trace_key,
+        )
+
+    @staticmethod
+    def trace_key(*texts: str) -> Optional[int]:
+        """Prompt hash for timing trace assignment, computed only when used."""
+        if timing_trace is None or timing_trace.assignment != "prompt_hash":
+            return None
+        return prompt_key("\n".join(texts))
+
+    @staticmethod
+    def chat_trace_key(messages: Iterable[ChatCompletionMessage]) -> Optional[int]:
+        """:meth:`trace_key` of ``role: content`` lines, rendered only when used."""
+        if timing_trace is None or timing_trace.assignment != "prompt_hash":
+            return None
+        return prompt_key(
+            "\n".join(f"{message.role}: {message.content}" for message in messages)
+        )
+
+    @classmethod
+    def generate_completion_with_metadata(
+        cls, max_tokens: int, rng: Optional[RequestRng] = None
+    ) -> Tuple[str, bool]:
         """Return completion text plus whether it was truncated by max_tokens."""
-        tokens, join_with_space, truncated = cls._prepare_tokens(max_tokens=max_tokens)
-        if join_with_space:
-            text = " ".join(tokens)
-        else:
-            text = "".join(tokens)
-        return text, truncated
+        span, truncated = cls._prepare_tokens(max_tokens=max_tokens, rng=rng)
+        return span.text(), truncated
 
     @classmethod
-    def generate_completion_text(cls, max_tokens: int) -> str:
+    def generate_completion_text(
+        cls, max_tokens: int, rng: Optional[RequestRng] = None
+    ) -> str:
         """Return a deterministic completion string clipped to max_tokens."""
-        text, _ = cls.generate_completion_with_metadata(max_tokens=max_tokens)
+        text, _ = cls.generate_completion_with_metadata(max_tokens=max_tokens, rng=rng)
         return text
 
     @classmethod
-    async def stream_tokens(cls, max_tokens: int) -> AsyncGenerator[str, None]:
+    async def stream_tokens(
+        cls,
+        max_tokens: int,
+        rng: Optional[RequestRng] = None,
+        stop: StopSpec = None,
+    ) -> AsyncGenerator[str, None]:
         """Yield tokens asynchronously with optional artificial delay."""
-        tokens, _, _ = cls._prepare_tokens(max_tokens=max_tokens)
-        async for token in cls.stream_from_tokens(tokens):
+        async for token in cls.open_stream(max_tokens=max_tokens, rng=rng, stop=stop):
             yield token
 
     @classmethod
-    def prepare_token_stream(cls, max_tokens: int) -> Tuple[List[str], bool]:
-        """Prepare tokens for streaming plus truncated flag."""
-        tokens, _, truncated = cls._prepare_tokens(max_tokens=max_tokens)
-        return tokens, truncated
+    def prepare_token_stream(
+        cls, max_tokens: int, rng: Optional[RequestRng] = None
+    ) -> Tuple[TokenSpan, bool]:
+        """Prepare a token view for streaming plus truncated flag."""
+        return cls._prepare_tokens(max_tokens=max_tokens, rng=rng)
 
     @classmethod
-    async def stream_from_tokens(cls, tokens: List[str]) -> AsyncGenerator[str, None]:
-        await cls._maybe_sleep(settings.ttft_delay_seconds)
+    async def stream_from_tokens(
+        cls,
+        tokens: Iterable[str],
+        rng: Optional[RequestRng] = None,
+        prompt_tokens: int = 0,
+        cached_tokens: int = 0,
+        priority: int = 0,
+        trace_key: Optional[int] = None,
+        token_count: Optional[int] = None,
+    ) -> AsyncGenerator[str, None]:
+        rng = rng or RequestRng.for_request(None)
+        if timing_trace is not None:
+            # Recorded timings already include queueing and prefill, so they
+            # are replayed as-is instead of going through the engine.
+            delays = timing_trace.replay(timing_trace.pick(rng, trace_key))
+            await cls._maybe_sleep(next(delays))
+            for index, token in enumerate(tokens):
+                if index:
+                    await cls._maybe_sleep(next(delays))
+                yield token
+            return
+        if cls._uses_engine():
+            # One shared timer paces every stream instead of a sleep per token;
+            # the latency model and scheduler need it to know what is running.
+            async with engine_step_loop.sequence(prompt_tokens, priority) as sequence:
+                await sequence.wait_running()
+                await cls._prefill(prompt_tokens, cached_tokens)
+                for token in tokens:
+                    yield token
+                    await sequence.step()
+            return
+        if latency_profile is not None:
+            # The whole stream's delays come from one batch drawn up front.
+            if token_count is None:
+                token_count = len(tokens) if isinstance(tokens, Sized) else 0
+            ttft, gaps = latency_profile.schedule(rng, token_count)
+            await cls._prefill(prompt_tokens, cached_tokens, ttft)
+            for index, token in enumerate(tokens):
+                yield token
+                if index < len(gaps):
+                    await cls._maybe_sleep(gaps[index])
+            return
+        await cls._prefill(prompt_tokens, cached_tokens)
         for token in tokens:
             yield token
-            await cls._maybe_sleep(cls._token_delay_with_jitter())
+            await cls._maybe_sleep(cls._token_delay_with_jitter(rng))
 
     @classmethod
-    def _prepare_tokens(cls, max_tokens: int) -> Tuple[List[str], bool, bool]:
-        """Prepare a bounded list of tokens plus join style flag."""
-        base_response = random.choice(cls.RESPONSE_POOL)
-        tokens, join_with_space = cls._tokenize_text(base_response)
-        safe_max = max(1, max_tokens)
+    def streams_instantly(cls) -> bool:
+        """True when nothing paces streams, so timing cannot shape their frames."""
+        return (
+            timing_trace is None
+            and latency_profile is None
+            and not cls._uses_engine()
+            and settings.ttft_delay_seconds <= 0.0
+            and settings.token_delay_seconds <= 0.0
+        )
 
-        # If max_tokens exceeds base response length, repeat tokens to fill
-        if len(tokens) < safe_max:
-            repetitions_needed = (safe_max // len(tokens)) + 1
-            tokens = tokens * repetitions_needed
-            truncated = True
+    @staticmethod
+    def _uses_engine() -> bool:
+        if latency_model is not None or engine_step_loop.limits_capacity:
+            return True
+        # Per-stream delay schedules cannot be shared by a lockstep loop.
+        return (
+            settings.engine_step_loop
+            and settings.token_delay_seconds > 0.0
+            and latency_profile is None
+        )
+
+    @classmethod
+    async def _prefill(
+        cls, prompt_tokens: int, cached_tokens: int = 0, ttft: Optional[float] = None
+    ) -> None:
+        """Wait out time-to-first-token for the prompt tokens not already cached."""
+        uncached = max(0, prompt_tokens - cached_tokens)
+        if ttft is None:
+            if latency_model is not None:
+                await prefill_queue.prefill(latency_model, uncached)
+                return
+            ttft = settings.ttft_delay_seconds
+        if cached_tokens and prompt_tokens:
+            await cls._maybe_sleep(ttft * uncached / prompt_tokens)
         else:
-            truncated = len(tokens) > safe_max
+            await cls._maybe_sleep(ttft)
+
+    @classmethod
+    def _prepare_tokens(
+        cls, max_tokens: int, rng: Optional[RequestRng] = None
+    ) -> Tuple[TokenSpan, bool]:
+        """Pick a start in the token source and return a bounded view from it."""
+        rng = rng or RequestRng.for_request(None)
+        offset, natural_length = cls.SOURCE.start(rng.randrange(cls.SOURCE.start_count))
+        safe_max = max(1, max_tokens)
 
-        return tokens[:safe_max], join_with_space, truncated
+        if cls.LENGTH_SAMPLER is not None:
+            # The sampled length is where the "model" would have stopped.
+            # Seeded requests draw from their own stream to stay reproducible.
+            if rng.seeded:
+                target_length = cls.LENGTH_SAMPLER.draw(rng)
+            else:
+                target_length = cls.LENGTH_SAMPLER.next()
+            return (
+                cls.SOURCE.span(offset, min(target_length, safe_max)),
+                target_length > safe_max,
+            )
+
+        # Views longer than a pool entry run on into the following entries;
+        # corpus views have no natural end and always stop on max_tokens.
+        truncated = natural_length != safe_max
+        return cls.SOURCE.span(offset, safe_max), truncated
 
     @staticmethod
     def _tokenize_text(text: str) -> Tuple[List[str], bool]:
@@ -98,12 +442,57 @@ class DummyTextGenerator:
         await asyncio.sleep(delay_seconds)
 
     @staticmethod
-    def _token_delay_with_jitter() -> float:
+    def _token_delay_with_jitter(rng: RequestRng) -> float:
         """Return token delay plus jitter bounds."""
-        base_delay = settings.token_delay_seconds
-        if base_delay <= 0.0:
-            return 0.0
-        jitter = random.uniform(
-            -settings.token_delay_jitter_seconds, settings.token_delay_jitter_seconds
+        return jittered_token_delay(rng)
+
+
+class ChoiceStream:
+    """A single streamed choice whose finish reason is settled once drained."""
+
+    def __init__(
+        self,
+        span: TokenSpan,
+        truncated: bool,
+        rng: RequestRng,
+        stop_matcher: Optional[StopMatcher] = None,
+        prompt_tokens: int = 0,
+        cached_tokens: int = 0,
+        priority: int = 0,
+        trace_key: Optional[int] = None,
+    ) -> None:
+        self.span = span
+        self._truncated = truncated
+        self._rng = rng
+        self._prompt_tokens = prompt_tokens
+        self._cached_tokens = cached_tokens
+        self._priority = priority
+        self._trace_key = trace_key
+        self._stop_filter = (
+            TokenStopFilter(stop_matcher) if stop_matcher is not None else None
         )
-        return max(0.0, base_delay + jitter)
+
+    @property
+    def finish_reason(self) -> str:
+        if self._stop_filter is not None and self._stop_filter.stopped:
+            return "stop"
+        return _finish_reason(self._truncated)
+
+    async def __aiter__(self) -> AsyncIterator[str]:
+        tokens: Iterable[str] = self.span
+        if self._stop_filter is not None:
+            tokens = self._stop_filter.filter(self.span)
+        async for token in DummyTextGenerator.stream_from_tokens(
+            tokens,
+            rng=self._rng,
+            prompt_tokens=self._prompt_tokens,
+            cached_tokens=self._cached_tokens,
+            priority=self._priority,
+            trace_key=self._trace_key,
+            token_count=len(self.span),
+        ):
+            yield token
+
+
+def _finish_reason(truncated: bool) -> str:
+    return "length" if truncated else "stop"
@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+"""Output-length distributions sampled in NumPy batches."""
+
+# Standard library imports
+import bisect
+import math
+from statistics import NormalDist
+from typing import List, Optional, Tuple
+
+# Third-party imports
+import numpy as np
+
+# Local/application imports
+from src.config import settings
+from src.utils.rng import RequestRng
+
+LENGTH_DISTRIBUTIONS = ("fixed", "uniform", "normal", "lognormal", "empirical")
+
+
+class OutputLengthSampler:
+    """Serve output lengths from a refillable pool of pre-drawn samples.
+
+    Samples are drawn ``batch_size`` at a time with NumPy and kept as a plain
+    list, so handing a length to a request is a single list read. ``mean`` and
+    ``stddev`` describe the length itself for both ``normal`` and
+    ``lognormal``; ``minimum``/``maximum`` bound ``uniform`` and clamp every
+    distribution (``maximum <= 0`` leaves the upper side unbounded).
+    """
+
+    def __init__(
+        self,
+        distribution: str,
+        *,
+        mean: float = 128.0,
+        stddev: float = 64.0,
+        minimum: int = 1,
+        maximum: int = 0,
+        histogram_path: Optional[str] = None,
+        batch_size: int = 4096,
+        seed: Optional[int] = None,
+    ) -> None:
+        if distribution not in LENGTH_DISTRIBUTIONS:
+            raise ValueError(
+                f"Unknown output length distribution '{distribution}', "
+                f"expected one of {', '.join(LENGTH_DISTRIBUTIONS)}"
+            )
+        self.distribution = distribution
+        self.mean = float(mean)
+        self.stddev = max(0.0, float(stddev))
+        self.minimum = max(1, int(minimum))
+        self.maximum = int(maximum) if maximum > 0 else 0
+        self._batch_size = max(1, batch_size)
+        self._rng = np.random.default_rng(seed)
+        self._values = np.empty(0, dtype=np.int64)
+        self._probabilities = np.empty(0, dtype=np.float64)
+        if distribution == "uniform" and self.maximum < self.minimum:
+            raise ValueError("uniform output lengths require maximum >= minimum")
+        if distribution == "empirical":
+            if not histogram_path:
+                raise ValueError("empirical output lengths require a histogram file")
+            values, weights = load_length_histogram(histogram_path)
+            self._values = np.asarray(values, dtype=np.int64)
+            self._probabilities = np.asarray(weights, dtype=np.float64)
+            self._probabilities /= self._probabilities.sum()
+        self._cumulative = np.cumsum(self._probabilities).tolist()
+        self._pool: List[int] = []
+        self._cursor = 0
+
+    def next(self) -> int:
+        """Return the next pre-sampled output length."""
+        if self._cursor >= len(self._pool):
+            self._refill()
+        value = self._pool[self._cursor]
+        self._cursor += 1
+        return value
+
+    def draw(self, rng: RequestRng) -> int:
+        """Draw one length from a request's own generator by inverse transform.
+
+        Used for seeded requests, whose lengths must not depend on how much
+        of the shared pool other requests have consumed.
+        """
+        if self.distribution == "fixed":
+            value = self.mean
+        elif self.distribution == "uniform":
+            value = self.minimum + rng.randrange(self.maximum - self.minimum + 1)
+        elif self.distribution == "normal":
+            value = NormalDist(self.mean, self.stddev or 1e-9).inv_cdf(rng.random())
+        elif self.distribution == "lognormal":
+            sigma, mu = _lognormal_params(self.mean, self.stddev)
+            value = math.exp(mu + sigma * NormalDist().inv_cdf(rng.random()))
+        else:
+            position = bisect.bisect_left(self._cumulative, rng.random())
+            value = float(self._values[min(position, len(self._values) - 1)])
+        value = max(self.minimum, round(value))
+        if self.maximum:
+            value = min(self.maximum, value)
+        return int(value)
+
+    def _refill(self) -> None:
+        samples = np.rint(self._draw(self._batch_size))
+        upper = self.maximum if self.maximum else None
+        samples = np.clip(samples, self.minimum, upper)
+        self._pool = samples.astype(np.int64).tolist()
+        self._cursor = 0
+
+    def _draw(self, size: int) -> np.ndarray:
+        if self.distribution == "fixed":
+            return np.full(size, self.mean)
+        if self.distribution == "uniform":
+            return self._rng.integers(self.minimum, self.maximum + 1, size)
+        if self.distribution == "normal":
+            return self._rng.normal(self.mean, self.stddev, size)
+        if self.distribution == "lognormal":
+            sigma, mu = _lognormal_params(self.mean, self.stddev)
+            return self._rng.lognormal(mu, sigma, size)
+        return self._rng.choice(self._values, size=size, p=self._probabilities)
+
+
+def load_length_histogram(path: str) -> Tuple[List[int], List[float]]:
+    """Parse ``length [weight]`` lines; blank lines and ``#`` comments are skipped."""
+    values: List[int] = []
+    weights: List[float] = []
+    with open(path, "r", encoding="utf-8") as histogram_file:
+        for line_number, raw_line in enumerate(histogram_file, start=1):
+            line = raw_line.split("#", 1)[0].replace(",", " ").strip()
+            if not line:
+                continue
+            fields = line.split()
+            try:
+                value = int(float(fields[0]))
+                weight = float(fields[1]) if len(fields) > 1 else 1.0
+            except ValueError as exc:
+                raise ValueError(
+                    f"Invalid histogram entry on line {line_number} of '{path}'"
+                ) from exc
+            if value < 1 or weight < 0:
+                raise ValueError(
+                    f"Invalid histogram entry on line {line_number} of '{path}'"
+                )
+            values.append(value)
+            weights.append(weight)
+    if not values or sum(weights) <= 0:
+        raise ValueError(f"Histogram file '{path}' has no positive weights")
+    return values, weights
+
+
+def build_output_length_sampler() -> Optional[OutputLengthSampler]:
+    """Create the sampler configured in settings, or None to always use max_tokens."""
+    distribution = settings.output_length_distribution.lower()
+    if distribution in ("", "max_tokens"):
+        return None
+    return OutputLengthSampler(
+        distribution,
+        mean=settings.output_length_mean,
+        stddev=settings.output_length_stddev,
+        minimum=settings.output_length_min,
+        maximum=settings.output_length_max,
+        histogram_path=settings.output_length_histogram,
+    )
+
+
+def _lognormal_params(mean: float, stddev: float) -> Tuple[float, float]:
+    """Convert a length mean/stddev into the underlying normal's sigma and mu."""
+    safe_mean = max(mean, 1e-9)
+    sigma = math.sqrt(math.log1p((stddev / safe_mean) ** 2))
+    return sigma, math.log(safe_mean) - sigma * sigma / 2.0
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""Synthetic per-token log-probabilities drawn in one NumPy pass per choice."""
+
+# Standard library imports
+from typing import Dict, List, Optional, Sequence, Tuple
+
+# Third-party imports
+import numpy as np
+
+# Local/application imports
+from src.utils.rng import RequestRng
+
+# Child stream index reserved for logprob draws, so asking for logprobs never
+# shifts the draws a choice makes for its text, length or delays.
+_LOGPROB_STREAM = 0x10DB
+
+
+class LogprobTable:
+    """Log-probabilities for every position of one choice.
+
+    Column 0 of each row belongs to the sampled token, which is always the
+    most likely candidate; the remaining ``top_k - 1`` columns are distinct
+    alternatives from ``vocabulary`` in descending order. All values are
+    generated up front and converted to plain lists, so rendering a token is
+    list indexing rather than a NumPy call.
+    """
+
+    def __init__(
+        self,
+        chosen: List[float],
+        alternative_ids: List[List[int]],
+        alternative_values: List[List[float]],
+        vocabulary: Sequence[str],
+        top_k: int,
+    ) -> None:
+        self.chosen = chosen
+        self.alternative_ids = alternative_ids
+        self.alternative_values = alternative_values
+        self.vocabulary = vocabulary
+        self.top_k = top_k
+
+    def __len__(self) -> int:
+        return len(self.chosen)
+
+    @classmethod
+    def synthesize(
+        cls,
+        length: int,
+        top_k: int,
+        rng: RequestRng,
+        vocabulary: Sequence[str],
+    ) -> "LogprobTable":
+        """Draw ``length`` rows of ``top_k`` candidates, sampled token first."""
+        length = max(0, length)
+        top_k = max(0, top_k)
+        alternatives = min(max(top_k - 1, 0), max(len(vocabulary) - 1, 0))
+        generator = np.random.default_rng(rng.child(_LOGPROB_STREAM).next_u64())
+
+        # A confident model: the sampled token usually carries most of the mass.
+        chosen_probability = np.clip(
+            generator.beta(4.0, 1.0, size=length), 1e-6, 1.0 - 1e-6
+        )
+        chosen = np.log(chosen_probability)
+        if alternatives == 0:
+            return cls(chosen.tolist(), [], [], vocabulary, top_k)
+
+        # Split part of the leftover mass over the alternatives in decreasing
+        # shares; the rest stays with the unlisted tail of the vocabulary.
+        shares = -np.sort(-generator.exponential(size=(length, alternatives)), axis=1)
+        listed_mass = (1.0 - chosen_probability) * generator.uniform(
+            0.5, 0.95, size=length
+        )
+        shares *= (listed_mass / shares.sum(axis=1))[:, None]
+        values = np.minimum(np.log(np.maximum(shares, 1e-12)), chosen[:, None])
+        # Consecutive vocabulary entries from a random base are distinct.
+        bases = generator.integers(0, len(vocabulary), size=length)
+        ids = (bases[:, None] + np.arange(alternatives)) % len(vocabulary)
+        return cls(chosen.tolist(), ids.tolist(), values.tolist(), vocabulary, top_k)
+
+    def cursor(self, separator: str = " ") -> "LogprobCursor":
+        return LogprobCursor(self, separator)
+
+
+class LogprobCursor:
+    """Renders consecutive tokens of a choice in the OpenAI logprobs formats.
+
+    ``separator`` is what sits between tokens in the text the offsets index:
+    a space in joined completion text, nothing in a concatenated SSE stream.
+    """
+
+    def __init__(self, table: LogprobTable, separator: str = " ") -> None:
+        self._table = table
+        self._separator_length = len(separator)
+        self._position = 0
+        self._text_offset = 0
+
+    def completion(self, tokens: Sequence[str]) -> dict:
+        """Legacy completions format for ``tokens``, continuing from the last call."""
+        token_logprobs: List[float] = []
+        top_logprobs: List[Dict[str, float]] = []
+        text_offset: List[int] = []
+        for token in tokens:
+            if self._position:
+                self._text_offset += self._separator_length
+            text_offset.append(self._text_offset)
+            self._text_offset += len(token)
+            logprob, alternatives = self._next_row(token)
+            token_logprobs.append(logprob)
+            top: Dict[str, float] = {token: logprob}
+            top.update(alternatives)
+            top_logprobs.append(top)
+        return {
+            "tokens": list(tokens),
+            "token_logprobs": token_logprobs,
+            "top_logprobs": top_logprobs,
+            "text_offset": text_offset,
+        }
+
+    def chat(self, tokens: Sequence[str]) -> dict:
+        """Chat completions format for ``tokens``, continuing from the last call."""
+        include_top = self._table.top_k > 0
+        content: List[dict] = []
+        for token in tokens:
+            logprob, alternatives = self._next_row(token)
+            token_bytes = list(token.encode("utf-8"))
+            top: List[dict] = []
+            if include_top:
+                top.append({"token": token, "logprob": logprob, "bytes": token_bytes})
+                top.extend(
+                    {
+                        "token": alternative,
+                        "logprob": value,
+                        "bytes": list(alternative.encode("utf-8")),
+                    }
+                    for alternative, value in alternatives
+                )
+            content.append(
+                {
+                    "token": token,
+                    "logprob": logprob,
+                    "bytes": token_bytes,
+                    "top_logprobs": top,
+                }
+            )
+        return {"content": content}
+
+    def _next_row(self, token: str) -> Tuple[float, List[Tuple[str, float]]]:
+        table = self._table
+        # Stop-clipped choices never emit more tokens than were drawn, but
+        # wrap rather than fail if a caller over-reads.
+        position = self._position % max(len(table), 1)
+        self._position += 1
+        if not table.chosen:
+            return 0.0, []
+        if not table.alternative_ids:
+            return table.chosen[position], []
+        vocabulary = table.vocabulary
+        ids = table.alternative_ids[position]
+        alternatives = [vocabulary[index] for index in ids]
+        if token in alternatives:
+            # The entry just past the window is distinct from every listed one.
+            alternatives[alternatives.index(token)] = vocabulary[
+                (ids[-1] + 1) % len(vocabulary)
+            ]
+        return table.chosen[position], list(
+            zip(alternatives, table.alternative_values[position])
+        )
+
+
+def completion_top_k(logprobs: Optional[int]) -> Optional[int]:
+    """Candidates per token for a completions ``logprobs`` value, None when off.
+
+    The sampled token is always reported, so ``logprobs=0`` still yields one.
+    """
+    if logprobs is None:
+        return None
+    return max(logprobs, 1)
+
+
+def chat_top_k(logprobs: bool, top_logprobs: Optional[int]) -> Optional[int]:
+    """Candidates per token for chat ``logprobs``/``top_logprobs``, None when off."""
+    if not logprobs:
+        return None
+    return top_logprobs or 0
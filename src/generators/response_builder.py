@@ -15,6 +15,7 @@ from src.models import (
     CompletionChoice,
     CompletionResponse,
     CompletionUsage,
+    PromptTokensDetails,
 )
 
 
@@ -27,6 +28,7 @@ class ResponseBuilder:
         choices: List[CompletionChoice],
         prompt_tokens: int,
         completion_tokens: int,
+        cached_tokens: Optional[int] = None,
     ) -> CompletionResponse:
         completion_id = ResponseBuilder.completion_id()
         created = int(time.time())
@@ -34,6 +36,7 @@ class ResponseBuilder:
             prompt_tokens=prompt_tokens,
             completion_tokens=completion_tokens,
             total_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens_details=ResponseBuilder.prompt_tokens_details(cached_tokens),
         )
         return CompletionResponse(
             id=completion_id,
@@ -44,6 +47,26 @@ class ResponseBuilder:
             usage=usage,
         )
 
+    @staticmethod
+    def completion_payload(
+        model: str,
+        choices: List[dict],
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: Optional[int] = None,
+    ) -> dict:
+        """Plain-dict :meth:`completion_response`, ready to encode directly."""
+        return {
+            "id": ResponseBuilder.completion_id(),
+            "object": "text_completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": choices,
+            "usage": ResponseBuilder.usage_payload(
+                prompt_tokens, completion_tokens, cached_tokens
+            ),
+        }
+
     @staticmethod
     def completion_stream_chunk(
         completion_id: str,
@@ -52,17 +75,15 @@ class ResponseBuilder:
         token_text: str,
         finish_reason: Optional[str],
         completion_tokens: Optional[int] = None,
+        prompt_tokens: Optional[int] = None,
+        logprobs: Optional[dict] = None,
+        cached_tokens: Optional[int] = None,
     ) -> dict:
         created = int(time.time())
         # Include usage in final chunk if completion_tokens is provided
-        # Only include completion_tokens - do NOT include prompt_tokens
-        # because benchmark uses its own tokenizer for prompt_len
-        usage = None
-        if completion_tokens is not None:
-            usage = {
-                "completion_tokens": completion_tokens,
-                "total_tokens": completion_tokens,
-            }
+        usage = ResponseBuilder.stream_usage(
+            completion_tokens, prompt_tokens, cached_tokens
+        )
         return {
             "id": completion_id,
             "object": "text_completion",
@@ -72,7 +93,7 @@ class ResponseBuilder:
                 {
                     "index": choice_index,
                     "text": token_text,
-                    "logprobs": None,
+                    "logprobs": logprobs,
                     "finish_reason": finish_reason,
                 }
             ],
@@ -85,6 +106,7 @@ class ResponseBuilder:
         choices: List[ChatCompletionChoice],
         prompt_tokens: int,
         completion_tokens: int,
+        cached_tokens: Optional[int] = None,
     ) -> ChatCompletionResponse:
         completion_id = ResponseBuilder.completion_id()
         created = int(time.time())
@@ -92,6 +114,7 @@ class ResponseBuilder:
             prompt_tokens=prompt_tokens,
             completion_tokens=completion_tokens,
             total_tokens=prompt_tokens + completion_tokens,
+            prompt_tokens_details=ResponseBuilder.prompt_tokens_details(cached_tokens),
         )
         return ChatCompletionResponse(
             id=completion_id,
@@ -102,6 +125,26 @@ class ResponseBuilder:
             usage=usage,
         )
 
+    @staticmethod
+    def chat_payload(
+        model: str,
+        choices: List[dict],
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: Optional[int] = None,
+    ) -> dict:
+        """Plain-dict :meth:`chat_response`, ready to encode directly."""
+        return {
+            "id": ResponseBuilder.completion_id(),
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": choices,
+            "usage": ResponseBuilder.usage_payload(
+                prompt_tokens, completion_tokens, cached_tokens
+            ),
+        }
+
     @staticmethod
     def chat_stream_chunk(
         completion_id: str,
@@ -110,22 +153,21 @@ class ResponseBuilder:
         token_text: str,
         finish_reason: Optional[str],
         completion_tokens: Optional[int] = None,
+        prompt_tokens: Optional[int] = None,
+        logprobs: Optional[dict] = None,
+        cached_tokens: Optional[int] = None,
     ) -> dict:
         created = int(time.time())
         choice = ChatCompletionStreamChoice(
             index=choice_index,
             delta=ChatCompletionMessage(role="assistant", content=token_text),
             finish_reason=finish_reason,
+            logprobs=logprobs,
         )
         # Include usage in final chunk if completion_tokens is provided
-        # Only include completion_tokens - do NOT include prompt_tokens
-        # because benchmark uses its own tokenizer for prompt_len
-        usage = None
-        if completion_tokens is not None:
-            usage = {
-                "completion_tokens": completion_tokens,
-                "total_tokens": completion_tokens,
-            }
+        usage = ResponseBuilder.stream_usage(
+            completion_tokens, prompt_tokens, cached_tokens
+        )
         return {
             "id": completion_id,
             "object": "chat.completion.chunk",
@@ -135,23 +177,110 @@ class ResponseBuilder:
             "usage": usage,
         }
 
+    @staticmethod
+    def stream_usage(
+        completion_tokens: Optional[int],
+        prompt_tokens: Optional[int],
+        cached_tokens: Optional[int] = None,
+    ) -> Optional[dict]:
+        """Usage for a final stream chunk.
+
+        prompt_tokens is only reported when it comes from a real tokenizer;
+        whitespace estimates are omitted because benchmarks count prompt_len
+        with their own tokenizer and would otherwise see mismatched numbers.
+        cached_tokens is reported whenever the prefix cache is enabled.
+        """
+        if completion_tokens is None:
+            return None
+        if prompt_tokens is None:
+            usage = {
+                "completion_tokens": completion_tokens,
+                "total_tokens": completion_tokens,
+            }
+        else:
+            usage = {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+            }
+        if cached_tokens is not None:
+            usage["prompt_tokens_details"] = {"cached_tokens": cached_tokens}
+        return usage
+
+    @staticmethod
+    def usage_payload(
+        prompt_tokens: int,
+        completion_tokens: int,
+        cached_tokens: Optional[int] = None,
+    ) -> dict:
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens,
+            "prompt_tokens_details": (
+                None if cached_tokens is None else {"cached_tokens": cached_tokens}
+            ),
+        }
+
+    @staticmethod
+    def prompt_tokens_details(
+        cached_tokens: Optional[int],
+    ) -> Optional[PromptTokensDetails]:
+        if cached_tokens is None:
+            return None
+        return PromptTokensDetails(cached_tokens=cached_tokens)
+
     @staticmethod
     def completion_id() -> str:
         return f"cmpl-{uuid.uuid4().hex[:24]}"
 
     @staticmethod
     def completion_choice(
-        index: int, text: str, finish_reason: Optional[str]
+        index: int,
+        text: str,
+        finish_reason: Optional[str],
+        logprobs: Optional[dict] = None,
     ) -> CompletionChoice:
         return CompletionChoice(
-            index=index, text=text, logprobs=None, finish_reason=finish_reason
+            index=index, text=text, logprobs=logprobs, finish_reason=finish_reason
         )
 
     @staticmethod
     def chat_choice(
-        index: int, content: str, finish_reason: Optional[str]
+        index: int,
+        content: str,
+        finish_reason: Optional[str],
+        logprobs: Optional[dict] = None,
     ) -> ChatCompletionChoice:
         message = ChatCompletionMessage(role="assistant", content=content)
         return ChatCompletionChoice(
-            index=index, message=message, finish_reason=finish_reason
+            index=index, message=message, finish_reason=finish_reason, logprobs=logprobs
         )
+
+    @staticmethod
+    def completion_choice_payload(
+        index: int,
+        text: str,
+        finish_reason: Optional[str],
+        logprobs: Optional[dict] = None,
+    ) -> dict:
+        return {
+            "index": index,
+            "text": text,
+            "logprobs": logprobs,
+            "finish_reason": finish_reason,
+        }
+
+    @staticmethod
+    def chat_choice_payload(
+        index: int,
+        content: str,
+        finish_reason: Optional[str],
+        logprobs: Optional[dict] = None,
+    ) -> dict:
+        return {
+            "index": index,
+            "message": {"role": "assistant", "content": content},
+            "finish_reason": finish_reason,
+            "logprobs": logprobs,
+        }
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Pre-encoded SSE frames for per-token stream chunks."""
+
+# Standard library imports
+import json
+from json.encoder import encode_basestring
+from typing import Callable, Optional
+
+# Local/application imports
+from src.generators.response_builder import ResponseBuilder
+
+# Markers built from control characters json.dumps always escapes; only a
+# model name or id holding the same characters can collide with them.
+_TOKEN_MARK = "\x00"
+_LOGPROBS_MARK = {"\x01": 0}
+
+_NULL = b"null"
+
+ChunkFill = Callable[[dict, str, Optional[dict]], dict]
+
+
+class SseFrameTemplate:
+    """Byte template for one choice's token chunks.
+
+    The chunk is rendered once through :class:`ResponseBuilder` with marker
+    values and split around them, so a frame is the cached head, the escaped
+    token, the cached middle, the logprobs (usually ``null``) and the cached
+    tail. Only the token text is escaped per token, with the same encoder
+    ``json.dumps(..., ensure_ascii=False)`` uses, so frames stay
+    byte-for-byte identical to dumping the full chunk. ``created`` is fixed
+    when the template is built, as it is for every chunk of a vLLM stream.
+    If a marker also appears elsewhere in the chunk, ``fill`` copies the
+    marker chunk with the token instead and each frame is dumped in full.
+    """
+
+    __slots__ = ("_chunk", "_fill", "_head", "_middle", "_tail")
+
+    def __init__(self, chunk: dict, fill: ChunkFill) -> None:
+        self._chunk = chunk
+        self._fill = fill
+        self._head: Optional[bytes] = None
+        line = encode_chunk(chunk).decode("utf-8")
+        parts = line.split(encode_basestring(_TOKEN_MARK))
+        if len(parts) != 2:
+            return
+        rest = parts[1].split(json.dumps(_LOGPROBS_MARK))
+        if len(rest) != 2:
+            return
+        self._head = parts[0].encode("utf-8")
+        self._middle = rest[0].encode("utf-8")
+        self._tail = rest[1].encode("utf-8")
+
+    @classmethod
+    def completion(
+        cls, completion_id: str, model: str, choice_index: int
+    ) -> "SseFrameTemplate":
+        return cls(
+            ResponseBuilder.completion_stream_chunk(
+                completion_id=completion_id,
+                model=model,
+                choice_index=choice_index,
+                token_text=_TOKEN_MARK,
+                finish_reason=None,
+                logprobs=_LOGPROBS_MARK,
+            ),
+            _fill_completion,
+        )
+
+    @classmethod
+    def chat(
+        cls, completion_id: str, model: str, choice_index: int
+    ) -> "SseFrameTemplate":
+        return cls(
+            ResponseBuilder.chat_stream_chunk(
+                completion_id=completion_id,
+                model=model,
+                choice_index=choice_index,
+                token_text=_TOKEN_MARK,
+                finish_reason=None,
+                logprobs=_LOGPROBS_MARK,
+            ),
+            _fill_chat,
+        )
+
+    def frame(self, token: str, logprobs: Optional[dict] = None) -> bytes:
+        """Return the ``data: ...`` frame carrying ``token``."""
+        if self._head is None:
+            return encode_chunk(self._fill(self._chunk, token, logprobs))
+        encoded_logprobs = (
+            _NULL
+            if logprobs is None
+            else json.dumps(logprobs, ensure_ascii=False).encode("utf-8")
+        )
+        return b"".join(
+            (
+                self._head,
+                encode_basestring(token).encode("utf-8"),
+                self._middle,
+                encoded_logprobs,
+                self._tail,
+            )
+        )
+
+
+def _fill_completion(chunk: dict, token: str, logprobs: Optional[dict]) -> dict:
+    choice = dict(chunk["choices"][0], text=token, logprobs=logprobs)
+    return dict(chunk, choices=[choice])
+
+
+def _fill_chat(chunk: dict, token: str, logprobs: Optional[dict]) -> dict:
+    choice = chunk["choices"][0]
+    delta = dict(choice["delta"], content=token)
+    return dict(chunk, choices=[dict(choice, delta=delta, logprobs=logprobs)])
+
+
+def encode_chunk(chunk: dict) -> bytes:
+    """Encode a one-off chunk, such as a stream's final chunk, as an SSE frame."""
+    return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+DONE_FRAME = b"data: [DONE]\n\n"
@@ -0,0 +1,174 @@
+#!/usr/bin/env python3
+"""Incremental multi-pattern stop-string matching over token streams."""
+
+# Standard library imports
+from collections import deque
+from functools import lru_cache
+from typing import (
+    Deque,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+
+class StopMatcher:
+    """Aho-Corasick automaton compiled once per distinct set of stop strings."""
+
+    def __init__(self, patterns: Sequence[str]) -> None:
+        unique = [pattern for pattern in dict.fromkeys(patterns) if pattern]
+        if not unique:
+            raise ValueError("StopMatcher requires at least one non-empty pattern")
+        self.patterns: Tuple[str, ...] = tuple(unique)
+        self._goto: List[Dict[str, int]] = [{}]
+        self._depth: List[int] = [0]
+        # Length of the longest pattern that is a suffix of each state's text.
+        self._match_length: List[int] = [0]
+        for pattern in unique:
+            state = 0
+            for char in pattern:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._depth.append(self._depth[state] + 1)
+                    self._match_length.append(0)
+                state = next_state
+            self._match_length[state] = max(self._match_length[state], len(pattern))
+        self._fail: List[int] = [0] * len(self._goto)
+        queue: Deque[int] = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[child] = target if target != child else 0
+                self._match_length[child] = max(
+                    self._match_length[child], self._match_length[self._fail[child]]
+                )
+                queue.append(child)
+
+    def scanner(self) -> "StopScanner":
+        return StopScanner(self)
+
+    def step(self, state: int, char: str) -> int:
+        goto = self._goto
+        fail = self._fail
+        while state and char not in goto[state]:
+            state = fail[state]
+        return goto[state].get(char, 0)
+
+    def depth(self, state: int) -> int:
+        return self._depth[state]
+
+    def match_length(self, state: int) -> int:
+        return self._match_length[state]
+
+
+class StopScanner:
+    """Feeds text through a :class:`StopMatcher` while tracking global offsets."""
+
+    def __init__(self, matcher: StopMatcher) -> None:
+        self._matcher = matcher
+        self._state = 0
+        self.position = 0
+
+    @property
+    def pending(self) -> int:
+        """Trailing characters that could still be the start of a stop string."""
+        return self._matcher.depth(self._state)
+
+    def feed(self, text: str) -> int:
+        """Consume ``text``; return the global start of the first match or -1."""
+        matcher = self._matcher
+        state = self._state
+        for offset, char in enumerate(text):
+            state = matcher.step(state, char)
+            length = matcher.match_length(state)
+            if length:
+                self._state = state
+                end = self.position + offset + 1
+                self.position += len(text)
+                return end - length
+        self._state = state
+        self.position += len(text)
+        return -1
+
+
+class TokenStopFilter:
+    """Apply stop strings to space-joined tokens, emitting only settled tokens.
+
+    Tokens that might be the beginning of a stop string are held back until
+    the automaton rules the match out, so matches spanning token boundaries
+    are caught before any of their text is emitted. The token in which a
+    match starts is clipped to the text before the match.
+    """
+
+    def __init__(self, matcher: StopMatcher) -> None:
+        self._scanner = matcher.scanner()
+        self._pending: Deque[Tuple[int, str]] = deque()
+        self.stopped = False
+
+    def push(self, token: str) -> List[str]:
+        """Feed one token and return the tokens that are now safe to emit."""
+        scanner = self._scanner
+        separator = " " if scanner.position else ""
+        token_start = scanner.position + len(separator)
+        match_start = scanner.feed(separator + token)
+        self._pending.append((token_start, token))
+        released: List[str] = []
+        if match_start >= 0:
+            self.stopped = True
+            for start, pending_token in self._pending:
+                if start >= match_start:
+                    break
+                released.append(pending_token[: match_start - start])
+            self._pending.clear()
+            return released
+        settled_end = scanner.position - scanner.pending
+        while self._pending:
+            start, pending_token = self._pending[0]
+            if start + len(pending_token) > settled_end:
+                break
+            released.append(pending_token)
+            self._pending.popleft()
+        return released
+
+    def flush(self) -> List[str]:
+        """Release held-back tokens once the stream ends without a match."""
+        released = [token for _, token in self._pending]
+        self._pending.clear()
+        return released
+
+    def filter(self, tokens: Iterable[str]) -> Iterator[str]:
+        """Yield the emitted tokens of ``tokens``, stopping at the first match."""
+        for token in tokens:
+            yield from self.push(token)
+            if self.stopped:
+                return
+        yield from self.flush()
+
+
+def stop_matcher_for(
+    stop: Optional[Union[str, Sequence[str]]],
+) -> Optional[StopMatcher]:
+    """Return a (cached) matcher for a request's ``stop`` field, if it has any."""
+    if not stop:
+        return None
+    patterns = (stop,) if isinstance(stop, str) else tuple(stop)
+    if not any(patterns):
+        return None
+    return _compiled_matcher(patterns)
+
+
+@lru_cache(maxsize=256)
+def _compiled_matcher(patterns: Tuple[str, ...]) -> StopMatcher:
+    return StopMatcher(patterns)
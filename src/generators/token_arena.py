@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+"""Pre-tokenized, cyclic token buffer shared by every generated response."""
+
+# Standard library imports
+from dataclasses import dataclass
+from itertools import cycle, islice
+from typing import Iterator, List, Optional, Protocol, Sequence, Tuple
+
+
+class TokenSource(Protocol):
+    """Anything the generator can cut ``(offset, length)`` token views from."""
+
+    def __len__(self) -> int: ...
+
+    @property
+    def start_count(self) -> int: ...
+
+    def start(self, index: int) -> Tuple[int, Optional[int]]: ...
+
+    def span(self, offset: int, length: int) -> "TokenSpan": ...
+
+    def text(self, offset: int, length: int) -> str: ...
+
+    def iter_tokens(self, offset: int, length: int) -> Iterator[str]: ...
+
+
+class TokenArena:
+    """Flat, immutable, cyclic buffer built once from a pool of response texts.
+
+    Responses are described as ``(offset, length)`` views over the buffer, so a
+    request never copies token lists regardless of how large ``max_tokens`` is.
+    Each pool entry is kept as a segment so callers can start on a sentence
+    boundary and know the entry's natural length.
+    """
+
+    def __init__(self, texts: Sequence[str]) -> None:
+        tokens: List[str] = []
+        segments: List[Tuple[int, int]] = []
+        for text in texts:
+            words = text.split()
+            if not words:
+                continue
+            segments.append((len(tokens), len(words)))
+            tokens.extend(words)
+        if not tokens:
+            raise ValueError("TokenArena requires at least one non-empty text")
+
+        char_starts: List[int] = []
+        position = 0
+        for token in tokens:
+            char_starts.append(position)
+            position += len(token) + 1
+
+        self._tokens: Tuple[str, ...] = tuple(tokens)
+        self._segments: Tuple[Tuple[int, int], ...] = tuple(segments)
+        self._char_starts: Tuple[int, ...] = tuple(char_starts)
+        # The trailing separator makes the joined text cyclic: the character
+        # after the last token is the space that precedes token zero.
+        self._text = " ".join(tokens) + " "
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    @property
+    def start_count(self) -> int:
+        return len(self._segments)
+
+    def start(self, index: int) -> Tuple[int, Optional[int]]:
+        """Return ``(offset, natural_length)`` of the pool entry at ``index``."""
+        return self._segments[index]
+
+    def span(self, offset: int, length: int) -> "TokenSpan":
+        """Return a view of ``length`` tokens starting at ``offset``."""
+        return TokenSpan(self, offset % len(self._tokens), max(0, length))
+
+    def text(self, offset: int, length: int) -> str:
+        """Materialize the space-joined text of a view without building token lists."""
+        if length <= 0:
+            return ""
+        size = len(self._tokens)
+        period = len(self._text)
+        start = self._char_starts[offset]
+        wraps, last_index = divmod(offset + length - 1, size)
+        end = (
+            wraps * period
+            + self._char_starts[last_index]
+            + len(self._tokens[last_index])
+        )
+        if end <= period:
+            return self._text[start:end]
+        full_cycles, tail = divmod(end, period)
+        return "".join(
+            (self._text[start:], self._text * (full_cycles - 1), self._text[:tail])
+        )
+
+    def iter_tokens(self, offset: int, length: int) -> Iterator[str]:
+        """Iterate over the tokens of a view, wrapping around the buffer."""
+        return islice(cycle(self._tokens), offset, offset + length)
+
+
+@dataclass(frozen=True)
+class TokenSpan:
+    """An ``(offset, length)`` view over a :class:`TokenSource`."""
+
+    source: TokenSource
+    offset: int
+    length: int
+
+    def __len__(self) -> int:
+        return self.length
+
+    def __iter__(self) -> Iterator[str]:
+        return self.source.iter_tokens(self.offset, self.length)
+
+    def text(self) -> str:
+        return self.source.text(self.offset, self.length)
@@ -0,0 +1,377 @@
+#!/usr/bin/env python3
+"""Optional local byte-level BPE tokenizer for accurate token accounting."""
+
+# Standard library imports
+import json
+import os
+import re
+import sys
+import unicodedata
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern, Sequence, Tuple, Union
+
+# Local/application imports
+from src.config import settings
+from src.utils.lru import LRUCache
+
+# GPT-2 style pre-tokenization expressed with the stdlib ``re`` module:
+# letters are ``[^\W\d_]`` and "other" symbols are ``[^\s\w]`` or ``_``.
+_PRETOKENIZE_PATTERN = re.compile(
+    r"""'(?:[sdmt]|ll|ve|re)| ?[^\W\d_]+| ?\d+| ?(?:[^\s\w]|_)+|\s+(?!\S)|\s+"""
+)
+_WORD_CACHE_LIMIT = 65536
+_UNICODE_FORMS = ("NFC", "NFD", "NFKC", "NFKD")
+# ``\p{L}``-style property classes, which ``tokenizer.json`` Split patterns
+# use (Oniguruma syntax) and the stdlib ``re`` module lacks.
+_PROPERTY_CLASS = re.compile(r"\\([pP])\{(\w+)\}")
+
+
+def _bytes_to_unicode() -> Dict[int, str]:
+    """Return GPT-2's reversible byte -> printable character mapping."""
+    printable = (
+        list(range(ord("!"), ord("~") + 1))
+        + list(range(ord("¡"), ord("¬") + 1))
+        + list(range(ord("®"), ord("ÿ") + 1))
+    )
+    characters = printable[:]
+    extra = 0
+    for byte in range(256):
+        if byte not in printable:
+            printable.append(byte)
+            characters.append(256 + extra)
+            extra += 1
+    return {byte: chr(char) for byte, char in zip(printable, characters)}
+
+
+_BYTE_ENCODER = _bytes_to_unicode()
+
+
+class PreTokenizer:
+    """Split text into the words BPE merges run within.
+
+    Built from the ``normalizer`` and ``pre_tokenizer`` of ``tokenizer.json``:
+    an optional Unicode normalization form, then each Split regex in turn,
+    with matches and the text between them kept as separate words (the
+    ``Isolated`` behaviour). Byte-level pre-tokenizers contribute the GPT-2
+    regex unless ``use_regex`` is off. Other pre-tokenizers are rejected
+    rather than silently counted with the wrong splits.
+    """
+
+    __slots__ = ("_patterns", "_add_prefix_space", "_normalization")
+
+    def __init__(
+        self,
+        patterns: Sequence[Pattern[str]] = (_PRETOKENIZE_PATTERN,),
+        add_prefix_space: bool = False,
+        normalization: Optional[str] = None,
+    ) -> None:
+        self._patterns = tuple(patterns)
+        self._add_prefix_space = add_prefix_space
+        self._normalization = normalization
+
+    @classmethod
+    def from_config(
+        cls,
+        pre_tokenizer: Optional[Dict[str, Any]],
+        normalizer: Optional[Dict[str, Any]] = None,
+    ) -> "PreTokenizer":
+        """Read the ``pre_tokenizer`` and ``normalizer`` of ``tokenizer.json``.
+
+        A file without a pre-tokenizer keeps the GPT-2 split, as files
+        without one were always read.
+        """
+        normalization = _normalization_form(normalizer)
+        if pre_tokenizer is None:
+            return cls(normalization=normalization)
+        patterns: List[Pattern[str]] = []
+        add_prefix_space = False
+        for step in _flatten(pre_tokenizer, "pretokenizers"):
+            kind = step.get("type")
+            if kind == "ByteLevel":
+                add_prefix_space = add_prefix_space or step.get(
+                    "add_prefix_space", False
+                )
+                if step.get("use_regex", True):
+                    patterns.append(_PRETOKENIZE_PATTERN)
+            elif kind == "Split":
+                patterns.append(_split_pattern(step))
+            else:
+                raise ValueError(f"Unsupported pre-tokenizer '{kind}'")
+        return cls(patterns, add_prefix_space, normalization)
+
+    def split(self, text: str) -> List[str]:
+        if self._normalization is not None:
+            text = unicodedata.normalize(self._normalization, text)
+        if self._add_prefix_space and not text.startswith(" "):
+            text = " " + text
+        words = [text]
+        for pattern in self._patterns:
+            words = [piece for word in words for piece in _isolate(pattern, word)]
+        return words
+
+
+def _isolate(pattern: Pattern[str], text: str) -> List[str]:
+    """Matches of ``pattern`` in ``text`` plus the unmatched text between them."""
+    words = pattern.findall(text)
+    # Patterns such as GPT-2's match every character, so the gaps are rare.
+    if sum(map(len, words)) == len(text):
+        return words
+    words = []
+    end = 0
+    for match in pattern.finditer(text):
+        if match.start() > end:
+            words.append(text[end : match.start()])
+        if match.end() > match.start():
+            words.append(match.group())
+        end = match.end()
+    if end < len(text):
+        words.append(text[end:])
+    return words
+
+
+def _flatten(node: Dict[str, Any], children: str) -> List[Dict[str, Any]]:
+    if node.get("type") == "Sequence":
+        return [step for child in node[children] for step in _flatten(child, children)]
+    return [node]
+
+
+def _normalization_form(normalizer: Optional[Dict[str, Any]]) -> Optional[str]:
+    if normalizer is None:
+        return None
+    forms = [step.get("type") for step in _flatten(normalizer, "normalizers")]
+    unsupported = [form for form in forms if form not in _UNICODE_FORMS]
+    if unsupported or len(forms) > 1:
+        raise ValueError(f"Unsupported normalizer '{', '.join(map(str, forms))}'")
+    return forms[0]
+
+
+def _split_pattern(step: Dict[str, Any]) -> Pattern[str]:
+    behavior = step.get("behavior", "Isolated")
+    if behavior != "Isolated" or step.get("invert", False):
+        raise ValueError(f"Unsupported Split pre-tokenizer behavior '{behavior}'")
+    pattern = step.get("pattern", {})
+    if "String" in pattern:
+        return re.compile(re.escape(pattern["String"]))
+    return re.compile(_stdlib_pattern(pattern["Regex"]))
+
+
+def _stdlib_pattern(pattern: str) -> str:
+    r"""Rewrite ``\p{..}`` classes as explicit code point ranges."""
+    translated: List[str] = []
+    in_class = False
+    index = 0
+    while index < len(pattern):
+        char = pattern[index]
+        if char == "\\":
+            match = _PROPERTY_CLASS.match(pattern, index)
+            if match is None:
+                translated.append(pattern[index : index + 2])
+                index += 2
+                continue
+            negated, category = match.group(1) == "P", match.group(2)
+            ranges = _category_ranges(category)
+            if in_class and negated:
+                raise ValueError(f"Unsupported pattern class '{match.group()}'")
+            if in_class:
+                translated.append(ranges)
+            else:
+                translated.append(f"[{'^' if negated else ''}{ranges}]")
+            index = match.end()
+            continue
+        if char == "[" and not in_class:
+            in_class = True
+            translated.append(char)
+            index += 1
+            # A ``]`` right after the opening bracket is a literal.
+            if pattern.startswith("^", index):
+                translated.append("^")
+                index += 1
+            if pattern.startswith("]", index):
+                translated.append("\\]")
+                index += 1
+            continue
+        if char == "]" and in_class:
+            in_class = False
+        translated.append(char)
+        index += 1
+    return "".join(translated)
+
+
+@lru_cache(maxsize=None)
+def _category_ranges(category: str) -> str:
+    """Code point ranges, in ``re`` class syntax, of a Unicode category prefix."""
+    if not category or category[0] not in "CLMNPSZ" or len(category) > 2:
+        raise ValueError(f"Unsupported Unicode property '{category}'")
+    ranges: List[str] = []
+    start = None
+    for code_point in range(sys.maxunicode + 2):
+        inside = code_point <= sys.maxunicode and unicodedata.category(
+            chr(code_point)
+        ).startswith(category)
+        if inside and start is None:
+            start = code_point
+        elif not inside and start is not None:
+            ranges.append(f"\\U{start:08x}-\\U{code_point - 1:08x}")
+            start = None
+    return "".join(ranges)
+
+
+class BPETokenizer:
+    """Byte-level BPE encoder built from a local vocabulary and merge list.
+
+    Whole-text counts are memoized in a bounded LRU keyed by the text's hash
+    and length, and individual pre-tokenized words are memoized as well, so
+    repeated prompts cost a hash and typical unseen prompts mostly hit the
+    word cache.
+    """
+
+    def __init__(
+        self,
+        vocab: Dict[str, int],
+        merges: Sequence[Tuple[str, str]],
+        cache_size: int = 4096,
+        pre_tokenizer: Optional[PreTokenizer] = None,
+    ) -> None:
+        self._vocab = vocab
+        self._pre_tokenizer = pre_tokenizer or PreTokenizer()
+        self._ranks: Dict[Tuple[str, str], int] = {
+            pair: rank for rank, pair in enumerate(merges)
+        }
+        self._unknown_id = vocab.get("<unk>", 0)
+        self._word_cache: Dict[str, Tuple[str, ...]] = {}
+        self._count_cache: LRUCache[int] = LRUCache(cache_size)
+
+    @classmethod
+    def from_file(cls, path: str, cache_size: int = 4096) -> "BPETokenizer":
+        """Load ``tokenizer.json``, a ``vocab.json``, or a directory holding either."""
+        if os.path.isdir(path):
+            candidate = os.path.join(path, "tokenizer.json")
+            if os.path.exists(candidate):
+                return cls._from_tokenizer_json(candidate, cache_size)
+            return cls._from_vocab_and_merges(
+                os.path.join(path, "vocab.json"),
+                os.path.join(path, "merges.txt"),
+                cache_size,
+            )
+        if os.path.basename(path) == "vocab.json":
+            merges_path = os.path.join(os.path.dirname(path), "merges.txt")
+            return cls._from_vocab_and_merges(path, merges_path, cache_size)
+        return cls._from_tokenizer_json(path, cache_size)
+
+    @classmethod
+    def _from_tokenizer_json(cls, path: str, cache_size: int) -> "BPETokenizer":
+        with open(path, "r", encoding="utf-8") as tokenizer_file:
+            config = json.load(tokenizer_file)
+        model = config.get("model", {})
+        if model.get("type", "BPE") != "BPE":
+            raise ValueError(f"Tokenizer '{path}' is not a BPE model")
+        try:
+            pre_tokenizer = PreTokenizer.from_config(
+                config.get("pre_tokenizer"), config.get("normalizer")
+            )
+        except ValueError as exc:
+            raise ValueError(f"Tokenizer '{path}': {exc}") from None
+        merges = [_parse_merge(entry) for entry in model.get("merges", [])]
+        return cls(model.get("vocab", {}), merges, cache_size, pre_tokenizer)
+
+    @classmethod
+    def _from_vocab_and_merges(
+        cls, vocab_path: str, merges_path: str, cache_size: int
+    ) -> "BPETokenizer":
+        with open(vocab_path, "r", encoding="utf-8") as vocab_file:
+            vocab = json.load(vocab_file)
+        merges: List[Tuple[str, str]] = []
+        with open(merges_path, "r", encoding="utf-8") as merges_file:
+            for line in merges_file:
+                line = line.rstrip("\n")
+                if not line or line.startswith("#version"):
+                    continue
+                merges.append(_parse_merge(line))
+        return cls(vocab, merges, cache_size)
+
+    def count(self, text: str) -> int:
+        """Return the number of tokens in ``text``."""
+        if not text:
+            return 0
+        key = (hash(text), len(text))
+        cached = self._count_cache.get(key)
+        if cached is not None:
+            return cached
+        total = 0
+        for word in self._pre_tokenizer.split(text):
+            total += len(self._word_symbols(word))
+        self._count_cache.put(key, total)
+        return total
+
+    def encode(self, text: str) -> List[int]:
+        """Return token ids for ``text``."""
+        vocab = self._vocab
+        unknown = self._unknown_id
+        ids: List[int] = []
+        for word in self._pre_tokenizer.split(text):
+            ids.extend(
+                vocab.get(symbol, unknown) for symbol in self._word_symbols(word)
+            )
+        return ids
+
+    def _word_symbols(self, word: str) -> Tuple[str, ...]:
+        cached = self._word_cache.get(word)
+        if cached is not None:
+            return cached
+        symbols = self._bpe(
+            "".join(_BYTE_ENCODER[byte] for byte in word.encode("utf-8"))
+        )
+        if len(self._word_cache) >= _WORD_CACHE_LIMIT:
+            self._word_cache.clear()
+        self._word_cache[word] = symbols
+        return symbols
+
+    def _bpe(self, token: str) -> Tuple[str, ...]:
+        """Apply merges in rank order until no adjacent pair is mergeable."""
+        symbols = list(token)
+        if len(symbols) < 2:
+            return tuple(symbols)
+        ranks = self._ranks
+        while len(symbols) > 1:
+            best_rank = None
+            best_index = -1
+            for index in range(len(symbols) - 1):
+                rank = ranks.get((symbols[index], symbols[index + 1]))
+                if rank is not None and (best_rank is None or rank < best_rank):
+                    best_rank = rank
+                    best_index = index
+            if best_rank is None:
+                break
+            first, second = symbols[best_index], symbols[best_index + 1]
+            merged: List[str] = []
+            index = 0
+            while index < len(symbols):
+                if (
+                    index < len(symbols) - 1
+                    and symbols[index] == first
+                    and symbols[index + 1] == second
+                ):
+                    merged.append(first + second)
+                    index += 2
+                else:
+                    merged.append(symbols[index])
+                    index += 1
+            symbols = merged
+        return tuple(symbols)
+
+
+def load_tokenizer() -> Optional[BPETokenizer]:
+    """Load the tokenizer configured in settings, if any."""
+    if not settings.tokenizer_path:
+        return None
+    return BPETokenizer.from_file(
+        settings.tokenizer_path, cache_size=settings.tokenizer_cache_size
+    )
+
+
+def _parse_merge(entry: Union[str, Sequence[str]]) -> Tuple[str, str]:
+    if isinstance(entry, str):
+        first, second = entry.split(" ", 1)
+        return first, second
+    first, second = entry
+    return first, second
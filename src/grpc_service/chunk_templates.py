@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+"""Pre-serialized wire templates for streamed gRPC token chunks."""
+
+# Standard library imports
+from __future__ import annotations
+
+import time
+from typing import Union
+
+# Third-party imports
+from google.protobuf.descriptor import Descriptor
+from google.protobuf.message import Message
+
+# Local/application imports
+from src.grpc_service.proto import openai_pb2
+
+_ONE_BYTE_VARINTS = tuple(bytes((value,)) for value in range(0x80))
+
+
+def _length_delimited_tag(descriptor: Descriptor, field_name: str) -> bytes:
+    """Wire tag of a string or message field (wire type 2)."""
+    return _varint(descriptor.fields_by_name[field_name].number << 3 | 2)
+
+
+def _varint(value: int) -> bytes:
+    if value < 0x80:
+        return _ONE_BYTE_VARINTS[value]
+    encoded = bytearray()
+    while value >= 0x80:
+        encoded.append(value & 0x7F | 0x80)
+        value >>= 7
+    encoded.append(value)
+    return bytes(encoded)
+
+
+_COMPLETION_CHOICES_TAG = _length_delimited_tag(
+    openai_pb2.CompletionChunk.DESCRIPTOR, "choices"
+)
+_COMPLETION_TEXT_TAG = _length_delimited_tag(
+    openai_pb2.CompletionChunkChoice.DESCRIPTOR, "text"
+)
+_CHAT_CHOICES_TAG = _length_delimited_tag(
+    openai_pb2.ChatCompletionChunk.DESCRIPTOR, "choices"
+)
+_CHAT_DELTA_TAG = _length_delimited_tag(openai_pb2.ChatChunkChoice.DESCRIPTOR, "delta")
+_CHAT_CONTENT_TAG = _length_delimited_tag(openai_pb2.ChatDelta.DESCRIPTOR, "content")
+
+
+class ChunkTemplate:
+    """Wire-format template for one choice's token chunks.
+
+    ``id``, ``object``, ``created``, ``model`` and the choice index are
+    serialized once per choice; a token chunk is then that prefix plus the
+    length-prefixed text, byte-for-byte what ``converters`` would serialize
+    for the same chunk. Stream handlers are registered with a serializer that
+    passes these bytes through (see ``server._add_servicer``). Chunks with a
+    finish reason, usage or logprobs are rare and still built as messages,
+    using ``created`` so the stream keeps one timestamp.
+    """
+
+    __slots__ = ("created", "_prefix", "_choice_head", "_text_tag", "_delta_tag")
+
+    def __init__(
+        self,
+        chunk: Message,
+        choice: Message,
+        choices_tag: bytes,
+        text_tag: bytes,
+        delta_tag: bytes = b"",
+    ) -> None:
+        self.created = chunk.created
+        self._prefix = chunk.SerializeToString() + choices_tag
+        self._choice_head = choice.SerializeToString()
+        self._text_tag = text_tag
+        self._delta_tag = delta_tag
+
+    @classmethod
+    def completion(
+        cls, completion_id: str, model: str, choice_index: int
+    ) -> ChunkTemplate:
+        return cls(
+            openai_pb2.CompletionChunk(
+                id=completion_id,
+                object="text_completion",
+                created=int(time.time()),
+                model=model,
+            ),
+            openai_pb2.CompletionChunkChoice(index=choice_index),
+            _COMPLETION_CHOICES_TAG,
+            _COMPLETION_TEXT_TAG,
+        )
+
+    @classmethod
+    def chat(cls, completion_id: str, model: str, choice_index: int) -> ChunkTemplate:
+        return cls(
+            openai_pb2.ChatCompletionChunk(
+                id=completion_id,
+                object="chat.completion.chunk",
+                created=int(time.time()),
+                model=model,
+            ),
+            openai_pb2.ChatChunkChoice(index=choice_index),
+            _CHAT_CHOICES_TAG,
+            _CHAT_CONTENT_TAG,
+            _CHAT_DELTA_TAG,
+        )
+
+    def frame(self, text: str) -> bytes:
+        """Return the serialized chunk carrying ``text``."""
+        data = text.encode("utf-8")
+        text_length = _varint(len(data))
+        field_length = len(self._text_tag) + len(text_length) + len(data)
+        if self._delta_tag:
+            # ``delta.content`` is optional, so it is sent even when empty.
+            delta_length = _varint(field_length)
+            field_length += len(self._delta_tag) + len(delta_length)
+        elif data:
+            delta_length = b""
+        else:
+            # Plain ``text`` is omitted when empty, as proto3 does.
+            return b"".join(
+                (self._prefix, _varint(len(self._choice_head)), self._choice_head)
+            )
+        return b"".join(
+            (
+                self._prefix,
+                _varint(len(self._choice_head) + field_length),
+                self._choice_head,
+                self._delta_tag,
+                delta_length,
+                self._text_tag,
+                text_length,
+                data,
+            )
+        )
+
+
+def serialize_chunk(chunk: Union[bytes, Message]) -> bytes:
+    """Response serializer for stream methods that yield templates' bytes."""
+    if isinstance(chunk, bytes):
+        return chunk
+    return chunk.SerializeToString()
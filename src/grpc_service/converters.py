@@ -46,6 +46,14 @@ def chat_request_from_proto(
         payload["top_p"] = grpc_request.top_p
     if grpc_request.HasField("n"):
         payload["n"] = grpc_request.n
+    if grpc_request.HasField("seed"):
+        payload["seed"] = grpc_request.seed
+    if grpc_request.HasField("priority"):
+        payload["priority"] = grpc_request.priority
+    if grpc_request.HasField("logprobs"):
+        payload["logprobs"] = grpc_request.logprobs
+    if grpc_request.HasField("top_logprobs"):
+        payload["top_logprobs"] = grpc_request.top_logprobs
 
     if grpc_request.stop:
         payload["stop"] = list(grpc_request.stop)
@@ -81,6 +89,13 @@ def completion_request_from_proto(
         payload["top_p"] = grpc_request.top_p
     if grpc_request.HasField("n"):
         payload["n"] = grpc_request.n
+    if grpc_request.HasField("seed"):
+        payload["seed"] = grpc_request.seed
+    if grpc_request.HasField("priority"):
+        payload["priority"] = grpc_request.priority
+    # The proto splits the legacy integer ``logprobs`` into a flag plus count.
+    if grpc_request.logprobs:
+        payload["logprobs"] = grpc_request.top_logprobs
 
     if grpc_request.stop:
         payload["stop"] = list(grpc_request.stop)
@@ -111,6 +126,8 @@ def completion_response_to_proto(
         pb_choice.text = choice.text
         if choice.finish_reason is not None:
             pb_choice.finish_reason = choice.finish_reason
+        if choice.logprobs is not None:
+            populate_completion_logprobs(pb_choice.logprobs, choice.logprobs)
     return proto
 
 
@@ -132,6 +149,8 @@ def chat_response_to_proto(
         pb_choice.message.content = choice.message.content
         if choice.finish_reason is not None:
             pb_choice.finish_reason = choice.finish_reason
+        if choice.logprobs is not None:
+            populate_chat_logprobs(pb_choice.logprobs, choice.logprobs)
     return proto
 
 
@@ -143,11 +162,15 @@ def completion_chunk_from_choice(
     text: str,
     finish_reason: Optional[str],
     completion_tokens: Optional[int] = None,
+    prompt_tokens: Optional[int] = None,
+    logprobs: Optional[dict] = None,
+    cached_tokens: Optional[int] = None,
+    created: Optional[int] = None,
 ) -> openai_pb2.CompletionChunk:
     chunk = openai_pb2.CompletionChunk(
         id=completion_id,
         object="text_completion",
-        created=int(time.time()),
+        created=int(time.time()) if created is None else created,
         model=model,
     )
     choice = chunk.choices.add()
@@ -155,12 +178,12 @@ def completion_chunk_from_choice(
     choice.text = text
     if finish_reason is not None:
         choice.finish_reason = finish_reason
+    if logprobs is not None:
+        populate_completion_logprobs(choice.logprobs, logprobs)
     if completion_tokens is not None:
-        # Only send completion_tokens, not prompt_tokens.
-        # The benchmark uses its own tokenizer for prompt_len, which is more accurate
-        # than our simple whitespace-based tokenization.
-        chunk.usage.completion_tokens = completion_tokens
-        chunk.usage.total_tokens = completion_tokens
+        _populate_stream_usage(
+            chunk.usage, completion_tokens, prompt_tokens, cached_tokens
+        )
     return chunk
 
 
@@ -172,11 +195,15 @@ def chat_chunk_from_delta(
     content: str,
     finish_reason: Optional[str],
     completion_tokens: Optional[int] = None,
+    prompt_tokens: Optional[int] = None,
+    logprobs: Optional[dict] = None,
+    cached_tokens: Optional[int] = None,
+    created: Optional[int] = None,
 ) -> openai_pb2.ChatCompletionChunk:
     chunk = openai_pb2.ChatCompletionChunk(
         id=completion_id,
         object="chat.completion.chunk",
-        created=int(time.time()),
+        created=int(time.time()) if created is None else created,
         model=model,
     )
     choice = chunk.choices.add()
@@ -184,16 +211,65 @@ def chat_chunk_from_delta(
     choice.delta.content = content
     if finish_reason is not None:
         choice.finish_reason = finish_reason
+    if logprobs is not None:
+        populate_chat_logprobs(choice.logprobs, logprobs)
     if completion_tokens is not None:
-        # Only send completion_tokens, not prompt_tokens.
-        # The benchmark uses its own tokenizer for prompt_len, which is more accurate
-        # than our simple whitespace-based tokenization.
-        chunk.usage.completion_tokens = completion_tokens
-        chunk.usage.total_tokens = completion_tokens
+        _populate_stream_usage(
+            chunk.usage, completion_tokens, prompt_tokens, cached_tokens
+        )
     return chunk
 
 
+def _populate_stream_usage(
+    proto_usage: openai_pb2.Usage,
+    completion_tokens: int,
+    prompt_tokens: Optional[int],
+    cached_tokens: Optional[int] = None,
+) -> None:
+    # prompt_tokens is only sent when a real tokenizer produced it. The
+    # benchmark uses its own tokenizer for prompt_len, which is more accurate
+    # than our simple whitespace-based tokenization.
+    proto_usage.completion_tokens = completion_tokens
+    proto_usage.total_tokens = completion_tokens
+    if prompt_tokens is not None:
+        proto_usage.prompt_tokens = prompt_tokens
+        proto_usage.total_tokens = prompt_tokens + completion_tokens
+    if cached_tokens is not None:
+        proto_usage.prompt_tokens_details.cached_tokens = cached_tokens
+
+
+def populate_completion_logprobs(
+    proto_logprobs: openai_pb2.CompletionLogprobs, logprobs: Dict[str, Any]
+) -> None:
+    proto_logprobs.SetInParent()
+    proto_logprobs.tokens.extend(logprobs["tokens"])
+    proto_logprobs.token_logprobs.extend(logprobs["token_logprobs"])
+    proto_logprobs.text_offset.extend(logprobs["text_offset"])
+    for top in logprobs["top_logprobs"]:
+        proto_logprobs.top_logprobs.add().top_logprobs.update(top)
+
+
+def populate_chat_logprobs(
+    proto_logprobs: openai_pb2.ChatLogprobs, logprobs: Dict[str, Any]
+) -> None:
+    proto_logprobs.SetInParent()
+    for entry in logprobs["content"]:
+        proto_entry = proto_logprobs.content.add(
+            token=entry["token"],
+            logprob=entry["logprob"],
+            token_bytes=entry["bytes"],
+        )
+        for top in entry["top_logprobs"]:
+            proto_entry.top_logprobs.add(
+                token=top["token"], logprob=top["logprob"], token_bytes=top["bytes"]
+            )
+
+
 def _populate_usage(proto_usage: openai_pb2.Usage, usage: CompletionUsage) -> None:
     proto_usage.prompt_tokens = usage.prompt_tokens
     proto_usage.completion_tokens = usage.completion_tokens
     proto_usage.total_tokens = usage.total_tokens
+    if usage.prompt_tokens_details is not None:
+        proto_usage.prompt_tokens_details.cached_tokens = (
+            usage.prompt_tokens_details.cached_tokens
+        )
@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""Proto-to-proto unary handlers that skip the pydantic request and response models."""
+
+# Standard library imports
+from __future__ import annotations
+
+import time
+from dataclasses import dataclass
+from typing import List, NamedTuple, Optional, Sequence
+
+# Third-party imports
+from pydantic import ValidationError
+
+# Local/application imports
+from src.config import settings
+from src.generators.dummy_generator import DummyTextGenerator
+from src.generators.logprobs import chat_top_k, completion_top_k
+from src.generators.response_builder import ResponseBuilder
+from src.grpc_service import converters
+from src.grpc_service.proto import openai_pb2
+from src.utils.rng import RequestRng
+
+# Bounds the pydantic request models put on logprob counts.
+_MAX_LOGPROBS = 20
+
+
+class InvalidArgument(ValueError):
+    """A request field the pydantic models would reject, worded as they word it."""
+
+    def __init__(self, param: str, detail: str) -> None:
+        super().__init__(f"Invalid '{param}': {detail}")
+
+    @classmethod
+    def from_validation_error(cls, exc: ValidationError) -> InvalidArgument:
+        error = exc.errors()[0]
+        return cls(".".join(str(part) for part in error["loc"]), error["msg"])
+
+
+class PromptMessage(NamedTuple):
+    """Stand-in for a chat message whose proto role was left empty."""
+
+    role: str
+    content: str
+
+
+@dataclass(frozen=True)
+class CompletionParams:
+    """The fields of a ``CompletionRequest`` proto that shape the response."""
+
+    model: str
+    prompts: List[str]
+    max_tokens: int
+    n: int
+    seed: Optional[int]
+    stop: Optional[List[str]]
+    top_k: Optional[int]
+
+
+@dataclass(frozen=True)
+class ChatParams:
+    """The fields of a ``ChatCompletionRequest`` proto that shape the response."""
+
+    model: str
+    messages: Sequence[openai_pb2.ChatMessage | PromptMessage]
+    max_tokens: int
+    n: int
+    seed: Optional[int]
+    stop: Optional[List[str]]
+    top_k: Optional[int]
+
+
+def completion_params(
+    request: openai_pb2.CompletionRequest, *, default_model: str
+) -> CompletionParams:
+    """Read and check the proto the way ``completion_request_from_proto`` does."""
+    prompt_type = request.WhichOneof("prompt_type")
+    if prompt_type is None:
+        raise InvalidArgument("prompt", "Field required")
+    if prompt_type == "prompt":
+        prompts = [request.prompt]
+    else:
+        prompts = [text or "" for text in request.prompts.values] or [""]
+    top_k = None
+    # The proto splits the legacy integer ``logprobs`` into a flag plus count.
+    if request.logprobs:
+        top_k = completion_top_k(
+            _bounded("logprobs", request.top_logprobs, 0, _MAX_LOGPROBS)
+        )
+    return CompletionParams(
+        model=request.model or default_model,
+        prompts=prompts,
+        max_tokens=_max_tokens(request),
+        n=request.n if request.HasField("n") else 1,
+        seed=request.seed if request.HasField("seed") else None,
+        stop=list(request.stop) or None,
+        top_k=top_k,
+    )
+
+
+def chat_params(
+    request: openai_pb2.ChatCompletionRequest, *, default_model: str
+) -> ChatParams:
+    """Read and check the proto the way ``chat_request_from_proto`` does."""
+    messages = request.messages
+    if not all(message.role for message in messages):
+        messages = [
+            PromptMessage(message.role or "user", message.content)
+            for message in messages
+        ]
+    top_logprobs = None
+    if request.HasField("top_logprobs"):
+        top_logprobs = _bounded("top_logprobs", request.top_logprobs, 0, _MAX_LOGPROBS)
+    return ChatParams(
+        model=request.model or default_model,
+        messages=messages,
+        max_tokens=_max_tokens(request),
+        n=request.n if request.HasField("n") else 1,
+        seed=request.seed if request.HasField("seed") else None,
+        stop=list(request.stop) or None,
+        top_k=chat_top_k(request.logprobs, top_logprobs),
+    )
+
+
+def completion_response(params: CompletionParams) -> openai_pb2.CompletionResponse:
+    """Generate the choices straight into a ``CompletionResponse`` proto."""
+    response = openai_pb2.CompletionResponse(
+        id=ResponseBuilder.completion_id(),
+        object="text_completion",
+        created=int(time.time()),
+        model=params.model,
+    )
+    rng = RequestRng.for_request(params.seed)
+    cached_counts = [
+        DummyTextGenerator.cached_prompt_tokens(prompt_text)
+        for prompt_text in params.prompts
+    ]
+    total_prompt_tokens = 0
+    total_completion_tokens = 0
+    choice_index = 0
+    for prompt_text in params.prompts:
+        total_prompt_tokens += DummyTextGenerator.estimate_token_count(prompt_text)
+        for _ in range(params.n):
+            logprobs = None
+            if params.top_k is None:
+                text, completion_tokens, finish_reason = (
+                    DummyTextGenerator.generate_choice(
+                        max_tokens=params.max_tokens,
+                        rng=rng.child(choice_index),
+                        stop=params.stop,
+                    )
+                )
+            else:
+                text, completion_tokens, finish_reason, logprobs = (
+                    DummyTextGenerator.generate_choice_with_logprobs(
+                        max_tokens=params.max_tokens,
+                        top_k=params.top_k,
+                        rng=rng.child(choice_index),
+                        stop=params.stop,
+                    )
+                )
+            choice = response.choices.add(
+                index=choice_index, text=text, finish_reason=finish_reason
+            )
+            if logprobs is not None:
+                converters.populate_completion_logprobs(choice.logprobs, logprobs)
+            total_completion_tokens += completion_tokens
+            choice_index += 1
+    _fill_usage(
+        response.usage,
+        total_prompt_tokens,
+        total_completion_tokens,
+        DummyTextGenerator.total_cached_tokens(cached_counts),
+    )
+    return response
+
+
+def chat_response(params: ChatParams) -> openai_pb2.ChatCompletionResponse:
+    """Generate the choices straight into a ``ChatCompletionResponse`` proto."""
+    response = openai_pb2.ChatCompletionResponse(
+        id=ResponseBuilder.completion_id(),
+        object="chat.completion",
+        created=int(time.time()),
+        model=params.model,
+    )
+    prompt_tokens = DummyTextGenerator.count_chat_prompt_tokens(params.messages)
+    cached_tokens = DummyTextGenerator.cached_chat_prompt_tokens(params.messages)
+    rng = RequestRng.for_request(params.seed)
+    total_completion_tokens = 0
+    for index in range(params.n):
+        logprobs = None
+        if params.top_k is None:
+            content, completion_tokens, finish_reason = (
+                DummyTextGenerator.generate_choice(
+                    max_tokens=params.max_tokens,
+                    rng=rng.child(index),
+                    stop=params.stop,
+                )
+            )
+        else:
+            content, completion_tokens, finish_reason, logprobs = (
+                DummyTextGenerator.generate_choice_with_logprobs(
+                    max_tokens=params.max_tokens,
+                    top_k=params.top_k,
+                    rng=rng.child(index),
+                    stop=params.stop,
+                    chat=True,
+                )
+            )
+        choice = response.choices.add(index=index, finish_reason=finish_reason)
+        choice.message.role = "assistant"
+        choice.message.content = content
+        if logprobs is not None:
+            converters.populate_chat_logprobs(choice.logprobs, logprobs)
+        total_completion_tokens += completion_tokens
+    _fill_usage(response.usage, prompt_tokens, total_completion_tokens, cached_tokens)
+    return response
+
+
+def _max_tokens(
+    request: openai_pb2.CompletionRequest | openai_pb2.ChatCompletionRequest,
+) -> int:
+    if not request.HasField("max_tokens"):
+        return settings.default_max_tokens
+    return _bounded("max_tokens", request.max_tokens, 1)
+
+
+def _bounded(param: str, value: int, low: int, high: Optional[int] = None) -> int:
+    if value < low:
+        raise InvalidArgument(param, f"Input should be greater than or equal to {low}")
+    if high is not None and value > high:
+        raise InvalidArgument(param, f"Input should be less than or equal to {high}")
+    return value
+
+
+def _fill_usage(
+    proto_usage: openai_pb2.Usage,
+    prompt_tokens: int,
+    completion_tokens: int,
+    cached_tokens: Optional[int],
+) -> None:
+    proto_usage.prompt_tokens = prompt_tokens
+    proto_usage.completion_tokens = completion_tokens
+    proto_usage.total_tokens = prompt_tokens + completion_tokens
+    if cached_tokens is not None:
+        proto_usage.prompt_tokens_details.cached_tokens = cached_tokens
@@ -4,28 +4,52 @@
 # Standard library imports
 from __future__ import annotations
 
+import asyncio
 import logging
 import time
-from typing import AsyncIterator, Iterable, List, Tuple
+from contextlib import asynccontextmanager
+from functools import partial
+from typing import (
+    Any,
+    AsyncIterator,
+    Callable,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    TypeVar,
+    Union,
+)
 
 # Third-party imports
 import grpc
 from grpc import aio
+from pydantic import ValidationError
 
 # Local/application imports
 from src.config import settings
+from src.engine.admission import AdmissionRejected, admission_controller
+from src.engine.coalescing import grpc_token_coalescer
+from src.engine.faults import (
+    FaultPlan,
+    StreamReset,
+    fault_injector,
+    inject_stream_fault,
+)
 from src.generators.dummy_generator import DummyTextGenerator
+from src.generators.logprobs import chat_top_k, completion_top_k
 from src.generators.response_builder import ResponseBuilder
-from src.grpc_service import converters
+from src.grpc_service import converters, native
+from src.grpc_service.chunk_templates import ChunkTemplate, serialize_chunk
 from src.grpc_service.proto import openai_pb2, openai_pb2_grpc
 from src.models import (
-    ChatCompletionMessage,
     ChatCompletionRequest,
     ChatCompletionResponse,
     CompletionRequest,
     CompletionResponse,
 )
 from src.utils.metrics import metrics_collector
+from src.utils.rng import RequestRng
 
 logger = logging.getLogger(__name__)
 
@@ -54,7 +78,7 @@ class DummyGrpcServicer(openai_pb2_grpc.VLLMServiceServicer):
         context: aio.ServicerContext,
     ) -> openai_pb2.ServerReadyResponse:
         del request, context
-        return openai_pb2.ServerReadyResponse(ready=True)
+        return openai_pb2.ServerReadyResponse(ready=admission_controller.is_ready())
 
     async def ModelReady(
         self,
@@ -118,44 +142,64 @@ class DummyGrpcServicer(openai_pb2_grpc.VLLMServiceServicer):
         logger.info(
             f"{peer} - gRPC ChatCompletion - model: {request.model or self._model_name}"
         )
-        del context
-        chat_request = converters.chat_request_from_proto(
-            request,
-            default_model=self._model_name,
-            force_stream=False,
-        )
-        response = _build_chat_response(chat_request)
+        if settings.grpc_native_unary:
+            params = await _validated(
+                context, native.chat_params, request, default_model=self._model_name
+            )
+            build = partial(native.chat_response, params)
+        else:
+            chat_request = await _validated(
+                context,
+                converters.chat_request_from_proto,
+                request,
+                default_model=self._model_name,
+                force_stream=False,
+            )
+            build = partial(_build_chat_proto, chat_request)
+        async with _admitted(context):
+            await _unary_fault(context)
+            response = build()
         metrics_collector.record_request(
             endpoint="/v1/chat/completions",
-            tokens_generated=response.usage.completion_tokens if response.usage else 0,
+            tokens_generated=response.usage.completion_tokens,
         )
-        return converters.chat_response_to_proto(response)
+        return response
 
     async def ChatCompletionStream(
         self,
         request: openai_pb2.ChatCompletionRequest,
         context: aio.ServicerContext,
-    ) -> AsyncIterator[openai_pb2.ChatCompletionChunk]:
+    ) -> AsyncIterator[Union[bytes, openai_pb2.ChatCompletionChunk]]:
         peer = context.peer()
         logger.info(
             f"{peer} - gRPC ChatCompletionStream - model: {request.model or self._model_name}"
         )
-        del context
-        chat_request = converters.chat_request_from_proto(
+        chat_request = await _validated(
+            context,
+            converters.chat_request_from_proto,
             request,
             default_model=self._model_name,
             force_stream=True,
         )
-        total_tokens = 0
-        try:
-            async for chunk, emitted in _chat_chunk_stream(chat_request):
-                total_tokens += emitted
-                yield chunk
-        finally:
-            metrics_collector.record_request(
-                endpoint="/v1/chat/completions",
-                tokens_generated=total_tokens,
+        async with _admitted(context):
+            fault = await _planned_fault(context)
+            chunks = _with_fault(
+                fault,
+                _chat_chunk_stream(chat_request),
+                openai_pb2.ChatCompletionChunk(),
             )
+            total_tokens = 0
+            try:
+                async for chunk, emitted in chunks:
+                    total_tokens += emitted
+                    yield chunk
+            except StreamReset as exc:
+                await context.abort(grpc.StatusCode.UNAVAILABLE, str(exc))
+            finally:
+                metrics_collector.record_request(
+                    endpoint="/v1/chat/completions",
+                    tokens_generated=total_tokens,
+                )
 
     # ------------------------------------------------------------------
     # Text completions
@@ -170,44 +214,67 @@ class DummyGrpcServicer(openai_pb2_grpc.VLLMServiceServicer):
         logger.info(
             f"{peer} - gRPC Completion - model: {request.model or self._model_name}"
         )
-        del context
-        completion_request = converters.completion_request_from_proto(
-            request,
-            default_model=self._model_name,
-            force_stream=False,
-        )
-        response = _build_completion_response(completion_request)
+        if settings.grpc_native_unary:
+            params = await _validated(
+                context,
+                native.completion_params,
+                request,
+                default_model=self._model_name,
+            )
+            build = partial(native.completion_response, params)
+        else:
+            completion_request = await _validated(
+                context,
+                converters.completion_request_from_proto,
+                request,
+                default_model=self._model_name,
+                force_stream=False,
+            )
+            build = partial(_build_completion_proto, completion_request)
+        async with _admitted(context):
+            await _unary_fault(context)
+            response = build()
         metrics_collector.record_request(
             endpoint="/v1/completions",
-            tokens_generated=response.usage.completion_tokens if response.usage else 0,
+            tokens_generated=response.usage.completion_tokens,
         )
-        return converters.completion_response_to_proto(response)
+        return response
 
     async def CompletionStream(
         self,
         request: openai_pb2.CompletionRequest,
         context: aio.ServicerContext,
-    ) -> AsyncIterator[openai_pb2.CompletionChunk]:
+    ) -> AsyncIterator[Union[bytes, openai_pb2.CompletionChunk]]:
         peer = context.peer()
         logger.info(
             f"{peer} - gRPC CompletionStream - model: {request.model or self._model_name}"
         )
-        del context
-        completion_request = converters.completion_request_from_proto(
+        completion_request = await _validated(
+            context,
+            converters.completion_request_from_proto,
             request,
             default_model=self._model_name,
             force_stream=True,
         )
-        total_tokens = 0
-        try:
-            async for chunk, emitted in _completion_chunk_stream(completion_request):
-                total_tokens += emitted
-                yield chunk
-        finally:
-            metrics_collector.record_request(
-                endpoint="/v1/completions",
-                tokens_generated=total_tokens,
+        async with _admitted(context):
+            fault = await _planned_fault(context)
+            chunks = _with_fault(
+                fault,
+                _completion_chunk_stream(completion_request),
+                openai_pb2.CompletionChunk(),
             )
+            total_tokens = 0
+            try:
+                async for chunk, emitted in chunks:
+                    total_tokens += emitted
+                    yield chunk
+            except StreamReset as exc:
+                await context.abort(grpc.StatusCode.UNAVAILABLE, str(exc))
+            finally:
+                metrics_collector.record_request(
+                    endpoint="/v1/completions",
+                    tokens_generated=total_tokens,
+                )
 
 
 def build_grpc_server(
@@ -224,7 +291,7 @@ def build_grpc_server(
         ("grpc.keepalive_timeout_ms", 5_000),
     ]
     server = aio.server(options=options)
-    openai_pb2_grpc.add_VLLMServiceServicer_to_server(DummyGrpcServicer(), server)
+    _add_servicer(DummyGrpcServicer(), server)
     bound_port = server.add_insecure_port(f"{host}:{port}")
     if bound_port == 0:
         raise RuntimeError(f"Unable to bind gRPC server on {host}:{port}")
@@ -236,27 +303,138 @@ def build_grpc_server(
 # ---------------------------------------------------------------------------
 
 
+def _add_servicer(servicer: DummyGrpcServicer, server: aio.Server) -> None:
+    """Register ``servicer`` like ``add_VLLMServiceServicer_to_server`` does.
+
+    Stream methods get ``serialize_chunk`` instead of the message's own
+    serializer, so they can yield chunks pre-serialized by ``ChunkTemplate``.
+    """
+    service = openai_pb2.DESCRIPTOR.services_by_name["VLLMService"]
+    handlers = {}
+    for method in service.methods:
+        request_type = getattr(openai_pb2, method.input_type.name)
+        response_type = getattr(openai_pb2, method.output_type.name)
+        if method.server_streaming:
+            make_handler = grpc.unary_stream_rpc_method_handler
+            serializer = serialize_chunk
+        else:
+            make_handler = grpc.unary_unary_rpc_method_handler
+            serializer = response_type.SerializeToString
+        handlers[method.name] = make_handler(
+            getattr(servicer, method.name),
+            request_deserializer=request_type.FromString,
+            response_serializer=serializer,
+        )
+    server.add_generic_rpc_handlers(
+        (grpc.method_handlers_generic_handler(service.full_name, handlers),)
+    )
+    server.add_registered_method_handlers(service.full_name, handlers)
+
+
+T = TypeVar("T")
+
+
+async def _validated(
+    context: aio.ServicerContext, read: Callable[..., T], *args: Any, **kwargs: Any
+) -> T:
+    """Read a request proto, aborting with INVALID_ARGUMENT when it is rejected."""
+    try:
+        return read(*args, **kwargs)
+    except ValidationError as exc:
+        message = str(native.InvalidArgument.from_validation_error(exc))
+    except native.InvalidArgument as exc:
+        message = str(exc)
+    await context.abort(grpc.StatusCode.INVALID_ARGUMENT, message)
+
+
+@asynccontextmanager
+async def _admitted(context: aio.ServicerContext) -> AsyncIterator[None]:
+    """Hold an admission slot, aborting with RESOURCE_EXHAUSTED when full."""
+    try:
+        await admission_controller.acquire()
+    except AdmissionRejected as exc:
+        await context.abort(
+            grpc.StatusCode.RESOURCE_EXHAUSTED,
+            str(exc),
+            trailing_metadata=(("retry-after", exc.retry_after),),
+        )
+    try:
+        yield
+    finally:
+        admission_controller.release()
+
+
+async def _planned_fault(context: aio.ServicerContext) -> Optional[FaultPlan]:
+    """Draw this call's fault; an ``error`` fault aborts with UNAVAILABLE."""
+    fault = fault_injector.plan()
+    if fault is not None and fault.kind == "error":
+        await context.abort(grpc.StatusCode.UNAVAILABLE, "Injected server error")
+    return fault
+
+
+async def _unary_fault(context: aio.ServicerContext) -> None:
+    fault = await _planned_fault(context)
+    if fault is not None and fault.kind == "stall":
+        await asyncio.sleep(fault.stall_seconds)
+
+
+ChunkT = TypeVar("ChunkT")
+
+
+def _with_fault(
+    fault: Optional[FaultPlan],
+    chunks: AsyncIterator[Tuple[ChunkT, int]],
+    malformed: ChunkT,
+) -> AsyncIterator[Tuple[ChunkT, int]]:
+    """Apply a stream fault; ``malformed`` is an empty chunk with no choices."""
+    if fault is None:
+        return chunks
+    return inject_stream_fault(
+        fault, chunks, (malformed, 0), tokens_of=lambda pair: pair[1]
+    )
+
+
 def _build_completion_response(request: CompletionRequest) -> CompletionResponse:
     prompts = _normalize_prompts(request.prompt)
     choices = []
     total_prompt_tokens = 0
     total_completion_tokens = 0
     choice_index = 0
+    rng = RequestRng.for_request(request.seed)
+    top_k = completion_top_k(request.logprobs)
+    cached_counts = [
+        DummyTextGenerator.cached_prompt_tokens(prompt_text) for prompt_text in prompts
+    ]
 
     for prompt_text in prompts:
         prompt_tokens = DummyTextGenerator.estimate_token_count(prompt_text)
         total_prompt_tokens += prompt_tokens
         for _ in range(request.n):
-            generated_text = DummyTextGenerator.generate_completion_text(
-                max_tokens=request.max_tokens
-            )
-            completion_tokens = DummyTextGenerator.estimate_token_count(generated_text)
+            logprobs = None
+            if top_k is None:
+                text, completion_tokens, finish_reason = (
+                    DummyTextGenerator.generate_choice(
+                        max_tokens=request.max_tokens,
+                        rng=rng.child(choice_index),
+                        stop=request.stop,
+                    )
+                )
+            else:
+                text, completion_tokens, finish_reason, logprobs = (
+                    DummyTextGenerator.generate_choice_with_logprobs(
+                        max_tokens=request.max_tokens,
+                        top_k=top_k,
+                        rng=rng.child(choice_index),
+                        stop=request.stop,
+                    )
+                )
             total_completion_tokens += completion_tokens
             choices.append(
                 ResponseBuilder.completion_choice(
                     index=choice_index,
-                    text=generated_text,
-                    finish_reason="stop",
+                    text=text,
+                    finish_reason=finish_reason,
+                    logprobs=logprobs,
                 )
             )
             choice_index += 1
@@ -266,26 +444,59 @@ def _build_completion_response(request: CompletionRequest) -> CompletionResponse
         choices=choices,
         prompt_tokens=total_prompt_tokens,
         completion_tokens=total_completion_tokens,
+        cached_tokens=DummyTextGenerator.total_cached_tokens(cached_counts),
+    )
+
+
+def _build_completion_proto(
+    request: CompletionRequest,
+) -> openai_pb2.CompletionResponse:
+    return converters.completion_response_to_proto(
+        _build_completion_response(request)
     )
 
 
+def _build_chat_proto(
+    request: ChatCompletionRequest,
+) -> openai_pb2.ChatCompletionResponse:
+    return converters.chat_response_to_proto(_build_chat_response(request))
+
+
 def _build_chat_response(request: ChatCompletionRequest) -> ChatCompletionResponse:
-    prompt_text = _messages_to_prompt(request.messages)
-    prompt_tokens = DummyTextGenerator.estimate_token_count(prompt_text)
+    prompt_tokens = DummyTextGenerator.count_chat_prompt_tokens(request.messages)
+    cached_tokens = DummyTextGenerator.cached_chat_prompt_tokens(request.messages)
     choices = []
     total_completion_tokens = 0
+    rng = RequestRng.for_request(request.seed)
+    top_k = chat_top_k(request.logprobs, request.top_logprobs)
 
     for index in range(request.n):
-        content = DummyTextGenerator.generate_completion_text(
-            max_tokens=request.max_tokens
-        )
-        completion_tokens = DummyTextGenerator.estimate_token_count(content)
+        logprobs = None
+        if top_k is None:
+            content, completion_tokens, finish_reason = (
+                DummyTextGenerator.generate_choice(
+                    max_tokens=request.max_tokens,
+                    rng=rng.child(index),
+                    stop=request.stop,
+                )
+            )
+        else:
+            content, completion_tokens, finish_reason, logprobs = (
+                DummyTextGenerator.generate_choice_with_logprobs(
+                    max_tokens=request.max_tokens,
+                    top_k=top_k,
+                    rng=rng.child(index),
+                    stop=request.stop,
+                    chat=True,
+                )
+            )
         total_completion_tokens += completion_tokens
         choices.append(
             ResponseBuilder.chat_choice(
                 index=index,
                 content=content,
-                finish_reason="stop",
+                finish_reason=finish_reason,
+                logprobs=logprobs,
             )
         )
 
@@ -294,57 +505,77 @@ def _build_chat_response(request: ChatCompletionRequest) -> ChatCompletionRespon
         choices=choices,
         prompt_tokens=prompt_tokens,
         completion_tokens=total_completion_tokens,
+        cached_tokens=cached_tokens,
     )
 
 
 async def _completion_chunk_stream(
     request: CompletionRequest,
-) -> AsyncIterator[Tuple[openai_pb2.CompletionChunk, int]]:
+) -> AsyncIterator[Tuple[Union[bytes, openai_pb2.CompletionChunk], int]]:
     prompts = _normalize_prompts(request.prompt)
     completion_id = ResponseBuilder.completion_id()
     choice_index = 0
-    chunk_size = settings.grpc_stream_chunk_size
     total_completion_tokens = 0
+    rng = RequestRng.for_request(request.seed)
+    top_k = completion_top_k(request.logprobs)
+    cached_counts = [
+        DummyTextGenerator.cached_prompt_tokens(prompt_text) for prompt_text in prompts
+    ]
+    total_cached_tokens = DummyTextGenerator.total_cached_tokens(cached_counts)
+    reported_prompt_tokens = None
+    if DummyTextGenerator.has_accurate_tokenizer():
+        reported_prompt_tokens = sum(
+            DummyTextGenerator.estimate_token_count(prompt_text)
+            for prompt_text in prompts
+        )
 
-    for _ in prompts:
+    for prompt_text, cached_tokens in zip(prompts, cached_counts):
+        prompt_tokens = DummyTextGenerator.estimate_token_count(prompt_text)
         for _ in range(request.n):
-            token_buffer: List[str] = []
-            async for token in DummyTextGenerator.stream_tokens(
-                max_tokens=request.max_tokens
-            ):
-                token_buffer.append(token)
-                if len(token_buffer) >= chunk_size:
-                    merged_text = " ".join(token_buffer)
+            choice_rng = rng.child(choice_index)
+            choice_stream = DummyTextGenerator.open_stream(
+                max_tokens=request.max_tokens,
+                rng=choice_rng,
+                stop=request.stop,
+                prompt_tokens=prompt_tokens,
+                cached_tokens=cached_tokens,
+                priority=request.priority,
+                trace_key=DummyTextGenerator.trace_key(prompt_text),
+            )
+            cursor = None
+            if top_k is not None:
+                cursor = DummyTextGenerator.logprob_table(
+                    len(choice_stream.span), top_k, choice_rng
+                ).cursor()
+            template = ChunkTemplate.completion(
+                completion_id, request.model, choice_index
+            )
+            async for tokens in grpc_token_coalescer.batches(choice_stream):
+                if cursor is None:
+                    chunk = template.frame(" ".join(tokens))
+                else:
                     chunk = converters.completion_chunk_from_choice(
                         completion_id=completion_id,
                         model=request.model,
                         choice_index=choice_index,
-                        text=merged_text,
+                        text=" ".join(tokens),
                         finish_reason=None,
+                        logprobs=cursor.completion(tokens),
+                        created=template.created,
                     )
-                    total_completion_tokens += len(token_buffer)
-                    yield chunk, len(token_buffer)
-                    token_buffer = []
-            # Flush remaining tokens in buffer
-            if token_buffer:
-                merged_text = " ".join(token_buffer)
-                chunk = converters.completion_chunk_from_choice(
-                    completion_id=completion_id,
-                    model=request.model,
-                    choice_index=choice_index,
-                    text=merged_text,
-                    finish_reason=None,
-                )
-                total_completion_tokens += len(token_buffer)
-                yield chunk, len(token_buffer)
-            # Final chunk includes usage information (only completion_tokens)
+                total_completion_tokens += len(tokens)
+                yield chunk, len(tokens)
+            # Final chunk includes usage information
             final_chunk = converters.completion_chunk_from_choice(
                 completion_id=completion_id,
                 model=request.model,
                 choice_index=choice_index,
                 text="",
-                finish_reason="stop",
+                finish_reason=choice_stream.finish_reason,
                 completion_tokens=total_completion_tokens,
+                prompt_tokens=reported_prompt_tokens,
+                cached_tokens=total_cached_tokens,
+                created=template.created,
             )
             yield final_chunk, 0
             choice_index += 1
@@ -352,49 +583,61 @@ async def _completion_chunk_stream(
 
 async def _chat_chunk_stream(
     request: ChatCompletionRequest,
-) -> AsyncIterator[Tuple[openai_pb2.ChatCompletionChunk, int]]:
+) -> AsyncIterator[Tuple[Union[bytes, openai_pb2.ChatCompletionChunk], int]]:
     completion_id = ResponseBuilder.completion_id()
-    chunk_size = settings.grpc_stream_chunk_size
     total_completion_tokens = 0
+    rng = RequestRng.for_request(request.seed)
+    top_k = chat_top_k(request.logprobs, request.top_logprobs)
+    prompt_tokens = DummyTextGenerator.count_chat_prompt_tokens(request.messages)
+    cached_tokens = DummyTextGenerator.cached_chat_prompt_tokens(request.messages)
+    trace_key = DummyTextGenerator.chat_trace_key(request.messages)
+    reported_prompt_tokens = (
+        prompt_tokens if DummyTextGenerator.has_accurate_tokenizer() else None
+    )
 
     for choice_index in range(request.n):
-        token_buffer: List[str] = []
-        async for token in DummyTextGenerator.stream_tokens(
-            max_tokens=request.max_tokens
-        ):
-            token_buffer.append(token)
-            if len(token_buffer) >= chunk_size:
-                merged_content = " ".join(token_buffer)
+        choice_rng = rng.child(choice_index)
+        choice_stream = DummyTextGenerator.open_stream(
+            max_tokens=request.max_tokens,
+            rng=choice_rng,
+            stop=request.stop,
+            prompt_tokens=prompt_tokens,
+            cached_tokens=cached_tokens,
+            priority=request.priority,
+            trace_key=trace_key,
+        )
+        cursor = None
+        if top_k is not None:
+            cursor = DummyTextGenerator.logprob_table(
+                len(choice_stream.span), top_k, choice_rng
+            ).cursor()
+        template = ChunkTemplate.chat(completion_id, request.model, choice_index)
+        async for tokens in grpc_token_coalescer.batches(choice_stream):
+            if cursor is None:
+                chunk = template.frame(" ".join(tokens))
+            else:
                 chunk = converters.chat_chunk_from_delta(
                     completion_id=completion_id,
                     model=request.model,
                     choice_index=choice_index,
-                    content=merged_content,
+                    content=" ".join(tokens),
                     finish_reason=None,
+                    logprobs=cursor.chat(tokens),
+                    created=template.created,
                 )
-                total_completion_tokens += len(token_buffer)
-                yield chunk, len(token_buffer)
-                token_buffer = []
-        # Flush remaining tokens in buffer
-        if token_buffer:
-            merged_content = " ".join(token_buffer)
-            chunk = converters.chat_chunk_from_delta(
-                completion_id=completion_id,
-                model=request.model,
-                choice_index=choice_index,
-                content=merged_content,
-                finish_reason=None,
-            )
-            total_completion_tokens += len(token_buffer)
-            yield chunk, len(token_buffer)
-        # Final chunk includes usage information (only completion_tokens)
+            total_completion_tokens += len(tokens)
+            yield chunk, len(tokens)
+        # Final chunk includes usage information
         final_chunk = converters.chat_chunk_from_delta(
             completion_id=completion_id,
             model=request.model,
             choice_index=choice_index,
             content="",
-            finish_reason="stop",
+            finish_reason=choice_stream.finish_reason,
             completion_tokens=total_completion_tokens,
+            prompt_tokens=reported_prompt_tokens,
+            cached_tokens=cached_tokens,
+            created=template.created,
         )
         yield final_chunk, 0
 
@@ -406,12 +649,3 @@ def _normalize_prompts(prompt: str | Iterable[str]) -> List[str]:
     if not prompts:
         return [""]
     return [text or "" for text in prompts]
-
-
-def _messages_to_prompt(messages: List[ChatCompletionMessage]) -> str:
-    if not messages:
-        return ""
-    joined: List[str] = []
-    for message in messages:
-        joined.append(f"{message.role}: {message.content}")
-    return "\n".join(joined)
@@ -10,10 +10,18 @@ from typing import Any, Dict, AsyncIterator
 import uvicorn
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse
 
 # Local/application imports
 from src.config import settings
 from src.endpoints import chat, completions, models
+from src.endpoints.admission import AdmissionMiddleware
+from src.endpoints.response_cache import response_cache
+from src.endpoints.stream_blobs import stream_blobs
+from src.engine.admission import admission_controller
+from src.engine.faults import fault_injector
+from src.engine.prefix_cache import prefix_cache
+from src.engine.step_loop import engine_step_loop
 from src.grpc_service.server import build_grpc_server
 from src.utils.metrics import metrics_collector
 
@@ -57,6 +65,12 @@ def create_app() -> FastAPI:
         lifespan=_lifespan,
     )
 
+    # Added first so CORS, the outermost layer, also decorates 429 replies.
+    app.add_middleware(
+        AdmissionMiddleware,
+        controller=admission_controller,
+        paths=("/v1/completions", "/v1/chat/completions"),
+    )
     app.add_middleware(
         CORSMiddleware,
         allow_origins=["*"],
@@ -65,13 +79,20 @@ def create_app() -> FastAPI:
         allow_headers=["*"],
     )
 
-    app.include_router(completions.router, prefix="/v1", tags=["completions"])
+    completions_router = completions.router
+    if settings.fast_request_decoding:
+        completions_router = completions.fast_router
+    app.include_router(completions_router, prefix="/v1", tags=["completions"])
+    # Chat bodies are mostly message objects, which pydantic-core validates
+    # faster than a Python pass can (see benchmarks/bench_request_decoding.py).
     app.include_router(chat.router, prefix="/v1", tags=["chat"])
     app.include_router(models.router, prefix="/v1", tags=["models"])
 
     @app.get("/health")
-    async def health() -> Dict[str, str]:
-        return {"status": "healthy"}
+    async def health() -> JSONResponse:
+        if not admission_controller.is_ready():
+            return JSONResponse(status_code=503, content={"status": "overloaded"})
+        return JSONResponse(content={"status": "healthy"})
 
     @app.get("/metrics")
     async def metrics() -> Dict[str, Any]:
@@ -80,6 +101,12 @@ def create_app() -> FastAPI:
             "total_requests": snapshot.total_requests,
             "requests_by_endpoint": snapshot.requests_by_endpoint,
             "total_tokens_generated": snapshot.total_tokens_generated,
+            "engine": engine_step_loop.stats(),
+            "prefix_cache": prefix_cache.stats() if prefix_cache else None,
+            "admission": admission_controller.stats(),
+            "faults": fault_injector.stats() if fault_injector.enabled else None,
+            "response_cache": response_cache.stats() if response_cache else None,
+            "stream_blobs": stream_blobs.stats() if stream_blobs else None,
         }
 
     return app
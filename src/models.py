@@ -19,7 +19,7 @@ class CompletionRequest(BaseModel):
     top_p: float = 1.0
     n: int = 1
     stream: bool = False
-    logprobs: Optional[int] = None
+    logprobs: Optional[int] = Field(default=None, ge=0, le=20)
     echo: bool = False
     stop: Optional[Union[str, List[str]]] = None
     presence_penalty: float = 0.0
@@ -27,6 +27,8 @@ class CompletionRequest(BaseModel):
     best_of: Optional[int] = None
     logit_bias: Optional[Dict[str, float]] = None
     user: Optional[str] = None
+    seed: Optional[int] = None
+    priority: int = 0
 
 
 class ChatCompletionMessage(BaseModel):
@@ -46,6 +48,10 @@ class ChatCompletionRequest(BaseModel):
     presence_penalty: float = 0.0
     frequency_penalty: float = 0.0
     user: Optional[str] = None
+    seed: Optional[int] = None
+    priority: int = 0
+    logprobs: bool = False
+    top_logprobs: Optional[int] = Field(default=None, ge=0, le=20)
 
 
 class CompletionChoice(BaseModel):
@@ -55,10 +61,15 @@ class CompletionChoice(BaseModel):
     finish_reason: Optional[str]
 
 
+class PromptTokensDetails(BaseModel):
+    cached_tokens: int
+
+
 class CompletionUsage(BaseModel):
     prompt_tokens: int
     completion_tokens: int
     total_tokens: int
+    prompt_tokens_details: Optional[PromptTokensDetails] = None
 
 
 class CompletionResponse(BaseModel):
@@ -74,12 +85,14 @@ class ChatCompletionChoice(BaseModel):
     index: int
     message: ChatCompletionMessage
     finish_reason: Optional[str]
+    logprobs: Optional[dict] = None
 
 
 class ChatCompletionStreamChoice(BaseModel):
     index: int
     delta: ChatCompletionMessage
     finish_reason: Optional[str]
+    logprobs: Optional[dict] = None
 
 
 class ChatCompletionResponse(BaseModel):
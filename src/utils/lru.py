@@ -0,0 +1,39 @@
+#!/usr/bin/env python3
+"""Small bounded LRU mapping shared by the in-process caches."""
+
+# Standard library imports
+from collections import OrderedDict
+from typing import Generic, Hashable, Iterator, Optional, TypeVar
+
+ValueT = TypeVar("ValueT")
+
+
+class LRUCache(Generic[ValueT]):
+    """Least-recently-used cache with a fixed number of entries."""
+
+    def __init__(self, maxsize: int) -> None:
+        self._maxsize = max(0, maxsize)
+        self._entries: "OrderedDict[Hashable, ValueT]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable) -> Optional[ValueT]:
+        value = self._entries.get(key)
+        if value is not None:
+            self._entries.move_to_end(key)
+        return value
+
+    def put(self, key: Hashable, value: ValueT) -> None:
+        if self._maxsize == 0:
+            return
+        self._entries[key] = value
+        self._entries.move_to_end(key)
+        if len(self._entries) > self._maxsize:
+            self._entries.popitem(last=False)
+
+    def values(self) -> Iterator[ValueT]:
+        return iter(self._entries.values())
+
+    def clear(self) -> None:
+        self._entries.clear()
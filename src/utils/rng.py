@@ -0,0 +1,69 @@
+#!/usr/bin/env python3
+"""Counter-based per-request random number generation."""
+
+# Standard library imports
+import itertools
+import os
+from typing import Optional
+
+_MASK64 = (1 << 64) - 1
+_GOLDEN_GAMMA = 0x9E3779B97F4A7C15
+_DOUBLE_UNIT = 1.0 / (1 << 53)
+
+# Unseeded requests derive their keys from a per-process random base plus a
+# counter, so they never touch shared generator state.
+_PROCESS_KEY = int.from_bytes(os.urandom(8), "little")
+_UNSEEDED_COUNTER = itertools.count(1)
+
+
+def _mix64(value: int) -> int:
+    """SplitMix64 finalizer: a cheap, well-distributed 64-bit bijection."""
+    value = ((value ^ (value >> 30)) * 0xBF58476D1CE4E5B9) & _MASK64
+    value = ((value ^ (value >> 27)) * 0x94D049BB133111EB) & _MASK64
+    return value ^ (value >> 31)
+
+
+class RequestRng:
+    """Stateless-by-construction generator: draw ``i`` is ``mix(key + i * gamma)``.
+
+    Identical seeds yield identical draws in every process, and deriving a
+    child stream for a choice index is a single mix instead of a reseed.
+    """
+
+    __slots__ = ("_key", "_counter", "seeded")
+
+    def __init__(self, key: int, *, seeded: bool = True) -> None:
+        self._key = _mix64(key & _MASK64)
+        self._counter = 0
+        self.seeded = seeded
+
+    @classmethod
+    def for_request(cls, seed: Optional[int]) -> "RequestRng":
+        """Return a generator for ``seed``, or a fresh unique one when it is None."""
+        if seed is None:
+            key = _PROCESS_KEY + next(_UNSEEDED_COUNTER) * _GOLDEN_GAMMA
+            return cls(key, seeded=False)
+        return cls(seed)
+
+    def child(self, index: int) -> "RequestRng":
+        """Return an independent stream for a sub-unit such as a choice index."""
+        child = RequestRng.__new__(RequestRng)
+        child._key = _mix64((self._key ^ _mix64(index + 1)) & _MASK64)
+        child._counter = 0
+        child.seeded = self.seeded
+        return child
+
+    def next_u64(self) -> int:
+        self._counter += 1
+        return _mix64((self._key + self._counter * _GOLDEN_GAMMA) & _MASK64)
+
+    def random(self) -> float:
+        """Return a float in the open interval (0, 1)."""
+        return ((self.next_u64() >> 11) + 0.5) * _DOUBLE_UNIT
+
+    def randrange(self, stop: int) -> int:
+        """Return an integer in ``[0, stop)``."""
+        return (self.next_u64() * stop) >> 64
+
+    def uniform(self, low: float, high: float) -> float:
+        return low + (high - low) * self.random()
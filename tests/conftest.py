@@ -1,14 +1,62 @@
 #!/usr/bin/env python3
-"""Pytest fixtures for API tests."""
+"""Pytest fixtures for API and engine tests."""
+
+# Standard library imports
+from typing import Awaitable, Callable, List, Optional
 
 # Third-party imports
 import pytest
 from fastapi.testclient import TestClient
 
 # Local/application imports
+from src.engine.kv_cache import BlockManager
+from src.engine.step_loop import EngineStepLoop
 from src.main import app
 
 
 @pytest.fixture(scope="module")
 def client() -> TestClient:
     return TestClient(app)
+
+
+def _make_engine(
+    max_num_seqs: int = 0,
+    num_blocks: Optional[int] = None,
+    block_size: int = 4,
+    priority_preemption: bool = False,
+) -> EngineStepLoop:
+    return EngineStepLoop(
+        lambda rng, active: 0.0005,
+        block_manager=BlockManager(num_blocks, block_size) if num_blocks else None,
+        resume_seconds=lambda tokens, blocks: 0.0,
+        max_num_seqs=max_num_seqs,
+        priority_preemption=priority_preemption,
+    )
+
+
+async def _generate(
+    engine: EngineStepLoop,
+    log: List[str],
+    name: str,
+    tokens: int,
+    prompt_tokens: int = 3,
+    priority: int = 0,
+) -> None:
+    async with engine.sequence(prompt_tokens, priority) as sequence:
+        await sequence.wait_running()
+        log.append(f"{name} start")
+        for _ in range(tokens):
+            await sequence.step()
+    log.append(f"{name} done")
+
+
+@pytest.fixture
+def make_engine() -> Callable[..., EngineStepLoop]:
+    """Build a fast-ticking engine step loop with no preemption delay."""
+    return _make_engine
+
+
+@pytest.fixture
+def generate() -> Callable[..., Awaitable[None]]:
+    """Run one sequence for ``tokens`` steps, logging its start and end."""
+    return _generate
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""Tests for admission control over HTTP and gRPC."""
+
+# Standard library imports
+import asyncio
+
+# Third-party imports
+import grpc
+import pytest
+from fastapi.testclient import TestClient
+
+# Local/application imports
+from src.config import settings
+from src.endpoints.admission import AdmissionMiddleware
+from src.engine.admission import AdmissionController, AdmissionRejected
+from src.grpc_service.proto import openai_pb2, openai_pb2_grpc
+from src.grpc_service.server import build_grpc_server
+
+
+def _full_controller(**kwargs: float) -> AdmissionController:
+    controller = AdmissionController(max_active=1, **kwargs)
+    controller.active = 1
+    return controller
+
+
+@pytest.mark.asyncio
+async def test_waiters_get_released_slots_in_order() -> None:
+    controller = AdmissionController(max_active=1, max_queued=2)
+    await controller.acquire()
+    order = []
+
+    async def wait(name: str) -> None:
+        await controller.acquire()
+        order.append(name)
+
+    tasks = [asyncio.ensure_future(wait(name)) for name in ("a", "b")]
+    await asyncio.sleep(0)
+    assert controller.queued == 2
+    with pytest.raises(AdmissionRejected):
+        await controller.acquire()
+    controller.release()
+    controller.release()
+    await asyncio.gather(*tasks)
+    assert order == ["a", "b"]
+    assert controller.stats() == {
+        "active_requests": 1,
+        "queued_requests": 0,
+        "rejected_total": 1,
+    }
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiter_leaves_the_queue() -> None:
+    controller = AdmissionController(max_active=1, max_queued=1)
+    await controller.acquire()
+    waiter = asyncio.ensure_future(controller.acquire())
+    await asyncio.sleep(0)
+    waiter.cancel()
+    await asyncio.sleep(0)
+    assert controller.queued == 0
+    controller.release()
+    assert controller.active == 0
+
+
+def test_readiness_tracks_queue_depth() -> None:
+    engine_waiting = [0]
+    controller = AdmissionController(
+        ready_queue_depth=3, engine_queue_depth=lambda: engine_waiting[0]
+    )
+    assert controller.is_ready()
+    engine_waiting[0] = 3
+    assert not controller.is_ready()
+    assert AdmissionController(ready_queue_depth=0).is_ready()
+
+
+def test_rejected_http_request_gets_429_with_retry_after() -> None:
+    async def app(scope, receive, send) -> None:
+        raise AssertionError("rejected requests must not reach the app")
+
+    controller = _full_controller(retry_after_seconds=2.5)
+    client = TestClient(AdmissionMiddleware(app, controller, ["/v1/completions"]))
+    response = client.post("/v1/completions", json={})
+
+    assert response.status_code == 429
+    assert response.headers["retry-after"] == "3"
+    assert response.json()["error"]["code"] == "rate_limit_exceeded"
+    assert controller.active == 1
+
+
+def test_health_reports_overload(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    assert client.get("/health").json() == {"status": "healthy"}
+    monkeypatch.setattr(
+        "src.main.admission_controller",
+        AdmissionController(ready_queue_depth=1, engine_queue_depth=lambda: 1),
+    )
+    response = client.get("/health")
+    assert response.status_code == 503
+
+
+@pytest.mark.asyncio
+async def test_grpc_rejects_with_resource_exhausted(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    controller = _full_controller(ready_queue_depth=1)
+    monkeypatch.setattr("src.grpc_service.server.admission_controller", controller)
+    server, port = build_grpc_server(host="127.0.0.1", port=0)
+    await server.start()
+    try:
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+            stub = openai_pb2_grpc.VLLMServiceStub(channel)
+            request = openai_pb2.CompletionRequest(
+                model=settings.default_model_name, prompt="hi", max_tokens=2
+            )
+            with pytest.raises(grpc.aio.AioRpcError) as unary:
+                await stub.Completion(request)
+            assert unary.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+
+            with pytest.raises(grpc.aio.AioRpcError) as streamed:
+                async for _ in stub.CompletionStream(request):
+                    pass
+            assert streamed.value.code() == grpc.StatusCode.RESOURCE_EXHAUSTED
+            assert ("retry-after", "1") in tuple(
+                streamed.value.trailing_metadata() or ()
+            )
+
+            ready = await stub.ServerReady(openai_pb2.ServerReadyRequest())
+            assert ready.ready is True
+            controller.active = 0
+            await stub.Completion(request)
+            assert controller.active == 0
+    finally:
+        await server.stop(None)
@@ -3,10 +3,18 @@
 
 # Standard library imports
 import json
+from typing import List, Sequence
 
 # Third-party imports
+import pytest
 from fastapi.testclient import TestClient
 
+# Local/application imports
+from src.engine.prefix_cache import PrefixCache
+from src.generators.dummy_generator import DummyTextGenerator
+from src.models import ChatCompletionMessage, ChatCompletionResponse
+from src.utils.lru import LRUCache
+
 
 def test_chat_completion(client: TestClient) -> None:
     response = client.post(
@@ -144,3 +152,114 @@ def test_chat_streaming_length_finish_reason(client: TestClient) -> None:
             final_chunk = json.loads(data)
     assert final_chunk is not None
     assert final_chunk["choices"][0]["finish_reason"] == "length"
+
+
+def test_chat_stop_sequence_applies_to_both_paths(client: TestClient) -> None:
+    body = {
+        "model": "Qwen/Qwen2.5-VL-7B-Instruct",
+        "messages": [{"role": "user", "content": "hello"}],
+        "max_tokens": 200,
+        "stop": ["never matches", "dummy backend"],
+    }
+    response = client.post("/v1/chat/completions", json=body)
+    choice = response.json()["choices"][0]
+    assert choice["finish_reason"] == "stop"
+    assert "dummy backend" not in choice["message"]["content"]
+    assert "dummy" not in choice["message"]["content"].split()[-1:]
+
+    final_chunk = None
+    with client.stream(
+        "POST", "/v1/chat/completions", json={**body, "stream": True}
+    ) as stream:
+        for raw_line in stream.iter_lines():
+            if not raw_line or not raw_line.startswith("data: "):
+                continue
+            if raw_line[6:] == "[DONE]":
+                break
+            final_chunk = json.loads(raw_line[6:])
+            assert "dummy backend" not in final_chunk["choices"][0]["delta"]["content"]
+    assert final_chunk is not None
+    assert final_chunk["choices"][0]["finish_reason"] == "stop"
+
+
+def test_chat_prompt_tokens_sum_per_message_counts() -> None:
+    messages = [
+        ChatCompletionMessage(role="system", content="You are terse."),
+        ChatCompletionMessage(role="user", content="hello  there\nfriend"),
+        ChatCompletionMessage(role="assistant", content=""),
+    ]
+    joined = "\n".join(f"{message.role}: {message.content}" for message in messages)
+    expected = DummyTextGenerator.estimate_token_count(joined)
+    assert DummyTextGenerator.count_chat_prompt_tokens(messages) == expected
+    # Second pass is served from the per-message cache.
+    assert DummyTextGenerator.count_chat_prompt_tokens(messages * 50) == expected * 50
+
+
+def test_chat_reports_cached_prompt_tokens(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        "src.generators.dummy_generator.prefix_cache",
+        PrefixCache(max_tokens=1024, block_size=4),
+    )
+    body = {
+        "model": "Qwen/Qwen2.5-VL-7B-Instruct",
+        "messages": [{"role": "user", "content": " ".join(["word"] * 20)}],
+        "max_tokens": 4,
+    }
+    first = client.post("/v1/chat/completions", json=body).json()
+    second = client.post("/v1/chat/completions", json=body).json()
+
+    assert first["usage"]["prompt_tokens_details"] == {"cached_tokens": 0}
+    assert second["usage"]["prompt_tokens_details"] == {"cached_tokens": 20}
+
+
+def test_chat_prefix_cache_keys_are_cached_per_message(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        "src.generators.dummy_generator.prefix_cache",
+        PrefixCache(max_tokens=1024, block_size=4),
+    )
+    monkeypatch.setattr(DummyTextGenerator, "MESSAGE_KEY_CACHE", LRUCache(64))
+    encoded: List[str] = []
+    encode = DummyTextGenerator._prompt_token_keys.__func__
+
+    def counting_encode(cls: type, text: str) -> Sequence[object]:
+        encoded.append(text)
+        return encode(cls, text)
+
+    monkeypatch.setattr(
+        DummyTextGenerator, "_prompt_token_keys", classmethod(counting_encode)
+    )
+    history = [
+        ChatCompletionMessage(role="system", content="be brief " * 8),
+        ChatCompletionMessage(role="user", content="hello there " * 8),
+    ]
+    first = DummyTextGenerator.cached_chat_prompt_tokens(history)
+    calls = len(encoded)
+    second = DummyTextGenerator.cached_chat_prompt_tokens(
+        history + [ChatCompletionMessage(role="assistant", content="ok")]
+    )
+
+    assert first == 0
+    assert second == 32
+    # Only the new message was encoded for the second request.
+    assert encoded[calls:] == ["assistant:", "ok"]
+
+
+def test_chat_body_matches_response_model(client: TestClient) -> None:
+    response = client.post(
+        "/v1/chat/completions",
+        json={
+            "model": "Qwen/Qwen2.5-VL-7B-Instruct",
+            "messages": [{"role": "user", "content": "hi"}],
+            "max_tokens": 6,
+            "n": 3,
+            "logprobs": True,
+            "top_logprobs": 2,
+        },
+    )
+    assert response.headers["content-type"] == "application/json"
+    payload = response.json()
+    assert ChatCompletionResponse.model_validate(payload).model_dump() == payload
@@ -0,0 +1,46 @@
+#!/usr/bin/env python3
+"""Tests for pre-serialized gRPC chunk templates."""
+
+# Third-party imports
+import pytest
+
+# Local/application imports
+from src.grpc_service import converters
+from src.grpc_service.chunk_templates import ChunkTemplate
+from src.grpc_service.proto import openai_pb2
+
+TEXTS = ["", "plain", "naïve 日本", "x" * 127, "y" * 128, "z " * 9000]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("choice_index", [0, 3, 300])
+def test_completion_frames_match_converters(text: str, choice_index: int) -> None:
+    template = ChunkTemplate.completion("cmpl-abc", "mödel/x", choice_index)
+    expected = converters.completion_chunk_from_choice(
+        completion_id="cmpl-abc",
+        model="mödel/x",
+        choice_index=choice_index,
+        text=text,
+        finish_reason=None,
+        created=template.created,
+    )
+    assert template.frame(text) == expected.SerializeToString()
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("choice_index", [0, 3, 300])
+def test_chat_frames_match_converters(text: str, choice_index: int) -> None:
+    template = ChunkTemplate.chat("cmpl-abc", "m", choice_index)
+    expected = converters.chat_chunk_from_delta(
+        completion_id="cmpl-abc",
+        model="m",
+        choice_index=choice_index,
+        content=text,
+        finish_reason=None,
+        created=template.created,
+    )
+    frame = template.frame(text)
+    assert frame == expected.SerializeToString()
+    parsed = openai_pb2.ChatCompletionChunk.FromString(frame)
+    assert parsed.choices[0].delta.HasField("content")
+    assert parsed.choices[0].delta.content == text
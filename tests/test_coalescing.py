@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""Tests for count and time-window token coalescing."""
+
+# Standard library imports
+import asyncio
+import json
+import time
+from typing import AsyncIterator, List
+
+# Third-party imports
+import pytest
+from fastapi.testclient import TestClient
+
+# Local/application imports
+from src.engine.coalescing import TokenCoalescer
+
+
+async def _tokens(count: int, gap: float = 0.0) -> AsyncIterator[str]:
+    for index in range(count):
+        if gap:
+            await asyncio.sleep(gap)
+        yield f"t{index}"
+
+
+async def _collect(coalescer: TokenCoalescer, tokens: AsyncIterator[str]) -> List:
+    return [batch async for batch in coalescer.batches(tokens)]
+
+
+@pytest.mark.asyncio
+async def test_disabled_coalescer_yields_single_tokens() -> None:
+    assert await _collect(TokenCoalescer(), _tokens(3)) == [["t0"], ["t1"], ["t2"]]
+
+
+@pytest.mark.asyncio
+async def test_count_limit_sends_first_token_alone() -> None:
+    batches = await _collect(TokenCoalescer(interval=4), _tokens(10))
+    assert [len(batch) for batch in batches] == [1, 4, 4, 1]
+    assert [token for batch in batches for token in batch] == [
+        f"t{index}" for index in range(10)
+    ]
+
+
+@pytest.mark.asyncio
+async def test_time_window_flushes_slow_streams() -> None:
+    coalescer = TokenCoalescer(interval=100, window_seconds=0.015)
+    batches = await _collect(coalescer, _tokens(12, gap=0.005))
+    assert len(batches) > 2
+    assert all(len(batch) < 12 for batch in batches)
+
+
+@pytest.mark.asyncio
+async def test_window_flushes_without_waiting_for_a_stalled_token() -> None:
+    async def stalling() -> AsyncIterator[str]:
+        yield "t0"
+        yield "t1"
+        await asyncio.sleep(0.2)
+        yield "t2"
+
+    coalescer = TokenCoalescer(interval=100, window_seconds=0.01)
+    start = time.monotonic()
+    arrivals = []
+    async for batch in coalescer.batches(stalling()):
+        arrivals.append((batch, time.monotonic() - start))
+    assert [batch for batch, _ in arrivals] == [["t0"], ["t1"], ["t2"]]
+    assert arrivals[1][1] < 0.1
+
+
+@pytest.mark.asyncio
+async def test_slow_consumer_grows_batches() -> None:
+    coalescer = TokenCoalescer(interval=2, max_interval=8, backlog_seconds=0.001)
+    sizes = []
+    async for batch in coalescer.batches(_tokens(40)):
+        sizes.append(len(batch))
+        await asyncio.sleep(0.002)
+    assert max(sizes) == 8
+    assert sum(sizes) == 40
+
+
+def test_http_stream_text_does_not_depend_on_batching(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    body = {
+        "model": "m",
+        "prompt": "x",
+        "max_tokens": 9,
+        "stream": True,
+        "seed": 1,
+        "logprobs": 1,
+    }
+
+    def stream_choices() -> List[dict]:
+        choices = []
+        with client.stream("POST", "/v1/completions", json=body) as response:
+            for line in response.iter_lines():
+                if line.startswith("data: {"):
+                    choice = json.loads(line[len("data: ") :])["choices"][0]
+                    if choice["finish_reason"] is None:
+                        choices.append(choice)
+        return choices
+
+    single = stream_choices()
+    monkeypatch.setattr(
+        "src.endpoints.completions.token_coalescer", TokenCoalescer(interval=3)
+    )
+    coalesced = stream_choices()
+    assert [len(choice["logprobs"]["tokens"]) for choice in coalesced] == [1, 3, 3, 2]
+
+    text = "".join(choice["text"] for choice in single)
+    assert "".join(choice["text"] for choice in coalesced) == text
+    offsets = [
+        offset for choice in coalesced for offset in choice["logprobs"]["text_offset"]
+    ]
+    tokens = [token for choice in coalesced for token in choice["logprobs"]["tokens"]]
+    assert offsets == [
+        offset for choice in single for offset in choice["logprobs"]["text_offset"]
+    ]
+    assert all(
+        text[offset : offset + len(token)] == token
+        for offset, token in zip(offsets, tokens)
+    )
@@ -3,10 +3,16 @@
 
 # Standard library imports
 import json
+from typing import List, Optional
 
 # Third-party imports
+import pytest
 from fastapi.testclient import TestClient
 
+# Local/application imports
+from src.engine.step_loop import EngineStepLoop
+from src.models import CompletionResponse
+
 
 def test_non_streaming_completion(client: TestClient) -> None:
     response = client.post(
@@ -25,6 +31,25 @@ def test_non_streaming_completion(client: TestClient) -> None:
     assert payload["usage"]["total_tokens"] >= 1
 
 
+@pytest.mark.parametrize("logprobs", [None, 2])
+def test_completion_body_matches_response_model(
+    client: TestClient, logprobs: Optional[int]
+) -> None:
+    response = client.post(
+        "/v1/completions",
+        json={
+            "model": "Qwen/Qwen2.5-VL-7B-Instruct",
+            "prompt": ["one", "two"],
+            "max_tokens": 6,
+            "n": 2,
+            "logprobs": logprobs,
+        },
+    )
+    assert response.headers["content-type"] == "application/json"
+    payload = response.json()
+    assert CompletionResponse.model_validate(payload).model_dump() == payload
+
+
 def test_streaming_completion(client: TestClient) -> None:
     chunks = []
     with client.stream(
@@ -137,3 +162,68 @@ def test_streaming_completion_length_finish_reason(client: TestClient) -> None:
             final_chunk = json.loads(data)
     assert final_chunk is not None
     assert final_chunk["choices"][0]["finish_reason"] == "length"
+
+
+def test_seeded_completion_is_reproducible(client: TestClient) -> None:
+    payload = {
+        "model": "Qwen/Qwen2.5-VL-7B-Instruct",
+        "prompt": "Hello",
+        "max_tokens": 12,
+        "n": 3,
+        "seed": 1234,
+    }
+    first = client.post("/v1/completions", json=payload).json()
+    second = client.post("/v1/completions", json=payload).json()
+    assert [choice["text"] for choice in first["choices"]] == [
+        choice["text"] for choice in second["choices"]
+    ]
+
+
+def test_streaming_completion_logprobs(client: TestClient) -> None:
+    chunks = []
+    with client.stream(
+        "POST",
+        "/v1/completions",
+        json={
+            "model": "Qwen/Qwen2.5-VL-7B-Instruct",
+            "prompt": "stream me",
+            "max_tokens": 4,
+            "stream": True,
+            "logprobs": 2,
+        },
+    ) as response:
+        for line in response.iter_lines():
+            if line.startswith("data: ") and line != "data: [DONE]":
+                chunks.append(json.loads(line[6:]))
+    token_chunks = [chunk for chunk in chunks if chunk["choices"][0]["text"]]
+    assert token_chunks
+    for chunk in token_chunks:
+        logprobs = chunk["choices"][0]["logprobs"]
+        assert logprobs["tokens"] == [chunk["choices"][0]["text"]]
+        assert len(logprobs["top_logprobs"][0]) == 2
+
+
+def test_streaming_priority_from_body_or_header(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    engine = EngineStepLoop(lambda rng, active: 0.0, max_num_seqs=4)
+    seen: List[int] = []
+    sequence = engine.sequence
+
+    def record(prompt_tokens: int = 0, priority: int = 0):
+        seen.append(priority)
+        return sequence(prompt_tokens, priority)
+
+    monkeypatch.setattr(engine, "sequence", record)
+    monkeypatch.setattr("src.generators.dummy_generator.engine_step_loop", engine)
+    body = {"model": "Qwen/Qwen2.5-VL-7B-Instruct", "prompt": "hi", "stream": True}
+
+    client.post("/v1/completions", json=body, headers={"X-Priority": "7"})
+    client.post("/v1/completions", json={**body, "priority": -2})
+    client.post(
+        "/v1/completions", json={**body, "priority": 3}, headers={"X-Priority": "7"}
+    )
+
+    assert seen == [7, -2, 3]
+    bad = client.post("/v1/completions", json=body, headers={"X-Priority": "high"})
+    assert bad.status_code == 422
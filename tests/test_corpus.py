@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Tests for the memory-mapped response corpus."""
+
+# Standard library imports
+import os
+from pathlib import Path
+
+# Third-party imports
+import pytest
+
+# Local/application imports
+from src.generators.corpus import MappedCorpus
+
+
+def _write_corpus(tmp_path: Path) -> Path:
+    corpus_path = tmp_path / "corpus.txt"
+    corpus_path.write_text(
+        "The quick brown fox\njumps over  the lazy dog.\n\nÜber café naïve.\n",
+        encoding="utf-8",
+    )
+    return corpus_path
+
+
+def test_corpus_index_is_built_once_and_reused(tmp_path: Path) -> None:
+    corpus_path = _write_corpus(tmp_path)
+    corpus = MappedCorpus(str(corpus_path))
+    assert len(corpus) == 12
+    index_stat = os.stat(corpus.index_path)
+
+    reloaded = MappedCorpus(str(corpus_path))
+    assert len(reloaded) == 12
+    assert os.stat(reloaded.index_path).st_mtime_ns == index_stat.st_mtime_ns
+
+
+def test_corpus_views_keep_tokens_and_wrap(tmp_path: Path) -> None:
+    corpus = MappedCorpus(str(_write_corpus(tmp_path)))
+    assert list(corpus.span(9, 3)) == ["Über", "café", "naïve."]
+    assert corpus.text(3, 3) == "fox\njumps over"
+    wrapped = corpus.span(10, 4)
+    assert list(wrapped) == ["café", "naïve.", "The", "quick"]
+    assert wrapped.text().split() == list(wrapped)
+    assert corpus.text(0, 30).split()[12:14] == ["The", "quick"]
+
+
+def test_unwritable_index_falls_back_to_memory(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    # Any OSError on write, like a read-only directory, takes the same path.
+    index_path = tmp_path / "missing" / "corpus.idx"
+    corpus = MappedCorpus(str(_write_corpus(tmp_path)), str(index_path))
+
+    assert len(corpus) == 12
+    assert list(corpus.span(9, 3)) == ["Über", "café", "naïve."]
+    assert os.listdir(tmp_path) == ["corpus.txt"]
+    assert "DUMMY_VLLM_CORPUS_INDEX" in caplog.text
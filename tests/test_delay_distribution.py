@@ -0,0 +1,79 @@
+#!/usr/bin/env python3
+"""Tests for TTFT and inter-token latency distributions."""
+
+# Standard library imports
+from typing import List
+
+# Third-party imports
+import numpy as np
+import pytest
+
+# Local/application imports
+from src.engine.delay_distribution import DelayDistribution, LatencyProfile
+from src.generators.dummy_generator import DummyTextGenerator
+from src.utils.rng import RequestRng
+
+
+@pytest.mark.parametrize("kind", ["uniform", "lognormal", "pareto"])
+def test_distributions_match_the_configured_mean(kind: str) -> None:
+    distribution = DelayDistribution(kind, mean=0.02, stddev=0.01, alpha=3.0)
+    samples = distribution.draw(np.random.default_rng(0), 200_000)
+    assert samples.mean() == pytest.approx(0.02, rel=0.03)
+    assert samples.min() >= 0.0
+
+
+def test_pareto_has_a_heavier_tail_than_lognormal() -> None:
+    generator = np.random.default_rng(1)
+    pareto = DelayDistribution("pareto", mean=0.02, alpha=1.5).draw(generator, 100_000)
+    lognormal = DelayDistribution("lognormal", mean=0.02, stddev=0.01).draw(
+        generator, 100_000
+    )
+    assert np.quantile(pareto, 0.9999) > 2 * np.quantile(lognormal, 0.9999)
+
+
+def test_invalid_distributions_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        DelayDistribution("gamma", mean=0.01)
+    with pytest.raises(ValueError):
+        DelayDistribution("pareto", mean=0.01, alpha=1.0)
+
+
+def test_schedule_mixes_in_stalls_and_follows_seed() -> None:
+    profile = LatencyProfile(
+        ttft=DelayDistribution("constant", mean=0.1),
+        itl=DelayDistribution("constant", mean=0.01),
+        stall_probability=0.05,
+        stall_seconds=0.2,
+    )
+    ttft, gaps = profile.schedule(RequestRng.for_request(3), 20_000)
+    assert ttft == 0.1
+    stalled = sum(1 for gap in gaps if gap > 0.1)
+    assert 800 < stalled < 1200
+    assert profile.schedule(RequestRng.for_request(3), 20_000)[1] == gaps
+
+
+@pytest.mark.asyncio
+async def test_stream_sleeps_on_its_schedule(monkeypatch: pytest.MonkeyPatch) -> None:
+    profile = LatencyProfile(
+        ttft=DelayDistribution("constant", mean=0.5),
+        itl=DelayDistribution("lognormal", mean=0.01, stddev=0.02),
+    )
+    monkeypatch.setattr("src.generators.dummy_generator.latency_profile", profile)
+    slept: List[float] = []
+
+    async def record_sleep(delay_seconds: float) -> None:
+        slept.append(delay_seconds)
+
+    monkeypatch.setattr(DummyTextGenerator, "_maybe_sleep", record_sleep)
+    rng = RequestRng.for_request(11)
+    tokens = [
+        token
+        async for token in DummyTextGenerator.stream_from_tokens(
+            ["a", "b", "c"], rng=rng, prompt_tokens=10, cached_tokens=5
+        )
+    ]
+
+    assert tokens == ["a", "b", "c"]
+    _, gaps = profile.schedule(RequestRng.for_request(11), 3)
+    # Half the prompt is cached, so half the TTFT remains.
+    assert slept == [0.25] + gaps
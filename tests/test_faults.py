@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Tests for seeded fault injection over HTTP and gRPC."""
+
+# Standard library imports
+import json
+from typing import AsyncGenerator, List
+
+# Third-party imports
+import grpc
+import pytest
+from fastapi.testclient import TestClient
+
+# Local/application imports
+from src.config import settings
+from src.engine.faults import FaultInjector, FaultPlan, StreamReset, inject_stream_fault
+from src.grpc_service.proto import openai_pb2, openai_pb2_grpc
+from src.grpc_service.server import build_grpc_server
+
+
+async def _frames(count: int) -> AsyncGenerator[str, None]:
+    for index in range(count):
+        yield f"frame-{index}"
+
+
+async def _relay(plan: FaultPlan, count: int = 5) -> List[str]:
+    stream = inject_stream_fault(plan, _frames(count), "broken")
+    return [frame async for frame in stream]
+
+
+def test_schedule_is_reproducible_and_follows_rates() -> None:
+    rates = {"error": 0.1, "reset": 0.2, "truncate": 0.1}
+    first = FaultInjector(rates, seed=5)
+    plans = [first.plan() for _ in range(10_000)]
+    second = FaultInjector(rates, seed=5)
+    assert [second.plan() for _ in range(10_000)] == plans
+
+    kinds = [plan.kind for plan in plans if plan is not None]
+    assert 800 < kinds.count("error") < 1200
+    assert 1800 < kinds.count("reset") < 2200
+    assert first.stats()["truncate"] == kinds.count("truncate")
+    assert FaultInjector().plan() is None
+
+
+def test_invalid_rates_are_rejected() -> None:
+    with pytest.raises(ValueError):
+        FaultInjector({"timeout": 0.1})
+    with pytest.raises(ValueError):
+        FaultInjector({"error": 0.6, "reset": 0.6})
+
+
+@pytest.mark.asyncio
+async def test_stream_faults_fire_after_the_configured_tokens(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    assert await _relay(FaultPlan("truncate", after_tokens=2)) == [
+        "frame-0",
+        "frame-1",
+    ]
+    assert await _relay(FaultPlan("malformed", after_tokens=1), count=3) == [
+        "frame-0",
+        "broken",
+        "frame-1",
+        "frame-2",
+    ]
+    with pytest.raises(StreamReset):
+        await _relay(FaultPlan("reset", after_tokens=3))
+
+    slept: List[float] = []
+
+    async def record_sleep(delay_seconds: float) -> None:
+        slept.append(delay_seconds)
+
+    monkeypatch.setattr("src.engine.faults.asyncio.sleep", record_sleep)
+    assert len(await _relay(FaultPlan("stall", 4, stall_seconds=60.0))) == 5
+    assert slept == [60.0]
+
+
+def test_http_error_and_truncated_stream(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    monkeypatch.setattr(
+        "src.endpoints.completions.fault_injector", FaultInjector({"error": 1.0})
+    )
+    payload = {"model": settings.default_model_name, "prompt": "hi", "max_tokens": 4}
+    response = client.post("/v1/completions", json=payload)
+    assert response.status_code == 503
+    assert response.json()["error"]["type"] == "server_error"
+
+    monkeypatch.setattr(
+        "src.endpoints.chat.fault_injector",
+        FaultInjector({"truncate": 1.0}, after_tokens=0),
+    )
+    chat_payload = {
+        "model": settings.default_model_name,
+        "messages": [{"role": "user", "content": "hi"}],
+        "max_tokens": 4,
+        "stream": True,
+    }
+    with client.stream("POST", "/v1/chat/completions", json=chat_payload) as stream:
+        body = "".join(stream.iter_text())
+    assert "[DONE]" not in body
+    frames = [line for line in body.split("\n") if line.startswith("data: ")]
+    for frame in frames:
+        json.loads(frame[len("data: ") :])
+
+
+def test_http_stream_faults_count_tokens_not_frames(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    # Two choices of four tokens each; the first choice's usage chunk must not
+    # count towards ``after_tokens``.
+    monkeypatch.setattr(
+        "src.endpoints.completions.fault_injector",
+        FaultInjector({"truncate": 1.0}, after_tokens=5),
+    )
+    payload = {
+        "model": settings.default_model_name,
+        "prompt": "hi",
+        "max_tokens": 4,
+        "n": 2,
+        "stream": True,
+    }
+    with client.stream("POST", "/v1/completions", json=payload) as stream:
+        body = "".join(stream.iter_text())
+    chunks = [
+        json.loads(line[len("data: ") :])
+        for line in body.split("\n")
+        if line.startswith("data: ")
+    ]
+    token_chunks = [chunk for chunk in chunks if chunk["usage"] is None]
+    assert len(token_chunks) == 5
+    assert token_chunks[-1]["choices"][0]["index"] == 1
+
+
+@pytest.mark.asyncio
+async def test_grpc_faults_surface_as_unavailable(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    server, port = build_grpc_server(host="127.0.0.1", port=0)
+    await server.start()
+    try:
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+            stub = openai_pb2_grpc.VLLMServiceStub(channel)
+            request = openai_pb2.CompletionRequest(
+                model=settings.default_model_name, prompt="hi", max_tokens=6
+            )
+            monkeypatch.setattr(
+                "src.grpc_service.server.fault_injector",
+                FaultInjector({"error": 1.0}),
+            )
+            with pytest.raises(grpc.aio.AioRpcError) as unary:
+                await stub.Completion(request)
+            assert unary.value.code() == grpc.StatusCode.UNAVAILABLE
+
+            monkeypatch.setattr(
+                "src.grpc_service.server.fault_injector",
+                FaultInjector({"reset": 1.0}, after_tokens=2),
+            )
+            received = []
+            with pytest.raises(grpc.aio.AioRpcError) as streamed:
+                async for chunk in stub.CompletionStream(request):
+                    received.append(chunk)
+            assert streamed.value.code() == grpc.StatusCode.UNAVAILABLE
+            assert 0 < len(received) < 6
+    finally:
+        await server.stop(None)
@@ -41,7 +41,7 @@ async def test_grpc_completion_roundtrip(
     )
     assert response.model == settings.default_model_name
     assert len(response.choices) >= 1
-    assert response.choices[0].finish_reason in ("stop", "")
+    assert response.choices[0].finish_reason in ("stop", "length")
 
 
 @pytest.mark.asyncio
@@ -59,8 +59,42 @@ async def test_grpc_chat_stream(grpc_stub: openai_pb2_grpc.VLLMServiceStub) -> N
     async for chunk in stream:
         chunks.append(chunk)
         # Stop once the completion reports finish_reason.
-        if chunk.choices and chunk.choices[0].finish_reason == "stop":
+        if chunk.choices and chunk.choices[0].finish_reason in ("stop", "length"):
             break
         if len(chunks) > 10:
             break
     assert chunks, "stream yielded no chunks"
+
+
+@pytest.mark.asyncio
+async def test_grpc_completion_stop_sequence(
+    grpc_stub: openai_pb2_grpc.VLLMServiceStub,
+) -> None:
+    response = await grpc_stub.Completion(
+        openai_pb2.CompletionRequest(
+            model=settings.default_model_name,
+            prompt="hello world",
+            max_tokens=200,
+            stop=["dummy backend"],
+        )
+    )
+    assert response.choices[0].finish_reason == "stop"
+    assert "dummy backend" not in response.choices[0].text
+
+
+@pytest.mark.asyncio
+async def test_grpc_chat_logprobs(grpc_stub: openai_pb2_grpc.VLLMServiceStub) -> None:
+    response = await grpc_stub.ChatCompletion(
+        openai_pb2.ChatCompletionRequest(
+            model=settings.default_model_name,
+            messages=[openai_pb2.ChatMessage(role="user", content="hi")],
+            max_tokens=3,
+            logprobs=True,
+            top_logprobs=4,
+        )
+    )
+    choice = response.choices[0]
+    assert choice.HasField("logprobs")
+    content = choice.logprobs.content
+    assert " ".join(entry.token for entry in content) == choice.message.content
+    assert all(len(entry.top_logprobs) == 4 for entry in content)
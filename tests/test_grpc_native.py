@@ -0,0 +1,166 @@
+#!/usr/bin/env python3
+"""Tests for the proto-to-proto unary gRPC path."""
+
+# Standard library imports
+from __future__ import annotations
+
+import dataclasses
+from typing import Callable
+
+# Third-party imports
+import grpc
+import pytest
+from google.protobuf.message import Message
+from pydantic import ValidationError
+
+# Local/application imports
+from src.config import settings
+from src.grpc_service import converters, native
+from src.grpc_service.proto import openai_pb2, openai_pb2_grpc
+from src.grpc_service.server import (
+    _build_chat_proto,
+    _build_completion_proto,
+    build_grpc_server,
+)
+
+MODEL = settings.default_model_name
+
+
+def _without_id(response: Message) -> Message:
+    response.ClearField("id")
+    response.ClearField("created")
+    return response
+
+
+@pytest.mark.parametrize(
+    "request_proto",
+    [
+        openai_pb2.CompletionRequest(prompt="hello world", seed=1),
+        openai_pb2.CompletionRequest(
+            prompt="hi", max_tokens=40, n=2, seed=2, stop=["the", "a"]
+        ),
+        openai_pb2.CompletionRequest(
+            prompts=openai_pb2.PromptList(values=["a b", ""]), seed=3
+        ),
+        openai_pb2.CompletionRequest(
+            model="m", prompt="x", seed=4, logprobs=True, top_logprobs=2
+        ),
+    ],
+)
+def test_completion_matches_pydantic_path(
+    request_proto: openai_pb2.CompletionRequest,
+) -> None:
+    legacy = _build_completion_proto(
+        converters.completion_request_from_proto(request_proto, default_model=MODEL)
+    )
+    fast = native.completion_response(
+        native.completion_params(request_proto, default_model=MODEL)
+    )
+    assert _without_id(fast) == _without_id(legacy)
+
+
+@pytest.mark.parametrize(
+    "request_proto",
+    [
+        openai_pb2.ChatCompletionRequest(
+            messages=[openai_pb2.ChatMessage(role="user", content="hi there")],
+            seed=1,
+        ),
+        openai_pb2.ChatCompletionRequest(
+            messages=[
+                openai_pb2.ChatMessage(content="no role"),
+                openai_pb2.ChatMessage(role="assistant", content="ok"),
+            ],
+            max_tokens=30,
+            n=3,
+            seed=2,
+            stop=["the"],
+        ),
+        openai_pb2.ChatCompletionRequest(
+            messages=[openai_pb2.ChatMessage(role="user", content="hi")],
+            seed=3,
+            logprobs=True,
+            top_logprobs=3,
+        ),
+    ],
+)
+def test_chat_matches_pydantic_path(
+    request_proto: openai_pb2.ChatCompletionRequest,
+) -> None:
+    legacy = _build_chat_proto(
+        converters.chat_request_from_proto(request_proto, default_model=MODEL)
+    )
+    fast = native.chat_response(native.chat_params(request_proto, default_model=MODEL))
+    assert _without_id(fast) == _without_id(legacy)
+
+
+@pytest.mark.parametrize(
+    "read_pydantic, read_native, request_proto",
+    [
+        (
+            converters.completion_request_from_proto,
+            native.completion_params,
+            openai_pb2.CompletionRequest(prompt="x", max_tokens=0),
+        ),
+        (
+            converters.completion_request_from_proto,
+            native.completion_params,
+            openai_pb2.CompletionRequest(),
+        ),
+        (
+            converters.completion_request_from_proto,
+            native.completion_params,
+            openai_pb2.CompletionRequest(prompt="x", logprobs=True, top_logprobs=21),
+        ),
+        (
+            converters.chat_request_from_proto,
+            native.chat_params,
+            openai_pb2.ChatCompletionRequest(max_tokens=-3),
+        ),
+        (
+            converters.chat_request_from_proto,
+            native.chat_params,
+            openai_pb2.ChatCompletionRequest(top_logprobs=-1),
+        ),
+    ],
+)
+def test_rejections_match_pydantic(
+    read_pydantic: Callable[..., object],
+    read_native: Callable[..., object],
+    request_proto: Message,
+) -> None:
+    with pytest.raises(ValidationError) as expected:
+        read_pydantic(request_proto, default_model=MODEL)
+    with pytest.raises(native.InvalidArgument) as rejected:
+        read_native(request_proto, default_model=MODEL)
+    assert str(rejected.value) == str(
+        native.InvalidArgument.from_validation_error(expected.value)
+    )
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize("native_unary", [False, True])
+async def test_invalid_requests_are_invalid_argument(
+    monkeypatch: pytest.MonkeyPatch, native_unary: bool
+) -> None:
+    monkeypatch.setattr(
+        "src.grpc_service.server.settings",
+        dataclasses.replace(settings, grpc_native_unary=native_unary),
+    )
+    server, port = build_grpc_server(host="127.0.0.1", port=0)
+    await server.start()
+    try:
+        async with grpc.aio.insecure_channel(f"127.0.0.1:{port}") as channel:
+            stub = openai_pb2_grpc.VLLMServiceStub(channel)
+            response = await stub.Completion(
+                openai_pb2.CompletionRequest(prompt="hi", max_tokens=3)
+            )
+            assert response.usage.completion_tokens == 3
+            with pytest.raises(grpc.aio.AioRpcError) as rejected:
+                await stub.ChatCompletion(
+                    openai_pb2.ChatCompletionRequest(max_tokens=0)
+                )
+            assert rejected.value.code() == grpc.StatusCode.INVALID_ARGUMENT
+            assert "max_tokens" in rejected.value.details()
+    finally:
+        await server.stop(None)
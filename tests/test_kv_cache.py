@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""Tests for the simulated KV cache and engine scheduling."""
+
+# Standard library imports
+import asyncio
+from typing import Awaitable, Callable, List
+
+# Third-party imports
+import pytest
+
+# Local/application imports
+from src.engine.kv_cache import BlockManager
+from src.engine.step_loop import EngineStepLoop
+
+
+def test_blocks_for_rounds_up_and_caps() -> None:
+    manager = BlockManager(8, block_size=16)
+    assert manager.blocks_for(1) == 1
+    assert manager.blocks_for(17) == 2
+    assert manager.blocks_for(10_000) == 8
+
+
+@pytest.mark.asyncio
+async def test_sequences_wait_until_their_prompt_fits(
+    make_engine: Callable[..., EngineStepLoop],
+    generate: Callable[..., Awaitable[None]],
+) -> None:
+    engine = make_engine(num_blocks=4)
+    log: List[str] = []
+    first = asyncio.ensure_future(generate(engine, log, "a", 2, prompt_tokens=12))
+    second = asyncio.ensure_future(generate(engine, log, "b", 2, prompt_tokens=12))
+    await asyncio.sleep(0)
+    assert engine.active_sequences == 1
+    assert engine.waiting_sequences == 1
+    await asyncio.gather(first, second)
+    assert log == ["a start", "a done", "b start", "b done"]
+    assert engine.block_manager.free_blocks == 4
+
+
+@pytest.mark.asyncio
+async def test_growth_preempts_latest_sequence(
+    make_engine: Callable[..., EngineStepLoop],
+    generate: Callable[..., Awaitable[None]],
+) -> None:
+    engine = make_engine(num_blocks=4)
+    log: List[str] = []
+    await asyncio.gather(
+        *(generate(engine, log, name, 12, prompt_tokens=3) for name in ("a", "b", "c"))
+    )
+    assert engine.preemptions > 0
+    assert sorted(entry for entry in log if entry.endswith("done")) == [
+        "a done",
+        "b done",
+        "c done",
+    ]
+    stats = engine.stats()
+    assert stats["running_sequences"] == stats["waiting_sequences"] == 0
+    assert stats["kv_cache"]["used_blocks"] == 0
+
+
+@pytest.mark.asyncio
+async def test_tokens_count_from_the_first_decode_step(
+    make_engine: Callable[..., EngineStepLoop],
+) -> None:
+    engine = make_engine(num_blocks=8)
+    async with engine.sequence(3) as sequence:
+        await sequence.wait_running()
+        # Prefill: the engine ticks but this sequence generates nothing.
+        for _ in range(5):
+            await engine.next_step()
+        assert sequence.tokens_at(engine.steps) == 3
+        assert sequence.blocks == 1
+
+        for _ in range(2):
+            await sequence.step()
+        assert sequence.tokens_at(engine.steps) == 5
+        assert sequence.blocks == 2
@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""Tests for the load-dependent latency model."""
+
+# Standard library imports
+import asyncio
+
+# Third-party imports
+import pytest
+
+# Local/application imports
+from src.engine.latency import LatencyModel, PrefillQueue, fit_latency_model
+
+
+def test_costs_grow_with_load() -> None:
+    model = LatencyModel(
+        prefill_base_seconds=0.01,
+        prefill_seconds_per_token=0.001,
+        decode_base_seconds=0.02,
+        decode_seconds_per_sequence=0.0005,
+    )
+    assert model.ttft_seconds(100) == pytest.approx(0.11)
+    assert model.ttft_seconds(100, queued_prefill_tokens=400) == pytest.approx(0.51)
+    assert model.step_seconds(1) < model.step_seconds(64) == pytest.approx(0.052)
+
+
+def test_fit_recovers_coefficients() -> None:
+    ttft = [(tokens, 0.03 + 0.0002 * tokens) for tokens in (16, 128, 512, 2048)]
+    steps = [(active, 0.012 + 0.0003 * active) for active in (1, 8, 32, 128)]
+    model = fit_latency_model(ttft, steps)
+    assert model.prefill_base_seconds == pytest.approx(0.03)
+    assert model.prefill_seconds_per_token == pytest.approx(0.0002)
+    assert model.decode_base_seconds == pytest.approx(0.012)
+    assert model.decode_seconds_per_sequence == pytest.approx(0.0003)
+
+
+@pytest.mark.asyncio
+async def test_prefill_waits_for_queued_work() -> None:
+    model = LatencyModel(prefill_base_seconds=0.0, prefill_seconds_per_token=0.0001)
+    queue = PrefillQueue()
+    first = asyncio.ensure_future(queue.prefill(model, 100))
+    await asyncio.sleep(0)
+    assert queue.queued_tokens == 100
+    assert model.ttft_seconds(50, queue.queued_tokens) == pytest.approx(0.015)
+    await first
+    assert queue.queued_tokens == 0
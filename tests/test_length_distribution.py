@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""Tests for the output-length distribution engine."""
+
+# Standard library imports
+from pathlib import Path
+
+# Third-party imports
+import pytest
+
+# Local/application imports
+from src.generators.length_distribution import OutputLengthSampler
+from src.utils.rng import RequestRng
+
+
+def test_uniform_lengths_stay_in_bounds() -> None:
+    sampler = OutputLengthSampler("uniform", minimum=3, maximum=7, batch_size=16)
+    lengths = {sampler.next() for _ in range(200)}
+    assert lengths <= set(range(3, 8))
+    assert len(lengths) > 1
+
+
+def test_lognormal_is_clamped_and_long_tailed() -> None:
+    sampler = OutputLengthSampler(
+        "lognormal", mean=100.0, stddev=150.0, maximum=2000, seed=7
+    )
+    lengths = [sampler.next() for _ in range(5000)]
+    assert min(lengths) >= 1
+    assert max(lengths) <= 2000
+    assert sorted(lengths)[len(lengths) // 2] < 100
+
+
+def test_empirical_histogram(tmp_path: Path) -> None:
+    histogram = tmp_path / "lengths.txt"
+    histogram.write_text("# length weight\n10 1\n20, 0\n30 3\n", encoding="utf-8")
+    sampler = OutputLengthSampler("empirical", histogram_path=str(histogram), seed=1)
+    lengths = [sampler.next() for _ in range(400)]
+    assert set(lengths) == {10, 30}
+    assert lengths.count(30) > lengths.count(10)
+
+
+def test_unknown_distribution_is_rejected() -> None:
+    with pytest.raises(ValueError):
+        OutputLengthSampler("zipf")
+
+
+def test_seeded_draws_are_reproducible() -> None:
+    sampler = OutputLengthSampler("lognormal", mean=200.0, stddev=300.0)
+    first = [sampler.draw(RequestRng.for_request(42).child(i)) for i in range(8)]
+    second = [sampler.draw(RequestRng.for_request(42).child(i)) for i in range(8)]
+    assert first == second
+    assert len(set(first)) > 1
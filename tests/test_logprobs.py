@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+"""Tests for synthetic logprob generation."""
+
+# Standard library imports
+import math
+
+# Local/application imports
+from src.generators.logprobs import LogprobTable
+from src.utils.rng import RequestRng
+
+VOCABULARY = tuple(f"tok{index}" for index in range(30))
+
+
+def test_completion_format_is_consistent() -> None:
+    table = LogprobTable.synthesize(4, 5, RequestRng.for_request(3), VOCABULARY)
+    tokens = ["alpha", "beta", "gamma", "delta"]
+    payload = table.cursor().completion(tokens)
+    assert payload["tokens"] == tokens
+    assert payload["text_offset"] == [0, 6, 11, 17]
+    for token, logprob, top in zip(
+        tokens, payload["token_logprobs"], payload["top_logprobs"]
+    ):
+        assert len(top) == 5
+        assert top[token] == logprob == max(top.values())
+        assert sum(math.exp(value) for value in top.values()) <= 1.0
+
+
+def test_chat_format_continues_across_calls() -> None:
+    rng = RequestRng.for_request(11)
+    whole = (
+        LogprobTable.synthesize(3, 2, rng, VOCABULARY).cursor().chat(["a", "b", "c"])
+    )
+    cursor = LogprobTable.synthesize(3, 2, rng, VOCABULARY).cursor()
+    pieces = cursor.chat(["a"])["content"] + cursor.chat(["b", "c"])["content"]
+    assert pieces == whole["content"]
+    assert whole["content"][0]["bytes"] == [97]
+    assert [len(entry["top_logprobs"]) for entry in pieces] == [2, 2, 2]
+
+
+def test_zero_top_logprobs_reports_only_sampled_token() -> None:
+    table = LogprobTable.synthesize(2, 0, RequestRng.for_request(None), VOCABULARY)
+    content = table.cursor().chat(["x", "y"])["content"]
+    assert all(entry["top_logprobs"] == [] for entry in content)
+    assert all(entry["logprob"] < 0.0 for entry in content)
+
+
+def test_alternatives_never_repeat_the_sampled_token() -> None:
+    vocabulary = ("a", "b", "c", "d")
+    table = LogprobTable.synthesize(64, 4, RequestRng.for_request(5), vocabulary)
+    content = table.cursor().chat(["b"] * 64)["content"]
+    for entry in content:
+        tokens = [top["token"] for top in entry["top_logprobs"]]
+        assert tokens[0] == "b"
+        assert len(set(tokens)) == 4
@@ -0,0 +1,72 @@
+#!/usr/bin/env python3
+"""Tests for the simulated prefix cache."""
+
+# Standard library imports
+from collections import OrderedDict
+
+# Local/application imports
+from src.engine.prefix_cache import PrefixCache
+
+
+def test_repeated_prompt_hits_full_blocks() -> None:
+    cache = PrefixCache(max_tokens=64, block_size=4)
+    prompt = list(range(10))
+
+    assert cache.match_and_insert(prompt) == 0
+    # 10 tokens: two full blocks; the last token is always recomputed.
+    assert cache.match_and_insert(prompt) == 8
+    assert cache.stats()["hits_total"] == 1
+
+
+def test_shared_prefix_matches_at_block_granularity() -> None:
+    cache = PrefixCache(max_tokens=64, block_size=4)
+    cache.match_and_insert(list(range(13)))
+
+    assert cache.match_and_insert([0, 1, 2, 3, 4, 5, 99, 100, 101]) == 4
+    assert cache.match_and_insert([7, 1, 2, 3, 4, 5, 6, 7, 8]) == 0
+
+
+def test_eviction_keeps_recently_used_prefixes() -> None:
+    cache = PrefixCache(max_tokens=12, block_size=4)
+    shared = [1, 2, 3, 4]
+    cache.match_and_insert(shared + [10, 11, 12, 13, 0])
+    cache.match_and_insert(shared + [20, 21, 22, 23, 0])
+    cache.match_and_insert(shared + [30, 31, 32, 33, 0])
+    # Budget is three blocks; the oldest leaf went, the shared parent stayed.
+    assert cache.cached_tokens == 12
+    assert cache.match_and_insert(shared + [30, 31, 32, 33, 0]) == 8
+    assert cache.match_and_insert(shared + [10, 11, 12, 13, 0]) == 4
+
+
+def test_disabled_cache_never_matches() -> None:
+    cache = PrefixCache(max_tokens=0, block_size=4)
+    cache.match_and_insert(list(range(20)))
+
+    assert cache.match_and_insert(list(range(20))) == 0
+    assert len(cache) == 0
+
+
+class _CountingNodes(OrderedDict):
+    """Node map that counts membership probes."""
+
+    probes = 0
+
+    def __contains__(self, key: object) -> bool:
+        self.probes += 1
+        return super().__contains__(key)
+
+
+def _lookup_probes(cached_prefixes: int) -> int:
+    cache = PrefixCache(max_tokens=16 * 200_000, block_size=16)
+    cache._nodes = _CountingNodes()
+    for index in range(cached_prefixes):
+        cache.match_and_insert([index] * 33)
+    cache._nodes.probes = 0
+    assert cache.match_and_insert([5] * 33) == 32
+    return cache._nodes.probes
+
+
+def test_lookup_work_does_not_grow_with_many_prefixes() -> None:
+    # Two full blocks: one probe each to match, one each to touch or insert.
+    assert _lookup_probes(10) == 4
+    assert _lookup_probes(100_000) == 4
@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""Tests for the one-pass request decoding mode."""
+
+# Standard library imports
+import dataclasses
+from typing import Any, Dict
+
+# Third-party imports
+import pytest
+from fastapi.testclient import TestClient
+
+# Local/application imports
+from src.config import settings
+from src.endpoints.encoding import RequestDecodeError, construct_model
+from src.main import create_app
+from src.models import ChatCompletionRequest, CompletionRequest
+
+
+@pytest.mark.parametrize(
+    "body",
+    [
+        {"model": "m", "prompt": "hello"},
+        {"model": "m", "prompt": ["a", "b"], "max_tokens": 5, "n": 2, "logprobs": 3},
+        {"model": "m", "prompt": "x", "stop": ["\n"], "seed": 4, "temperature": 1},
+        {"model": "m", "prompt": "x", "logit_bias": {"50256": -100}, "extra": 1},
+    ],
+)
+def test_completion_matches_pydantic(body: Dict[str, Any]) -> None:
+    fast = construct_model(CompletionRequest, body)
+    validated = CompletionRequest.model_validate(body)
+    assert fast.model_dump() == validated.model_dump()
+    assert fast.model_fields_set == validated.model_fields_set
+
+
+def test_chat_matches_pydantic() -> None:
+    body = {
+        "model": "m",
+        "messages": [{"role": "user", "content": "hi"}],
+        "logprobs": True,
+        "top_logprobs": 2,
+        "stop": "end",
+    }
+    fast = construct_model(ChatCompletionRequest, body)
+    assert fast.model_dump() == ChatCompletionRequest.model_validate(body).model_dump()
+    assert fast.messages[0].content == "hi"
+
+
+@pytest.mark.parametrize(
+    "body, param",
+    [
+        ([], None),
+        ({"prompt": "x"}, "model"),
+        ({"model": "m", "prompt": 3}, "prompt"),
+        ({"model": "m", "prompt": ["a", 1]}, "prompt"),
+        ({"model": "m", "prompt": "x", "max_tokens": 0}, "max_tokens"),
+        ({"model": "m", "prompt": "x", "max_tokens": "5"}, "max_tokens"),
+        ({"model": "m", "prompt": "x", "logprobs": 21}, "logprobs"),
+        ({"model": "m", "prompt": "x", "stream": 1}, "stream"),
+    ],
+)
+def test_invalid_completion_bodies(body: Any, param: str) -> None:
+    with pytest.raises(RequestDecodeError) as error:
+        construct_model(CompletionRequest, body)
+    assert error.value.param == param
+
+
+def test_fast_routes_reply_with_openai_errors(
+    monkeypatch: pytest.MonkeyPatch,
+) -> None:
+    monkeypatch.setattr(
+        "src.main.settings", dataclasses.replace(settings, fast_request_decoding=True)
+    )
+    client = TestClient(create_app())
+    response = client.post("/v1/completions", json={"model": "m", "prompt": ["a", 1]})
+    assert response.status_code == 400
+    error = response.json()["error"]
+    assert error["type"] == "invalid_request_error"
+    assert error["param"] == "prompt"
+
+    broken = client.post("/v1/completions", content=b"{not json")
+    assert broken.status_code == 400
+
+    # Chat stays on the pydantic route.
+    chat = client.post(
+        "/v1/chat/completions",
+        json={"model": "m", "messages": [{"role": "user"}]},
+    )
+    assert chat.status_code == 422
+
+    ok = client.post(
+        "/v1/completions",
+        json={"model": "m", "prompt": "hello", "max_tokens": 3},
+        headers={"x-priority": "2"},
+    )
+    assert ok.status_code == 200
+    assert ok.json()["usage"]["completion_tokens"] <= 3
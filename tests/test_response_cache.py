@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Tests for the whole-response byte cache."""
+
+# Standard library imports
+import json
+import time
+
+# Third-party imports
+import pytest
+from fastapi.testclient import TestClient
+
+# Local/application imports
+from src.endpoints.response_cache import CachedBody, ResponseCache
+from src.generators.response_builder import ResponseBuilder
+from src.models import CompletionRequest
+from src.utils.rng import RequestRng
+
+
+def test_render_patches_id_and_created() -> None:
+    payload = ResponseBuilder.chat_payload(
+        model="m",
+        choices=[ResponseBuilder.chat_choice_payload(0, 'say "cmpl-"', "stop")],
+        prompt_tokens=3,
+        completion_tokens=2,
+    )
+    body = CachedBody(payload, completion_tokens=2)
+    first, second = json.loads(body.render()), json.loads(body.render())
+
+    assert first["id"] != second["id"]
+    assert first["id"].startswith("cmpl-") and len(first["id"]) == 29
+    assert abs(first["created"] - time.time()) < 5
+    for key in ("id", "created"):
+        first.pop(key)
+        payload.pop(key)
+    assert first == payload
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/v1/completions", {"prompt": ["a", "b c"], "n": 2}),
+        ("/v1/chat/completions", {"messages": [{"role": "user", "content": "hi"}]}),
+    ],
+)
+def test_repeated_requests_are_served_from_cache(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, path: str, body: dict
+) -> None:
+    cache = ResponseCache(8)
+    module = "completions" if path == "/v1/completions" else "chat"
+    monkeypatch.setattr(f"src.endpoints.{module}.response_cache", cache)
+    request = dict(body, model="m", max_tokens=7, seed=3, stop=["zzz"])
+
+    first = client.post(path, json=request).json()
+    second = client.post(path, json=request).json()
+    assert cache.stats() == {"entries": 1, "hits": 1, "misses": 1}
+    assert first["id"] != second["id"]
+    first.pop("id"), second.pop("id")
+    first.pop("created"), second.pop("created")
+    assert first == second
+
+    client.post(path, json=dict(request, max_tokens=8))
+    client.post(path, json=dict(request, stop="zz"))
+    assert cache.stats()["hits"] == 1
+
+
+def test_logprob_requests_bypass_the_cache(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    cache = ResponseCache(8)
+    monkeypatch.setattr("src.endpoints.completions.response_cache", cache)
+    request = {"model": "m", "prompt": "x", "logprobs": 1, "seed": 1}
+    client.post("/v1/completions", json=request)
+    client.post("/v1/completions", json=request)
+    assert cache.stats() == {"entries": 0, "hits": 0, "misses": 0}
+
+
+def test_unseeded_choice_combinations_must_fit() -> None:
+    request = CompletionRequest(model="m", prompt="x")
+    cache = ResponseCache(30)
+    unseeded = RequestRng.for_request(None)
+    assert cache.key("/v1/completions", request, unseeded, 2, 1, None) is not None
+    assert cache.key("/v1/completions", request, unseeded, 3, 1, None) is None
+    seeded = RequestRng.for_request(5)
+    assert cache.key("/v1/completions", request, seeded, 3, 1, None) is not None
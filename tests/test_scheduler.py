@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+"""Tests for priority scheduling in the engine step loop."""
+
+# Standard library imports
+import asyncio
+from typing import Awaitable, Callable, List
+
+# Third-party imports
+import pytest
+
+# Local/application imports
+from src.engine.step_loop import EngineStepLoop
+
+
+@pytest.mark.asyncio
+async def test_waiting_sequences_run_by_priority_then_arrival(
+    make_engine: Callable[..., EngineStepLoop],
+    generate: Callable[..., Awaitable[None]],
+) -> None:
+    engine = make_engine(max_num_seqs=1)
+    log: List[str] = []
+    tasks = [asyncio.ensure_future(generate(engine, log, "first", 2, priority=0))]
+    await asyncio.sleep(0)
+    for name, priority in (("batch", 5), ("late", 1), ("urgent", 1), ("idle", 9)):
+        tasks.append(
+            asyncio.ensure_future(generate(engine, log, name, 2, priority=priority))
+        )
+    await asyncio.sleep(0)
+    assert engine.waiting_sequences == 4
+    await asyncio.gather(*tasks)
+    starts = [entry[:-6] for entry in log if entry.endswith(" start")]
+    assert starts == ["first", "late", "urgent", "batch", "idle"]
+    assert engine.preemptions == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_waiting_sequence_leaves_the_queue(
+    make_engine: Callable[..., EngineStepLoop],
+    generate: Callable[..., Awaitable[None]],
+) -> None:
+    engine = make_engine(max_num_seqs=1)
+    log: List[str] = []
+    running = asyncio.ensure_future(generate(engine, log, "a", 3, priority=0))
+    queued = asyncio.ensure_future(generate(engine, log, "b", 3, priority=0))
+    await asyncio.sleep(0)
+    assert engine.waiting_sequences == 1
+    queued.cancel()
+    await asyncio.sleep(0)
+    assert engine.waiting_sequences == 0
+    await running
+    assert log == ["a start", "a done"]
+
+
+@pytest.mark.asyncio
+async def test_priority_preemption_evicts_lower_priority_streams(
+    make_engine: Callable[..., EngineStepLoop],
+    generate: Callable[..., Awaitable[None]],
+) -> None:
+    engine = make_engine(max_num_seqs=2, priority_preemption=True)
+    log: List[str] = []
+    batch = [
+        asyncio.ensure_future(generate(engine, log, name, 20, priority=10))
+        for name in ("b1", "b2")
+    ]
+    await asyncio.sleep(0.002)
+    urgent = asyncio.ensure_future(generate(engine, log, "urgent", 2, priority=0))
+    await asyncio.gather(urgent, *batch)
+
+    assert engine.preemptions == 1
+    assert log.index("urgent done") < log.index("b1 done")
+    assert log.index("urgent done") < log.index("b2 done")
+
+
+@pytest.mark.asyncio
+async def test_equal_priority_never_preempts(
+    make_engine: Callable[..., EngineStepLoop],
+    generate: Callable[..., Awaitable[None]],
+) -> None:
+    engine = make_engine(max_num_seqs=1, priority_preemption=True)
+    log: List[str] = []
+    first = asyncio.ensure_future(generate(engine, log, "a", 2, priority=1))
+    await asyncio.sleep(0)
+    second = asyncio.ensure_future(generate(engine, log, "b", 2, priority=1))
+    third = asyncio.ensure_future(generate(engine, log, "c", 2, priority=1))
+    await asyncio.gather(first, second, third)
+    assert engine.preemptions == 0
+    assert log == ["a start", "a done", "b start", "b done", "c start", "c done"]
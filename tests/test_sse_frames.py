@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Tests for pre-encoded SSE token frames."""
+
+# Standard library imports
+import json
+import time
+
+# Third-party imports
+import pytest
+
+# Local/application imports
+from src.generators.response_builder import ResponseBuilder
+from src.generators.sse_frames import SseFrameTemplate
+
+TOKENS = ["plain", 'quo"te', "back\\slash", "tab\tnew\nline", "\x1f", "naïve", "日本"]
+
+
+def _dumped(chunk: dict) -> bytes:
+    return f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+@pytest.fixture(autouse=True)
+def frozen_clock(monkeypatch: pytest.MonkeyPatch) -> None:
+    monkeypatch.setattr(time, "time", lambda: 1_700_000_000.5)
+
+
+@pytest.mark.parametrize("token", TOKENS)
+@pytest.mark.parametrize(
+    "logprobs", [None, {"tokens": ["ü"], "token_logprobs": [-0.5]}]
+)
+def test_completion_frames_match_json_dumps(token: str, logprobs: dict) -> None:
+    template = SseFrameTemplate.completion("cmpl-abc", "mödel/x", 3)
+    expected = ResponseBuilder.completion_stream_chunk(
+        completion_id="cmpl-abc",
+        model="mödel/x",
+        choice_index=3,
+        token_text=token,
+        finish_reason=None,
+        logprobs=logprobs,
+    )
+    assert template.frame(token, logprobs) == _dumped(expected)
+
+
+@pytest.mark.parametrize("token", TOKENS)
+@pytest.mark.parametrize("logprobs", [None, {"content": [{"token": "x"}]}])
+def test_chat_frames_match_json_dumps(token: str, logprobs: dict) -> None:
+    template = SseFrameTemplate.chat("cmpl-abc", 'my "model"', 0)
+    expected = ResponseBuilder.chat_stream_chunk(
+        completion_id="cmpl-abc",
+        model='my "model"',
+        choice_index=0,
+        token_text=token,
+        finish_reason=None,
+        logprobs=logprobs,
+    )
+    assert template.frame(token, logprobs) == _dumped(expected)
+
+
+@pytest.mark.parametrize("model", ["\x00", "nul\x00", '{"\x01": 0}'])
+@pytest.mark.parametrize("logprobs", [None, {"content": [{"token": "x"}]}])
+def test_model_names_holding_markers_still_match(model: str, logprobs: dict) -> None:
+    for template, build in (
+        (
+            SseFrameTemplate.chat("cmpl-abc", model, 1),
+            ResponseBuilder.chat_stream_chunk,
+        ),
+        (
+            SseFrameTemplate.completion("cmpl-abc", model, 1),
+            ResponseBuilder.completion_stream_chunk,
+        ),
+    ):
+        expected = build(
+            completion_id="cmpl-abc",
+            model=model,
+            choice_index=1,
+            token_text="tok",
+            finish_reason=None,
+            logprobs=logprobs,
+        )
+        assert template.frame("tok", logprobs) == _dumped(expected)
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""Tests for the shared engine step loop."""
+
+# Standard library imports
+import asyncio
+from typing import List
+
+# Third-party imports
+import pytest
+
+# Local/application imports
+from src.engine.step_loop import EngineStepLoop
+
+
+async def _consume(engine: EngineStepLoop, tokens: int, ticks: List[int]) -> None:
+    async with engine.sequence() as sequence:
+        for _ in range(tokens):
+            await sequence.step()
+            ticks.append(engine.steps)
+
+
+@pytest.mark.asyncio
+async def test_streams_advance_in_lockstep() -> None:
+    engine = EngineStepLoop(lambda rng, active: 0.001)
+    ticks: List[List[int]] = [[] for _ in range(50)]
+    await asyncio.gather(*(_consume(engine, 5, seen) for seen in ticks))
+    # Fifty streams of five tokens need five shared steps, not 250 timers.
+    assert engine.steps == 5
+    assert all(seen == [1, 2, 3, 4, 5] for seen in ticks)
+    assert engine.active_sequences == 0
+
+
+@pytest.mark.asyncio
+async def test_cancelled_stream_does_not_cancel_the_tick() -> None:
+    engine = EngineStepLoop(lambda rng, active: 0.001)
+    survivor: List[int] = []
+    victim = asyncio.ensure_future(_consume(engine, 100, []))
+    other = asyncio.ensure_future(_consume(engine, 3, survivor))
+    await asyncio.sleep(0)
+    victim.cancel()
+    await other
+    assert survivor == [1, 2, 3]
+    assert engine.active_sequences == 0
@@ -0,0 +1,38 @@
+#!/usr/bin/env python3
+"""Tests for stop-string matching over token streams."""
+
+# Local/application imports
+from src.generators.stop_matcher import StopMatcher, TokenStopFilter
+
+
+def _apply(tokens, patterns):
+    stop_filter = TokenStopFilter(StopMatcher(patterns))
+    return list(stop_filter.filter(tokens)), stop_filter.stopped
+
+
+def test_match_inside_single_token_clips_it() -> None:
+    emitted, stopped = _apply(["alpha", "beta", "gamma"], ["et"])
+    assert emitted == ["alpha", "b"]
+    assert stopped
+
+
+def test_match_spanning_token_boundary() -> None:
+    emitted, stopped = _apply(["one", "two", "three", "four"], ["o three", "zzz"])
+    assert emitted == ["one", "tw"]
+    assert stopped
+
+
+def test_overlapping_patterns_pick_earliest_end() -> None:
+    emitted, stopped = _apply(["abcd", "ef"], ["bcdx", "cd e", "d"])
+    assert emitted == ["abc"]
+    assert stopped
+
+
+def test_partial_match_is_released_when_ruled_out() -> None:
+    stop_filter = TokenStopFilter(StopMatcher(["beta gamma"]))
+    assert stop_filter.push("alpha") == ["alpha"]
+    assert stop_filter.push("beta") == []
+    assert stop_filter.push("delta") == ["beta", "delta"]
+    assert stop_filter.push("beta") == []
+    assert stop_filter.flush() == ["beta"]
+    assert not stop_filter.stopped
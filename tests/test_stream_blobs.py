@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""Tests for pre-rendered SSE stream blobs."""
+
+# Standard library imports
+import asyncio
+import dataclasses
+import json
+from typing import AsyncGenerator, List
+
+# Third-party imports
+import pytest
+from fastapi.testclient import TestClient
+
+# Local/application imports
+from src.config import settings
+from src.endpoints.stream_blobs import StreamBlob, StreamBlobCache
+from src.generators.response_builder import ResponseBuilder
+from src.generators.sse_frames import DONE_FRAME, SseFrameTemplate, encode_chunk
+from src.models import ChatCompletionRequest
+from src.utils.rng import RequestRng
+
+
+def _chunks(body: bytes) -> List[dict]:
+    events = [event for event in body.split(b"\n\n") if event]
+    assert events[-1] + b"\n\n" == DONE_FRAME
+    return [json.loads(event[len(b"data: ") :]) for event in events[:-1]]
+
+
+def test_render_patches_every_chunk() -> None:
+    template = SseFrameTemplate.chat("cmpl-old", "m", 0)
+    final_chunk = ResponseBuilder.chat_stream_chunk(
+        completion_id="cmpl-old",
+        model="m",
+        choice_index=0,
+        token_text="",
+        finish_reason="length",
+        completion_tokens=2,
+    )
+    frames = [
+        template.frame('"id": "cmpl-old"'),
+        template.frame("b"),
+        encode_chunk(final_chunk),
+        DONE_FRAME,
+    ]
+    blob = StreamBlob(frames, "cmpl-old")
+    assert blob.completion_tokens == 2
+
+    original = _chunks(b"".join(frames))
+    rendered = _chunks(blob.render("cmpl-new"))
+    assert [chunk["id"] for chunk in rendered] == ["cmpl-new"] * 3
+    assert len({chunk["created"] for chunk in rendered}) == 1
+    for chunk in original + rendered:
+        chunk.pop("id"), chunk.pop("created")
+    assert rendered == original
+
+    async def collect() -> List[bytes]:
+        return [bytes(piece) async for piece in blob.slices("cmpl-new", 64)]
+
+    slices = asyncio.run(collect())
+    assert max(len(piece) for piece in slices) == 64
+    assert _chunks(b"".join(slices))[0]["id"] == "cmpl-new"
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/v1/completions", {"prompt": ["a", "b c"], "n": 2}),
+        ("/v1/chat/completions", {"messages": [{"role": "user", "content": "hi"}]}),
+    ],
+)
+def test_repeated_streams_are_replayed(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, path: str, body: dict
+) -> None:
+    blobs = StreamBlobCache(8, slice_bytes=100)
+    module = "completions" if path == "/v1/completions" else "chat"
+    monkeypatch.setattr(f"src.endpoints.{module}.stream_blobs", blobs)
+    request = dict(body, model="m", max_tokens=12, seed=3, stream=True)
+
+    first = client.post(path, json=request)
+    second = client.post(path, json=request)
+    assert blobs.stats()["hits"] == 1
+    assert blobs.stats()["bytes"] == len(first.content)
+
+    live, replayed = _chunks(first.content), _chunks(second.content)
+    assert len({chunk["id"] for chunk in replayed}) == 1
+    assert replayed[0]["id"] != live[0]["id"]
+    for chunk in live + replayed:
+        chunk.pop("id"), chunk.pop("created")
+    assert replayed == live
+
+
+@pytest.mark.parametrize(
+    "path, body",
+    [
+        ("/v1/completions", {"prompt": "hi"}),
+        ("/v1/chat/completions", {"messages": [{"role": "user", "content": "hi"}]}),
+    ],
+)
+def test_streams_without_choices_are_not_recorded(
+    client: TestClient, monkeypatch: pytest.MonkeyPatch, path: str, body: dict
+) -> None:
+    blobs = StreamBlobCache(8)
+    module = "completions" if path == "/v1/completions" else "chat"
+    monkeypatch.setattr(f"src.endpoints.{module}.stream_blobs", blobs)
+    request = dict(body, model="m", n=0, stream=True)
+
+    for _ in range(2):
+        response = client.post(path, json=request)
+        assert response.status_code == 200
+        assert response.content == DONE_FRAME
+    assert blobs.stats()["entries"] == 0
+
+
+def test_incomplete_recordings_are_not_stored() -> None:
+    async def only_done() -> AsyncGenerator[bytes, None]:
+        yield DONE_FRAME
+
+    async def record() -> List[bytes]:
+        blobs = StreamBlobCache(8)
+        frames = [frame async for frame in blobs.record("key", "cmpl-1", only_done())]
+        assert blobs.get("key") is None
+        return frames
+
+    assert asyncio.run(record()) == [DONE_FRAME]
+
+
+def test_paced_streams_are_not_recorded(monkeypatch: pytest.MonkeyPatch) -> None:
+    blobs = StreamBlobCache(8)
+    request = ChatCompletionRequest(
+        model="m", messages=[{"role": "user", "content": "hi"}]
+    )
+    rng = RequestRng.for_request(1)
+    assert blobs.key("/v1/chat/completions", request, rng, 1, None, None)
+
+    monkeypatch.setattr(
+        "src.generators.dummy_generator.settings",
+        dataclasses.replace(settings, ttft_delay_seconds=0.1),
+    )
+    assert blobs.key("/v1/chat/completions", request, rng, 1, None, None) is None
+
+
+def test_abandoned_recording_closes_its_source() -> None:
+    closed: List[bool] = []
+
+    async def frames() -> AsyncGenerator[bytes, None]:
+        try:
+            yield b"data: {}\n\n"
+            yield DONE_FRAME
+        finally:
+            closed.append(True)
+
+    async def abandon() -> None:
+        recording = StreamBlobCache(8).record("key", "cmpl-1", frames())
+        assert await recording.__anext__() == b"data: {}\n\n"
+        await recording.aclose()
+        # Closed with the recording, not later by the event loop's shutdown.
+        assert closed == [True]
+
+    asyncio.run(abandon())
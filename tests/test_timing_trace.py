@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""Tests for recorded timing trace replay."""
+
+# Standard library imports
+import itertools
+import json
+import os
+from pathlib import Path
+from typing import List
+
+# Third-party imports
+import pytest
+
+# Local/application imports
+from src.engine.trace import TimingTrace, prompt_key
+from src.generators.dummy_generator import DummyTextGenerator
+from src.utils.rng import RequestRng
+
+
+def _write_trace(tmp_path: Path) -> Path:
+    trace_path = tmp_path / "trace.jsonl"
+    records = [
+        {"ttft": 0.5, "itl": [0.25, 0.125]},
+        {"ttft": 1.0, "itl": []},
+        {"ttft": 0.75, "itl": [0.0625]},
+    ]
+    trace_path.write_text(
+        "\n".join(json.dumps(record) for record in records) + "\n", encoding="utf-8"
+    )
+    return trace_path
+
+
+def test_trace_is_compiled_once_and_reused(tmp_path: Path) -> None:
+    trace_path = _write_trace(tmp_path)
+    trace = TimingTrace(str(trace_path))
+    assert len(trace) == 3
+    binary_stat = os.stat(trace.binary_path)
+
+    reloaded = TimingTrace(str(trace_path))
+    assert len(reloaded) == 3
+    assert os.stat(reloaded.binary_path).st_mtime_ns == binary_stat.st_mtime_ns
+
+
+def test_unwritable_trace_binary_falls_back_to_memory(
+    tmp_path: Path, caplog: pytest.LogCaptureFixture
+) -> None:
+    # Any OSError on write, like a read-only directory, takes the same path.
+    binary_path = tmp_path / "missing" / "trace.bin"
+    trace = TimingTrace(str(_write_trace(tmp_path)), binary_path=str(binary_path))
+
+    assert len(trace) == 3
+    assert list(itertools.islice(trace.replay(0), 4)) == [0.5, 0.25, 0.125, 0.25]
+    assert os.listdir(tmp_path) == ["trace.jsonl"]
+    assert "DUMMY_VLLM_TIMING_TRACE_BINARY" in caplog.text
+
+
+def test_malformed_trace_leaves_no_files(tmp_path: Path) -> None:
+    trace_path = tmp_path / "trace.jsonl"
+    trace_path.write_text('{"ttft": 0.5, "itl": []}\n{"ttft": \n', encoding="utf-8")
+    with pytest.raises(json.JSONDecodeError):
+        TimingTrace(str(trace_path))
+    assert os.listdir(tmp_path) == ["trace.jsonl"]
+
+
+def test_replay_cycles_recorded_gaps(tmp_path: Path) -> None:
+    trace = TimingTrace(str(_write_trace(tmp_path)))
+    assert list(itertools.islice(trace.replay(0), 6)) == [
+        0.5,
+        0.25,
+        0.125,
+        0.25,
+        0.125,
+        0.25,
+    ]
+    assert list(itertools.islice(trace.replay(1), 3)) == [1.0, 0.0, 0.0]
+
+
+def test_assignment_modes(tmp_path: Path) -> None:
+    trace_path = str(_write_trace(tmp_path))
+    round_robin = TimingTrace(trace_path)
+    rng = RequestRng.for_request(1)
+    assert [round_robin.pick(rng) for _ in range(4)] == [0, 1, 2, 0]
+
+    by_prompt = TimingTrace(trace_path, "prompt_hash")
+    key = prompt_key("hello")
+    assert by_prompt.pick(rng, key) == by_prompt.pick(rng, key) == key % 3
+
+    randomly = TimingTrace(trace_path, "random")
+    first = [randomly.pick(RequestRng.for_request(7)) for _ in range(2)]
+    assert first[0] == first[1]
+
+    with pytest.raises(ValueError):
+        TimingTrace(trace_path, "fastest")
+
+
+def test_chat_trace_key_renders_messages_only_when_used(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    rendered: List[str] = []
+
+    class Message:
+        role = "user"
+
+        @property
+        def content(self) -> str:
+            rendered.append("content")
+            return "hello"
+
+    monkeypatch.setattr("src.generators.dummy_generator.timing_trace", None)
+    assert DummyTextGenerator.chat_trace_key([Message()] * 3) is None
+    trace_path = str(_write_trace(tmp_path))
+    monkeypatch.setattr(
+        "src.generators.dummy_generator.timing_trace", TimingTrace(trace_path)
+    )
+    assert DummyTextGenerator.chat_trace_key([Message()] * 3) is None
+    assert rendered == []
+
+    monkeypatch.setattr(
+        "src.generators.dummy_generator.timing_trace",
+        TimingTrace(trace_path, "prompt_hash"),
+    )
+    assert DummyTextGenerator.chat_trace_key([Message()] * 2) == prompt_key(
+        "user: hello\nuser: hello"
+    )
+
+
+@pytest.mark.asyncio
+async def test_stream_replays_trace_exactly(
+    tmp_path: Path, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    trace = TimingTrace(str(_write_trace(tmp_path)))
+    monkeypatch.setattr("src.generators.dummy_generator.timing_trace", trace)
+    slept: List[float] = []
+
+    async def record_sleep(delay_seconds: float) -> None:
+        slept.append(delay_seconds)
+
+    monkeypatch.setattr(DummyTextGenerator, "_maybe_sleep", record_sleep)
+    tokens = [
+        token
+        async for token in DummyTextGenerator.stream_from_tokens(
+            ["a", "b", "c", "d"], prompt_tokens=100
+        )
+    ]
+
+    assert tokens == ["a", "b", "c", "d"]
+    # TTFT before the first token and one gap before each later token.
+    assert slept == [0.5, 0.25, 0.125, 0.25]
@@ -0,0 +1,30 @@
+#!/usr/bin/env python3
+"""Tests for the pre-tokenized response arena."""
+
+# Local/application imports
+from src.generators.dummy_generator import DummyTextGenerator
+from src.generators.token_arena import TokenArena
+
+
+def test_span_text_matches_joined_tokens() -> None:
+    arena = TokenArena(["alpha beta gamma", "delta epsilon"])
+    for offset in range(len(arena)):
+        for length in (1, 3, 5, 12, 31):
+            span = arena.span(offset, length)
+            tokens = list(span)
+            assert len(tokens) == length
+            assert span.text() == " ".join(tokens)
+
+
+def test_span_wraps_around_pool() -> None:
+    arena = TokenArena(["alpha beta", "gamma"])
+    assert arena.span(2, 4).text() == "gamma alpha beta gamma"
+    assert arena.start(1) == (2, 1)
+
+
+def test_generator_finish_metadata_uses_entry_length() -> None:
+    for _ in range(20):
+        span, truncated = DummyTextGenerator.generate_span(max_tokens=5000)
+        assert len(span) == 5000
+        assert truncated
+        assert len(span.text().split()) == 5000
@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""Tests for the optional local BPE tokenizer."""
+
+# Standard library imports
+import json
+from pathlib import Path
+
+# Third-party imports
+import pytest
+from fastapi.testclient import TestClient
+
+# Local/application imports
+from src.generators.dummy_generator import DummyTextGenerator
+from src.generators.tokenizer import BPETokenizer, PreTokenizer
+
+_MERGES = ["h e", "he l", "hel l", "hell o", "Ġ w", "o r"]
+
+
+def _write_tokenizer_json(tmp_path: Path, **sections: object) -> Path:
+    symbols = {"h", "e", "l", "o", "Ġ", "w", "r", "d"}
+    symbols.update(first + second for first, second in map(str.split, _MERGES))
+    vocab = {symbol: index for index, symbol in enumerate(sorted(symbols))}
+    path = tmp_path / "tokenizer.json"
+    path.write_text(
+        json.dumps(
+            {"model": {"type": "BPE", "vocab": vocab, "merges": _MERGES}, **sections}
+        ),
+        encoding="utf-8",
+    )
+    return path
+
+
+def test_byte_level_bpe_counts(tmp_path: Path) -> None:
+    tokenizer = BPETokenizer.from_file(str(_write_tokenizer_json(tmp_path)))
+    # "hello" merges fully; " world" -> "Ġw", "or", "l", "d"
+    assert tokenizer.count("hello world") == 5
+    assert tokenizer.count("hello world") == 5
+    assert len(tokenizer.encode("hello world")) == 5
+    assert tokenizer.count("") == 0
+
+
+def test_split_pre_tokenizer_from_tokenizer_json(tmp_path: Path) -> None:
+    # Llama 3 / cl100k style: digits in runs of at most three, and a letter
+    # run keeps one leading non-letter instead of only a space.
+    pattern = (
+        r"(?i:'s|'t|'re|'ve|'m|'ll|'d)|[^\r\n\p{L}\p{N}]?\p{L}+|\p{N}{1,3}"
+        r"| ?[^\s\p{L}\p{N}]+[\r\n]*|\s*[\r\n]+|\s+(?!\S)|\s+"
+    )
+    pre_tokenizer = {
+        "type": "Sequence",
+        "pretokenizers": [
+            {"type": "Split", "pattern": {"Regex": pattern}, "behavior": "Isolated"},
+            {"type": "ByteLevel", "add_prefix_space": False, "use_regex": False},
+        ],
+    }
+    text = "hello 12345 (héllo) 日本語!!\n\nok"
+    assert PreTokenizer.from_config(pre_tokenizer).split(text) == [
+        "hello",
+        " ",
+        "123",
+        "45",
+        " (",
+        "héllo",
+        ")",
+        " 日本語",
+        "!!\n\n",
+        "ok",
+    ]
+    # The GPT-2 split keeps the digits together and the parenthesis apart.
+    assert PreTokenizer().split(text)[1:3] == [" 12345", " ("]
+
+    # Merges never cross a split, so splitting on "l" leaves "he", "l", "l", "o".
+    split_on_l = {"type": "Split", "pattern": {"String": "l"}, "behavior": "Isolated"}
+    path = _write_tokenizer_json(
+        tmp_path, pre_tokenizer=split_on_l, normalizer={"type": "NFC"}
+    )
+    assert BPETokenizer.from_file(str(path)).count("hello") == 4
+
+
+@pytest.mark.parametrize(
+    "sections",
+    [
+        {"pre_tokenizer": {"type": "Metaspace", "replacement": "▁"}},
+        {"pre_tokenizer": {"type": "Split", "pattern": {"Regex": "a"}, "invert": True}},
+        {"normalizer": {"type": "Lowercase"}},
+    ],
+)
+def test_unsupported_pre_tokenizers_are_rejected(
+    tmp_path: Path, sections: dict
+) -> None:
+    with pytest.raises(ValueError, match="tokenizer.json"):
+        BPETokenizer.from_file(str(_write_tokenizer_json(tmp_path, **sections)))
+
+
+def test_vocab_and_merges_files(tmp_path: Path) -> None:
+    vocab = json.loads(_write_tokenizer_json(tmp_path).read_text())["model"]["vocab"]
+    (tmp_path / "vocab.json").write_text(json.dumps(vocab), encoding="utf-8")
+    (tmp_path / "merges.txt").write_text(
+        "#version: 0.2\n" + "\n".join(_MERGES) + "\n", encoding="utf-8"
+    )
+    tokenizer = BPETokenizer.from_file(str(tmp_path / "vocab.json"))
+    assert tokenizer.count("hello world") == 5
+
+
+def test_stream_usage_reports_prompt_tokens(
+    tmp_path: Path, client: TestClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    tokenizer = BPETokenizer.from_file(str(_write_tokenizer_json(tmp_path)))
+    monkeypatch.setattr(DummyTextGenerator, "TOKENIZER", tokenizer)
+    final_chunk = None
+    with client.stream(
+        "POST",
+        "/v1/completions",
+        json={"model": "m", "prompt": "hello world", "max_tokens": 2, "stream": True},
+    ) as response:
+        for line in response.iter_lines():
+            if line.startswith("data: {"):
+                final_chunk = json.loads(line[6:])
+    assert final_chunk is not None
+    assert final_chunk["usage"]["prompt_tokens"] == 5
+    assert final_chunk["usage"]["total_tokens"] == 7